@@ -0,0 +1,11 @@
+-- Weighted full-text document for keyword search (kept in sync with src/utils/postgres.py).
+ALTER TABLE cards ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(name, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(ability_name, '')), 'B')
+    || setweight(
+        to_tsvector('english', coalesce(ability_description, '') || ' ' || coalesce(tags, '')),
+        'C'
+    )
+) STORED;
+
+CREATE INDEX IF NOT EXISTS cards_search_vector_idx ON cards USING GIN (search_vector);
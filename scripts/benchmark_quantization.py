@@ -0,0 +1,271 @@
+"""
+Measure search recall against memory for reduced dimensions and quantized storage.
+
+Vectors come from an exported vector mirror (``make export_mirror``; real model
+embeddings) or, with ``--synthetic``, from hashing embeddings of generated cards.
+``--queries`` random rows are held out as queries and their exact top-k over the
+remaining rows at full dimension and float32 is the ground truth. Every
+combination of ``--dimensions`` (leading components, re-normalized, as OpenAI's
+``dimensions`` parameter returns for ``text-embedding-3-*``) and ``--quantization``
+is then searched exactly the same way and scored by recall@k, next to the bytes it
+stores per vector:
+
+    uv run python -m scripts.benchmark_quantization --mirror .cache/mirrors/<collection>
+    uv run python -m scripts.benchmark_quantization --dimensions 3072 1024 256 --min-recall 0.9
+    uv run python -m scripts.benchmark_quantization --synthetic 20000 --dimension 512
+
+The smallest representation reaching ``--min-recall`` is printed as the
+recommendation; set it as ``dimensions``/``quantization`` on the collection.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from src.config.chroma_config import DEFAULT_CHROMA_CONFIG_PATH, get_default_collection_and_source
+from src.config.settings import settings
+from src.utils.chroma_utils import get_record_batch_reader
+from src.utils.embeddings import create_embedding_function
+from src.utils.quantization import (
+    FLOAT32,
+    QUANTIZATIONS,
+    bytes_per_vector,
+    dequantize,
+    round_trip,
+    truncate_dimensions,
+)
+from src.utils.vector_mirror import VectorMirror, mirror_path, pairwise_distances
+
+from scripts.benchmark_readers import write_synthetic_tsv
+
+DEFAULT_OUTPUT_DIR = settings.cache_dir / "benchmarks"
+# Candidate dimensions below this are not tried by default.
+MIN_DEFAULT_DIMENSIONS = 64
+BLOCK_ROWS = 65_536
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure recall@k against memory for embedding dimensions and quantization."
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--mirror",
+        type=Path,
+        help="Vector mirror to read. Defaults to the mirror of the first configured collection.",
+    )
+    source.add_argument(
+        "--synthetic",
+        type=int,
+        metavar="ROWS",
+        help="Embed this many generated cards with the hashing provider instead (for trying "
+        "the script: hashing vectors are not nested, so only the quantization rows mean much).",
+    )
+    parser.add_argument("--config", type=Path, default=DEFAULT_CHROMA_CONFIG_PATH)
+    parser.add_argument(
+        "--dimension", type=int, default=384, help="Vector size of --synthetic embeddings."
+    )
+    parser.add_argument(
+        "--dimensions",
+        type=int,
+        nargs="+",
+        help="Dimensions to try (default: full size and its halvings down to 64).",
+    )
+    parser.add_argument(
+        "--quantization",
+        nargs="+",
+        choices=QUANTIZATIONS,
+        default=list(QUANTIZATIONS),
+        help="Storage types to try.",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Rows held out as queries.")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours compared per query.")
+    parser.add_argument(
+        "--min-recall",
+        type=float,
+        default=0.95,
+        help="Recall@k the recommended representation must reach.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Results JSON. Defaults to a timestamped file under .cache/benchmarks.",
+    )
+    args = parser.parse_args()
+    if args.queries <= 0 or args.k <= 0:
+        parser.error("--queries and --k must be positive.")
+    if args.dimensions and any(dimensions <= 0 for dimensions in args.dimensions):
+        parser.error("--dimensions must be positive.")
+    return args
+
+
+def load_mirror(path: Path) -> tuple[np.ndarray, str, str]:
+    """Return a mirror's vectors (as float32), its distance space and a label."""
+
+    mirror = VectorMirror(path)
+    vectors = dequantize(mirror.embeddings, mirror.scales)
+    return vectors, mirror.space, f"mirror {path} ({mirror.quantization})"
+
+
+def synthetic_vectors(rows: int, dimension: int, seed: int) -> tuple[np.ndarray, str, str]:
+    """Embed generated cards with the hashing provider (cosine space)."""
+
+    embed = create_embedding_function("hashing", f"hashing-{dimension}")
+    with tempfile.TemporaryDirectory() as tmp:
+        source = write_synthetic_tsv(Path(tmp) / "cards.tsv", rows, seed)
+        documents = [
+            document
+            for batch in get_record_batch_reader("csv")(source, 1000, 0, None)
+            for document in batch.documents
+        ]
+    vectors = np.asarray(embed(documents), dtype=np.float32)
+    return vectors, "cosine", f"{rows} synthetic cards (hashing-{dimension})"
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, space: str, k: int) -> np.ndarray:
+    """Return the ``(len(queries), k)`` row indices of each query's exact nearest rows."""
+
+    best_indices: np.ndarray | None = None
+    best_distances: np.ndarray | None = None
+    for start in range(0, len(corpus), BLOCK_ROWS):
+        block = corpus[start : start + BLOCK_ROWS]
+        distances = pairwise_distances(space, block, queries).T
+        kept = min(k, len(block))
+        top = np.argpartition(distances, kept - 1, axis=1)[:, :kept]
+        indices = top + start
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        if best_indices is None or best_distances is None:
+            best_indices, best_distances = indices, top_distances
+        else:
+            best_indices = np.concatenate([best_indices, indices], axis=1)
+            best_distances = np.concatenate([best_distances, top_distances], axis=1)
+        order = np.argsort(best_distances, axis=1, kind="stable")[:, :k]
+        best_indices = np.take_along_axis(best_indices, order, axis=1)
+        best_distances = np.take_along_axis(best_distances, order, axis=1)
+    return best_indices if best_indices is not None else np.zeros((len(queries), 0), dtype=int)
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    if truth.size == 0:
+        return 1.0
+    hits = sum(len(set(expected) & set(got)) for expected, got in zip(truth, found, strict=True))
+    return hits / truth.size
+
+
+def _default_dimensions(full: int) -> list[int]:
+    dimensions = [full]
+    while dimensions[-1] // 2 >= MIN_DEFAULT_DIMENSIONS:
+        dimensions.append(dimensions[-1] // 2)
+    return dimensions
+
+
+def evaluate(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    space: str,
+    k: int,
+    truth: np.ndarray,
+    dimensions: int,
+    quantization: str,
+) -> dict[str, Any]:
+    started = time.perf_counter()
+    stored = round_trip(truncate_dimensions(corpus, dimensions), quantization)
+    found = exact_top_k(stored, truncate_dimensions(queries, dimensions), space, k)
+    per_vector = bytes_per_vector(dimensions, quantization)
+    full_bytes = bytes_per_vector(corpus.shape[1], FLOAT32)
+    return {
+        "dimensions": dimensions,
+        "quantization": quantization,
+        "recall_at_k": round(recall_at_k(truth, found), 4),
+        "bytes_per_vector": per_vector,
+        "memory_mb": round(len(corpus) * per_vector / (1024 * 1024), 2),
+        "memory_ratio": round(per_vector / full_bytes, 4),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    if args.synthetic is not None:
+        vectors, space, label = synthetic_vectors(args.synthetic, args.dimension, args.seed)
+    else:
+        path = args.mirror
+        if path is None:
+            collection = get_default_collection_and_source(args.config)[0]
+            if not collection:
+                raise ValueError(f"No collections configured in {args.config}; pass --mirror.")
+            path = mirror_path(collection)
+        vectors, space, label = load_mirror(path)
+
+    if len(vectors) <= args.queries:
+        raise ValueError(f"Need more than {args.queries} vectors; {label} has {len(vectors)}.")
+    full = vectors.shape[1]
+    dimensions = sorted(
+        {min(value, full) for value in (args.dimensions or _default_dimensions(full))},
+        reverse=True,
+    )
+
+    rng = np.random.default_rng(args.seed)
+    held_out = np.zeros(len(vectors), dtype=bool)
+    held_out[rng.choice(len(vectors), size=args.queries, replace=False)] = True
+    corpus, queries = vectors[~held_out], vectors[held_out]
+    truth = exact_top_k(corpus, queries, space, args.k)
+    print(
+        f"{label}: {len(corpus)} x {full} vectors ({space}), "
+        f"{len(queries)} queries, recall@{args.k} vs. float32 at {full} dimensions."
+    )
+
+    results = []
+    for dims in dimensions:
+        for quantization in args.quantization:
+            result = evaluate(corpus, queries, space, args.k, truth, dims, quantization)
+            results.append(result)
+            print(
+                f"{dims:>6} dims {quantization:<8} recall@{args.k} {result['recall_at_k']:.4f}  "
+                f"{result['bytes_per_vector']:>6} B/vector  {result['memory_mb']:>9.2f} MB  "
+                f"({result['memory_ratio']:.1%} of float32)"
+            )
+
+    good = [result for result in results if result["recall_at_k"] >= args.min_recall]
+    recommended = min(good, key=lambda result: result["bytes_per_vector"]) if good else None
+    if recommended is None:
+        print(f"\nNo representation reaches recall@{args.k} >= {args.min_recall}.")
+    else:
+        print(
+            f"\nSmallest with recall@{args.k} >= {args.min_recall}: "
+            f'"dimensions": {recommended["dimensions"]}, '
+            f'"quantization": "{recommended["quantization"]}" '
+            f"({recommended['memory_ratio']:.1%} of float32 memory)."
+        )
+
+    output = {
+        "created_at": datetime.now(UTC).isoformat(),
+        "source": label,
+        "space": space,
+        "rows": len(corpus),
+        "settings": {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in vars(args).items()
+            if key != "output"
+        },
+        "results": results,
+        "recommended": recommended,
+    }
+    path = (
+        args.output or DEFAULT_OUTPUT_DIR / f"quantization-{datetime.now(UTC):%Y%m%dT%H%M%SZ}.json"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(output, indent=2), encoding="utf-8")
+    print(f"Results written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
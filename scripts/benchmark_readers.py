@@ -0,0 +1,160 @@
+"""
+Compare the row-by-row and parallel TSV readers on the same file.
+
+Every reader is run end to end (parse, build documents, metadata and content hashes)
+and its output is checked against the row-by-row reader's before timings are
+reported. The parallel reader runs once per ``--workers`` count, to show how it
+scales with cores. Without ``--source`` a synthetic card TSV is generated first:
+
+    uv run python -m scripts.benchmark_readers --rows 200000
+    uv run python -m scripts.benchmark_readers --source data/source/cards_v1.tsv
+    uv run python -m scripts.benchmark_readers --rows 1000000 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import functools
+import os
+import random
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from src.utils.batching import RecordBatch
+from src.utils.chroma_utils import get_record_batch_reader
+from src.utils.parallel import DEFAULT_SHARD_BYTES, iter_record_batches_parallel
+
+TSV_COLUMNS = (
+    "url",
+    "name",
+    "album",
+    "collection",
+    "number",
+    "type",
+    "rarity",
+    "release_date",
+    "energy",
+    "power",
+    "ppe",
+    "ability_name",
+    "ability_description",
+    "tags",
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the csv and parallel TSV readers.")
+    parser.add_argument("--source", type=Path, help="TSV to read (default: generate one).")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows in the synthetic TSV.")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per reader; best is kept.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[os.cpu_count() or 1],
+        help="Process counts to run the parallel reader with (default: CPU count).",
+    )
+    parser.add_argument(
+        "--shard-bytes",
+        type=int,
+        default=DEFAULT_SHARD_BYTES,
+        help="Approximate shard size of the parallel reader.",
+    )
+    args = parser.parse_args()
+    if any(workers <= 0 for workers in args.workers) or args.shard_bytes <= 0:
+        parser.error("--workers and --shard-bytes must be positive.")
+    return args
+
+
+def write_synthetic_tsv(path: Path, rows: int, seed: int = 0) -> Path:
+    """
+    Write a card TSV with realistic shapes: quoted multi-line abilities, missing ids,
+    and unparseable numeric fields mixed in.
+    """
+
+    rng = random.Random(seed)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter="\t")
+        writer.writerow(TSV_COLUMNS)
+        for i in range(rows):
+            writer.writerow(
+                [
+                    f"https://cards.example/{i}" if i % 50 else "",
+                    f'Card {i} "{rng.choice(["Ember", "Frost", "Gale"])}"',
+                    rng.choice(["Alpha", "Beta", "Gamma"]),
+                    rng.choice(["Core", "Promo"]),
+                    str(i) if i % 100 else "",
+                    rng.choice(["Character", "Spell", "Item"]),
+                    rng.choice(["Common", "Rare", "Legendary"]),
+                    f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                    rng.choice(["1", "2", "3", "N/A", ""]),
+                    str(rng.randint(0, 20)),
+                    rng.choice(["1.5", "2", "0.25", "None", ""]),
+                    f"Ability {rng.randint(1, 500)}",
+                    "Deal damage.\nDraw a card. " * rng.randint(1, 12),
+                    ",".join(rng.sample(["fire", "ice", "wind", "rare", "promo"], 2)),
+                ]
+            )
+    return path
+
+
+def time_reader(
+    reader: Callable[..., Iterator[RecordBatch]],
+    source: Path,
+    batch_size: int,
+    repeat: int,
+) -> tuple[float, list]:
+    best = float("inf")
+    batches: list = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        batches = list(reader(source, batch_size))
+        best = min(best, time.perf_counter() - started)
+    return best, batches
+
+
+def main() -> None:
+    args = parse_args()
+
+    readers: dict[str, Callable[..., Iterator[RecordBatch]]] = {
+        "csv": get_record_batch_reader("csv"),
+    }
+    for workers in args.workers:
+        readers[f"parallel/{workers}"] = functools.partial(
+            iter_record_batches_parallel, workers=workers, shard_bytes=args.shard_bytes
+        )
+
+    results: dict[str, tuple[float, list]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.source or write_synthetic_tsv(Path(tmp) / "cards.tsv", args.rows, args.seed)
+        for name, reader in readers.items():
+            results[name] = time_reader(reader, source, args.batch_size, args.repeat)
+
+    csv_seconds, expected = results["csv"]
+    rows = sum(len(batch) for batch in expected)
+    print(f"Rows: {rows} in {len(expected)} batches of {args.batch_size}")
+    all_identical = True
+    for name, (seconds, actual) in results.items():
+        identical = len(expected) == len(actual) and all(
+            a.rows == b.rows
+            and a.ids == b.ids
+            and a.documents == b.documents
+            and a.metadatas == b.metadatas
+            for a, b in zip(expected, actual, strict=False)
+        )
+        all_identical = all_identical and identical
+        print(
+            f"{name + ':':<14}{seconds:.3f}s ({rows / seconds:,.0f} rows/s), "
+            f"{csv_seconds / seconds:.2f}x csv, identical output: {identical}"
+        )
+    if not all_identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Check the CLI's cold-start cost against a fixed budget with ``python -X importtime``.
+
+Each target module is imported in a fresh interpreter (best of ``--repeat``) and its
+total import time is the sum of every module's self time in the ``-X importtime``
+report. ``src.cli`` must stay within ``--budget-ms``; the job modules each command
+loads are reported for reference, with their slowest packages:
+
+    uv run python -m scripts.benchmark_startup
+    uv run python -m scripts.benchmark_startup --budget-ms 150 --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGETED_MODULE = "src.cli"
+DEFAULT_BUDGET_MS = 200.0
+# Modules each CLI command imports when it runs.
+COMMAND_MODULES = {
+    "create/sync": "src.jobs.create_chroma_collections",
+    "report": "src.jobs.report",
+    "remove": "src.jobs.remove_collection",
+    "query": "src.jobs.query",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure CLI and job import times.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Import-time budget for {BUDGETED_MODULE} in milliseconds.",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per module; best is kept.")
+    parser.add_argument("--top", type=int, default=5, help="Slowest packages listed per module.")
+    parser.add_argument(
+        "--skip-commands",
+        action="store_true",
+        help=f"Only measure {BUDGETED_MODULE}, not the job modules.",
+    )
+    return parser.parse_args()
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    # The jobs import both ``src.*`` and ``utils.*`` (src/ is the package root when installed).
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(ROOT), str(ROOT / "src"), env.get("PYTHONPATH")])
+    )
+    return env
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Import ``module`` in a fresh interpreter; return self time (us) per imported module."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = times.get(name.strip(), 0) + int(self_us)
+    return times
+
+
+def measure(module: str, repeat: int) -> tuple[float, dict[str, int]]:
+    """Return the best total import time (ms) of ``module`` and that run's breakdown."""
+
+    best_ms, best_times = float("inf"), {}
+    for _ in range(repeat):
+        times = import_times(module)
+        total_ms = sum(times.values()) / 1000
+        if total_ms < best_ms:
+            best_ms, best_times = total_ms, times
+    return best_ms, best_times
+
+
+def _slowest(times: dict[str, int], top: int) -> str:
+    """The top-level packages that took longest to import, with all their submodules."""
+
+    packages: dict[str, int] = {}
+    for name, us in times.items():
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + us
+    ranked = sorted(packages.items(), key=lambda item: -item[1])[:top]
+    return ", ".join(f"{name} {us / 1000:.0f} ms" for name, us in ranked)
+
+
+def main() -> None:
+    args = parse_args()
+
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", BUDGETED_MODULE, "--help"],
+        cwd=ROOT,
+        env=_env(),
+        capture_output=True,
+        check=True,
+    )
+    help_ms = (time.perf_counter() - started) * 1000
+
+    cli_ms, cli_times = measure(BUDGETED_MODULE, args.repeat)
+    within = cli_ms <= args.budget_ms
+    print(
+        f"{BUDGETED_MODULE}: {cli_ms:.0f} ms of imports (budget {args.budget_ms:.0f} ms) "
+        f"{'OK' if within else 'OVER BUDGET'}; `--help` took {help_ms:.0f} ms wall clock."
+    )
+    print(f"  slowest: {_slowest(cli_times, args.top)}")
+
+    if not args.skip_commands:
+        for command, module in COMMAND_MODULES.items():
+            total_ms, times = measure(module, args.repeat)
+            print(f"{command:<12} {module}: {total_ms:.0f} ms of imports")
+            print(f"  slowest: {_slowest(times, args.top)}")
+
+    if not within:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Benchmark ingestion, reporting and queries offline against an in-process Chroma.
+
+For each scale a synthetic card TSV is generated and ingested with
+``populate_collection_from_tsv`` using a deterministic fake embedder (configurable
+dimension and per-request latency, so no API key or network is needed). Then
+``report`` and three query paths run against the result: one query per request,
+batched queries, and a metadata-filtered search. Throughput, p50/p99 latency and
+peak memory are written to JSON; pass an earlier run as ``--baseline`` to compare:
+
+    uv run python -m scripts.benchmark_suite --rows 1000 10000 100000
+    uv run python -m scripts.benchmark_suite --latency-ms 50 --output .cache/benchmarks/baseline.json
+    uv run python -m scripts.benchmark_suite --baseline .cache/benchmarks/baseline.json
+
+Peak RSS is the process high-water mark when each benchmark finished, so it only
+grows across a run (scales run smallest first). ``--trace-memory`` adds the peak of
+Python allocations within each benchmark, at a noticeable cost in speed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import chromadb
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from src.config.settings import settings
+from src.utils.chroma_utils import populate_collection_from_tsv, report
+from src.utils.facets import FacetIndex
+from src.utils.filters import parse_filter, plan_filter
+from src.utils.metrics import IngestMetrics
+from src.utils.search import QueryRequest, search_batches
+
+from scripts.benchmark_readers import write_synthetic_tsv
+from scripts.fake_embedding_server import fake_embedding
+
+DEFAULT_OUTPUT_DIR = settings.cache_dir / "benchmarks"
+DEFAULT_FILTER = "rarity=Legendary, album=Alpha"
+# (metric, True when higher is better) compared against a baseline.
+COMPARED_METRICS = (
+    ("rows_per_second", True),
+    ("queries_per_second", True),
+    ("p50_ms", False),
+    ("p99_ms", False),
+    ("peak_rss_mb", False),
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark ingest, report and query paths on synthetic cards."
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000],
+        help="Synthetic TSV sizes to benchmark, e.g. 1000 10000 100000 1000000.",
+    )
+    parser.add_argument("--dimension", type=int, default=256, help="Fake embedding length.")
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated latency of every embedding request, in milliseconds.",
+    )
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200, help="Queries per query benchmark.")
+    parser.add_argument("--query-batch-size", type=int, default=64)
+    parser.add_argument("--n-results", type=int, default=10)
+    parser.add_argument("--filter", default=DEFAULT_FILTER, help="Filter for the filtered query.")
+    parser.add_argument("--report-repeat", type=int, default=20, help="Timed report() calls.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Also record each benchmark's peak Python allocations (slower).",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Results JSON. Defaults to a timestamped file under .cache/benchmarks.",
+    )
+    parser.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Relative change vs. the baseline reported as a regression (default 0.15).",
+    )
+    args = parser.parse_args()
+    if any(rows <= 0 for rows in args.rows):
+        parser.error("--rows must be positive.")
+    return args
+
+
+class FakeEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Deterministic unit vectors per text, after a fixed delay per request."""
+
+    def __init__(self, dimension: int = 256, latency: float = 0.0) -> None:
+        self.dimension = dimension
+        self.latency = latency
+        self.requests = 0
+
+    def __call__(self, input: Documents) -> Embeddings:  # noqa: A002 - matches Chroma's API
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [fake_embedding(text, self.dimension) for text in input]
+
+    @staticmethod
+    def name() -> str:
+        return "benchmark-fake"
+
+    def get_config(self) -> dict[str, Any]:
+        return {"dimension": self.dimension, "latency": self.latency}
+
+    @staticmethod
+    def build_from_config(config: dict[str, Any]) -> FakeEmbeddingFunction:
+        return FakeEmbeddingFunction(config["dimension"], config["latency"])
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _latency_summary(seconds: list[float]) -> dict[str, float]:
+    if not seconds:
+        return {"p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    p50, p99 = np.percentile(seconds, [50, 99])
+    return {
+        "p50_ms": round(float(p50) * 1000, 3),
+        "p99_ms": round(float(p99) * 1000, 3),
+        "max_ms": round(max(seconds) * 1000, 3),
+    }
+
+
+@contextmanager
+def _measure(result: dict[str, Any], trace_memory: bool) -> Iterator[None]:
+    """Add the block's wall time and peak memory to ``result``."""
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        result["seconds"] = round(time.perf_counter() - started, 4)
+        if trace_memory:
+            result["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+            tracemalloc.stop()
+        result["peak_rss_mb"] = _peak_rss_mb()
+
+
+def bench_ingest(
+    args: argparse.Namespace, collection: Any, embedder: FakeEmbeddingFunction
+) -> dict[str, Any]:
+    metrics = IngestMetrics()
+    result: dict[str, Any] = {"benchmark": "ingest"}
+    with _measure(result, args.trace_memory):
+        written = populate_collection_from_tsv(
+            collection,
+            batch_size=args.batch_size,
+            embedding_function=embedder,
+            max_concurrency=args.max_concurrency,
+            metrics=metrics,
+        )
+    summary = metrics.summary()
+    result.update(
+        rows_written=written,
+        rows_per_second=round(written / result["seconds"], 1),
+        tokens_per_second=summary["tokens_per_second"],
+        embedding_requests=embedder.requests,
+        max_in_flight=summary["max_in_flight"],
+        # Latency of one Chroma write; the other stages are broken down below.
+        **_latency_summary(metrics.stages["write"].durations),
+        stages={
+            name: {key: stage[key] for key in ("seconds", "rows_per_second", "p50_ms", "p95_ms")}
+            for name, stage in summary["stages"].items()
+        },
+    )
+    return result
+
+
+def bench_report(args: argparse.Namespace, client: Any) -> dict[str, Any]:
+    latencies: list[float] = []
+    result: dict[str, Any] = {"benchmark": "report"}
+    with _measure(result, args.trace_memory):
+        for _ in range(args.report_repeat):
+            started = time.perf_counter()
+            report(client)
+            latencies.append(time.perf_counter() - started)
+    result.update(calls=len(latencies), **_latency_summary(latencies))
+    return result
+
+
+def _query_texts(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    words = ["Ember", "Frost", "Gale", "damage", "draw", "card", "fire", "ice", "wind", "rare"]
+    return [" ".join(rng.sample(words, rng.randint(1, 4))) for _ in range(count)]
+
+
+def bench_queries(
+    args: argparse.Namespace,
+    name: str,
+    collection: Any,
+    embed: Callable[[list[str]], Any],
+    batch_size: int,
+    **search: Any,
+) -> dict[str, Any]:
+    """Time ``search_batches`` per request (one group of ``batch_size`` queries)."""
+
+    queries = [
+        QueryRequest(id=str(i), text=text)
+        for i, text in enumerate(_query_texts(args.queries, args.seed))
+    ]
+    latencies: list[float] = []
+    result: dict[str, Any] = {"benchmark": name, "batch_size": batch_size}
+    with _measure(result, args.trace_memory):
+        batches = search_batches(
+            collection,
+            queries,
+            n_results=args.n_results,
+            batch_size=batch_size,
+            embed_queries=embed,
+            **search,
+        )
+        while True:
+            started = time.perf_counter()
+            if next(batches, None) is None:
+                break
+            latencies.append(time.perf_counter() - started)
+    result.update(
+        queries=len(queries),
+        queries_per_second=round(len(queries) / result["seconds"], 1),
+        **_latency_summary(latencies),
+    )
+    return result
+
+
+def run_scale(
+    args: argparse.Namespace, client: Any, source: Path, rows: int
+) -> list[dict[str, Any]]:
+    embedder = FakeEmbeddingFunction(args.dimension, args.latency_ms / 1000)
+    name = f"benchmark_{rows}"
+    collection = client.create_collection(
+        name=name,
+        metadata={
+            "source": str(source),
+            "provider": "fake",
+            "embedding_model": f"fake-{args.dimension}",
+            "hnsw:space": "cosine",
+        },
+        embedding_function=embedder,
+    )
+    try:
+        results = [bench_ingest(args, collection, embedder), bench_report(args, client)]
+
+        # Queries are embedded directly, without the simulated latency.
+        embed = FakeEmbeddingFunction(args.dimension)
+        results.append(bench_queries(args, "query", collection, embed, batch_size=1))
+        results.append(
+            bench_queries(args, "query_batched", collection, embed, args.query_batch_size)
+        )
+        facets = FacetIndex.from_metadata(client.get_collection(name).metadata)
+        plan = plan_filter(parse_filter(args.filter, facets), facets, args.n_results)
+        filtered = bench_queries(
+            args,
+            "query_filtered",
+            collection,
+            embed,
+            args.query_batch_size,
+            where=plan.where,
+            strategy=plan.strategy,
+        )
+        filtered["plan"] = plan.describe()
+        results.append(filtered)
+    finally:
+        client.delete_collection(name)
+
+    for result in results:
+        result["rows"] = rows
+    return results
+
+
+def compare(results: list[dict[str, Any]], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Print each compared metric against the baseline; return the regressions."""
+
+    previous = {(r["benchmark"], r["rows"]): r for r in baseline.get("results", [])}
+    regressions: list[str] = []
+    print(f"\nCompared with baseline from {baseline.get('created_at', '?')}:")
+    for result in results:
+        before = previous.get((result["benchmark"], result["rows"]))
+        if before is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = -change > tolerance if higher_is_better else change > tolerance
+            label = f"{result['benchmark']}@{result['rows']} {metric}"
+            marker = "  REGRESSION" if regressed else ""
+            print(f"  {label}: {old} -> {new} ({change:+.1%}){marker}")
+            if regressed:
+                regressions.append(label)
+    return regressions
+
+
+def _describe(result: dict[str, Any]) -> str:
+    rate = (
+        f"{result['rows_per_second']:,.0f} rows/s"
+        if "rows_per_second" in result
+        else f"{result['queries_per_second']:,.0f} queries/s"
+        if "queries_per_second" in result
+        else f"{result['calls']} calls"
+    )
+    return (
+        f"{result['benchmark']:<15} {result['rows']:>9} rows  {rate:>16}  "
+        f"p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+        f"peak RSS {result['peak_rss_mb']} MB"
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    client = chromadb.EphemeralClient()
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sorted(args.rows):
+            started = time.perf_counter()
+            source = write_synthetic_tsv(Path(tmp) / f"cards_{rows}.tsv", rows, args.seed)
+            print(f"Generated {rows} rows in {time.perf_counter() - started:.1f}s.")
+            for result in run_scale(args, client, source, rows):
+                print(_describe(result))
+                results.append(result)
+
+    output = {
+        "created_at": datetime.now(UTC).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "chromadb": chromadb.__version__,
+        },
+        "settings": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "baseline", "tolerance")
+        },
+        "results": results,
+    }
+    path = args.output or DEFAULT_OUTPUT_DIR / f"benchmark-{datetime.now(UTC):%Y%m%dT%H%M%SZ}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(output, indent=2), encoding="utf-8")
+    print(f"\nResults written to {path}.")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}.")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Local OpenAI-compatible embeddings server for exercising retries and rate limits.
+
+Serves ``POST /v1/embeddings`` with deterministic vectors derived from each input's
+hash, and injects ``429 Too Many Requests`` (with ``Retry-After``) or ``503`` errors
+at configurable rates. Point the jobs at it with ``OPENAI_API_BASE``:
+
+    uv run python -m scripts.fake_embedding_server --port 8765 --rate-limit-every 3
+    OPENAI_API_BASE=http://127.0.0.1:8765/v1 uv run python -m src.jobs.create_chroma_collections
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import numpy as np
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fake OpenAI embeddings server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dimension", type=int, default=1536, help="Vector length returned.")
+    parser.add_argument(
+        "--rate-limit-every",
+        type=int,
+        default=0,
+        help="Answer every Nth request with a 429 (0 disables).",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Probability of answering a request with a 503.",
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=float,
+        default=1.0,
+        help="Seconds sent in the Retry-After header of 429 responses.",
+    )
+    return parser.parse_args()
+
+
+def fake_embedding(text: str, dimension: int) -> np.ndarray:
+    """Return a deterministic unit vector for a text."""
+
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _FakeServer
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return
+
+    def _send_json(self, status: int, payload: dict[str, Any], headers: dict[str, str]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:  # noqa: N802
+        if not self.path.rstrip("/").endswith("/embeddings"):
+            self._send_json(404, {"error": {"message": "not found"}}, {})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        injected = self.server.next_fault()
+        if injected == 429:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached", "type": "requests"}},
+                {"Retry-After": str(self.server.retry_after)},
+            )
+            return
+        if injected == 503:
+            self._send_json(503, {"error": {"message": "Service unavailable"}}, {})
+            return
+
+        inputs = request.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimension = int(request.get("dimensions") or self.server.dimension)
+        as_base64 = request.get("encoding_format") == "base64"
+
+        data = []
+        tokens = 0
+        for index, text in enumerate(inputs):
+            vector = fake_embedding(str(text), dimension)
+            tokens += len(str(text).split())
+            embedding: Any = (
+                base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+                if as_base64
+                else vector.tolist()
+            )
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+        self._send_json(
+            200,
+            {
+                "object": "list",
+                "data": data,
+                "model": request.get("model", "fake"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            },
+            {},
+        )
+
+
+class _FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        dimension: int,
+        rate_limit_every: int,
+        error_rate: float,
+        retry_after: float,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.dimension = dimension
+        self.rate_limit_every = rate_limit_every
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def next_fault(self) -> int | None:
+        with self._lock:
+            self.requests += 1
+            count = self.requests
+        if self.rate_limit_every and count % self.rate_limit_every == 0:
+            return 429
+        if self.error_rate and random.random() < self.error_rate:
+            return 503
+        return None
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    dimension: int = 1536,
+    rate_limit_every: int = 0,
+    error_rate: float = 0.0,
+    retry_after: float = 1.0,
+) -> _FakeServer:
+    """Start the server on a background thread and return it (call ``shutdown()`` to stop)."""
+
+    server = _FakeServer((host, port), dimension, rate_limit_every, error_rate, retry_after)
+    threading.Thread(target=server.serve_forever, name="fake-embeddings", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    args = parse_args()
+    server = _FakeServer(
+        (args.host, args.port),
+        args.dimension,
+        args.rate_limit_every,
+        args.error_rate,
+        args.retry_after,
+    )
+    print(f"Fake embeddings server listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Single entry point for the maintenance jobs: ``python -m src.cli <command> [options]``.
+
+Only typer is imported at startup. Each command imports its job module (and with
+it chromadb, pandas, psycopg, ...) when it runs, so ``--help`` and dispatch stay
+fast for cron and health checks. Options after the command are passed to the job
+unchanged; ``<command> --help`` lists them.
+"""
+
+from __future__ import annotations
+
+import typer
+
+app = typer.Typer(
+    help="Chroma card-data maintenance jobs.",
+    no_args_is_help=True,
+    add_completion=False,
+)
+
+# The job's own argparse parser handles every option, including --help.
+_PASSTHROUGH = {"allow_extra_args": True, "ignore_unknown_options": True}
+
+
+@app.command(context_settings=_PASSTHROUGH, add_help_option=False)
+def create(ctx: typer.Context) -> None:
+    """Create (or refresh) collections from the Chroma config."""
+
+    from src.jobs import create_chroma_collections
+
+    create_chroma_collections.main(ctx.args)
+
+
+@app.command(context_settings=_PASSTHROUGH, add_help_option=False)
+def sync(ctx: typer.Context) -> None:
+    """Upsert new/changed rows and delete vanished ones (create --sync)."""
+
+    from src.jobs import create_chroma_collections
+
+    create_chroma_collections.main(["--sync", *ctx.args])
+
+
+@app.command(context_settings=_PASSTHROUGH, add_help_option=False)
+def report(ctx: typer.Context) -> None:
+    """Summarize collections: counts, dimensions, models and sources."""
+
+    from src.jobs import report as report_job
+
+    report_job.main(ctx.args)
+
+
+@app.command(context_settings=_PASSTHROUGH, add_help_option=False)
+def remove(ctx: typer.Context) -> None:
+    """Delete a collection by name or index (or --all)."""
+
+    from src.jobs import remove_collection
+
+    remove_collection.main(ctx.args)
+
+
+@app.command(context_settings=_PASSTHROUGH, add_help_option=False)
+def query(ctx: typer.Context) -> None:
+    """Run semantic (or hybrid) searches against a collection or its mirror."""
+
+    from src.jobs import query as query_job
+
+    query_job.main(ctx.args)
+
+
+if __name__ == "__main__":
+    app()
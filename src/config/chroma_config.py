@@ -5,9 +5,11 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from src.utils.batching import DEFAULT_MAX_BATCH_ITEMS, DEFAULT_MAX_BATCH_TOKENS
 from src.utils.chroma_utils import build_embedding_function
 from src.utils.collections import build_collection_name
-
+from src.utils.embeddings import available_providers
+from src.utils.quantization import FLOAT32, QUANTIZATION_KEY, check_quantization
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 DEFAULT_CHROMA_CONFIG_PATH = ROOT_DIR / "docker/chroma/chroma.config.json"
@@ -22,11 +24,16 @@ class CollectionConfig:
     embedding_model: str
     variant: str | None = None
     batch_size: int = 200
+    max_concurrency: int = 4
+    max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS
+    max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS
+    dimensions: int | None = None
+    quantization: str = FLOAT32
     name: str | None = None
     metadata: dict[str, Any] = field(default_factory=dict)
 
     @classmethod
-    def from_dict(cls, raw: dict[str, Any], base_dir: Path) -> "CollectionConfig":
+    def from_dict(cls, raw: dict[str, Any], base_dir: Path) -> CollectionConfig:
         if "source_path" not in raw:
             raise ValueError("Collection config requires a 'source_path'.")
 
@@ -43,15 +50,31 @@ class CollectionConfig:
 
         provider = str(provider_raw).strip()
         embedding_model = str(embedding_model_raw).strip()
+        if provider not in available_providers():
+            raise ValueError(
+                f"Unknown embedding provider '{provider}'; "
+                f"expected one of {', '.join(available_providers())}."
+            )
         variant = raw.get("variant")
         name = raw.get("name")
         batch_size = int(raw.get("batch_size") or 200)
+        max_concurrency = int(raw.get("max_concurrency") or 4)
+        max_batch_tokens = int(raw.get("max_batch_tokens") or DEFAULT_MAX_BATCH_TOKENS)
+        max_batch_items = int(raw.get("max_batch_items") or DEFAULT_MAX_BATCH_ITEMS)
+        dimensions = int(raw["dimensions"]) if raw.get("dimensions") else None
+        quantization = check_quantization(raw.get("quantization"))
         metadata = raw.get("metadata") or {}
 
         if not isinstance(metadata, dict):
             raise ValueError("Collection metadata must be a JSON object.")
         if batch_size <= 0:
             raise ValueError("batch_size must be positive.")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive.")
+        if max_batch_tokens <= 0 or max_batch_items <= 0:
+            raise ValueError("max_batch_tokens and max_batch_items must be positive.")
+        if dimensions is not None and dimensions <= 0:
+            raise ValueError("dimensions must be positive.")
 
         return cls(
             source_path=source_path,
@@ -59,6 +82,11 @@ class CollectionConfig:
             embedding_model=embedding_model,
             variant=variant,
             batch_size=batch_size,
+            max_concurrency=max_concurrency,
+            max_batch_tokens=max_batch_tokens,
+            max_batch_items=max_batch_items,
+            dimensions=dimensions,
+            quantization=quantization,
             name=name,
             metadata=metadata,
         )
@@ -81,13 +109,17 @@ class CollectionConfig:
     def collection_metadata(self) -> dict[str, Any]:
         """Build metadata payload attached to the Chroma collection."""
 
-        metadata = {
+        metadata: dict[str, Any] = {
             "source": str(self.source_path),
             "provider": self.provider,
             "embedding_model": self.embedding_model,
         }
         if self.variant:
             metadata["variant"] = self.variant
+        if self.dimensions:
+            metadata["dimensions"] = self.dimensions
+        if self.quantization != FLOAT32:
+            metadata[QUANTIZATION_KEY] = self.quantization
         metadata.update(self.metadata)
         return metadata
 
@@ -98,6 +130,46 @@ class CollectionConfig:
         return build_embedding_function(
             provider=self.provider,
             model=self.embedding_model,
+            dimensions=self.dimensions,
+        )
+
+
+@dataclass(slots=True)
+class RateLimitConfig:
+    """Provider quota for one embedding model (or every model of a provider)."""
+
+    provider: str
+    embedding_model: str | None = None
+    requests_per_minute: float | None = None
+    tokens_per_minute: float | None = None
+    max_retries: int = 6
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> RateLimitConfig:
+        provider = str(raw.get("provider") or "").strip()
+        if not provider:
+            raise ValueError("Rate limit config requires a 'provider'.")
+
+        embedding_model = raw.get("embedding_model")
+        requests_per_minute = raw.get("requests_per_minute")
+        tokens_per_minute = raw.get("tokens_per_minute")
+        max_retries = int(raw.get("max_retries", 6))
+
+        for label, value in (
+            ("requests_per_minute", requests_per_minute),
+            ("tokens_per_minute", tokens_per_minute),
+        ):
+            if value is not None and float(value) <= 0:
+                raise ValueError(f"{label} must be positive.")
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative.")
+
+        return cls(
+            provider=provider,
+            embedding_model=str(embedding_model).strip() if embedding_model else None,
+            requests_per_minute=float(requests_per_minute) if requests_per_minute else None,
+            tokens_per_minute=float(tokens_per_minute) if tokens_per_minute else None,
+            max_retries=max_retries,
         )
 
 
@@ -106,9 +178,23 @@ class ChromaConfig:
     """Top-level Chroma configuration parsed from JSON."""
 
     collections: list[CollectionConfig] = field(default_factory=list)
+    rate_limits: list[RateLimitConfig] = field(default_factory=list)
+
+    def rate_limit_for(self, provider: str, embedding_model: str) -> RateLimitConfig | None:
+        """Return the most specific rate limit for a provider/model, if configured."""
+
+        provider_wide = None
+        for limit in self.rate_limits:
+            if limit.provider != provider:
+                continue
+            if limit.embedding_model == embedding_model:
+                return limit
+            if limit.embedding_model is None:
+                provider_wide = limit
+        return provider_wide
 
     @classmethod
-    def from_path(cls, config_path: Path | str | None = None) -> "ChromaConfig":
+    def from_path(cls, config_path: Path | str | None = None) -> ChromaConfig:
         config_path = resolve_config_path(config_path)
 
         if not config_path.exists():
@@ -126,11 +212,16 @@ class ChromaConfig:
         if not isinstance(collections_data, list):
             raise ValueError("'collections' must be a list inside 'chroma'.")
 
+        rate_limits_data = chroma_data.get("rate_limits", [])
+        if not isinstance(rate_limits_data, list):
+            raise ValueError("'rate_limits' must be a list inside 'chroma'.")
+
         collections = [
             CollectionConfig.from_dict(raw, base_dir=ROOT_DIR)
             for raw in collections_data
         ]
-        return cls(collections=collections)
+        rate_limits = [RateLimitConfig.from_dict(raw) for raw in rate_limits_data]
+        return cls(collections=collections, rate_limits=rate_limits)
 
 
 def resolve_config_path(config_path: Path | str | None = None) -> Path:
@@ -2,20 +2,57 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+ROOT_DIR = Path(__file__).resolve().parents[2]
+
 
 class Settings(BaseSettings):
     """Central configuration loaded from .env."""
 
     chroma_openai_api_key: str = "your-openai-api-key"
     openai_api_key: str = "your-openai-api-key"
+    openai_api_base: str | None = None
     embeddings_provider: str = "openai"
     embeddings_model: str = "text-embedding-3-small"
 
+    # Local embedding provider (sentence-transformers models on disk)
+    local_models_dir: Path = ROOT_DIR / "models"
+    local_embedding_device: str = "cpu"
+    local_embedding_batch_size: int = 64
+    local_embedding_threads: int | None = None
+
     # Chroma service
     chroma_host: str = "127.0.0.1"
     chroma_port: int = 8000
+    # HTTP connection pool shared by every request of an async client, and the
+    # number of requests the async jobs keep in flight on it.
+    chroma_http_max_connections: int = 64
+    chroma_http_max_keepalive_connections: int = 64
+    chroma_http_keepalive_secs: float = 60.0
+    chroma_async_max_concurrency: int = 32
+    # How long collections replaced by a blue/green rebuild are kept before deletion.
+    collection_gc_grace_secs: float = 3600.0
+
+    # Postgres (card table used for keyword search)
+    postgres_host: str = "127.0.0.1"
+    postgres_port: int = 56432
+    postgres_db: str = "cuecards"
+    postgres_user: str = "cuecards"
+    postgres_password: str = "cuecards"
+
+    # Processes used by the parallel TSV reader (--reader parallel); defaults to the CPU count.
+    tsv_reader_workers: int | None = None
+
+    # Local caches
+    cache_dir: Path = ROOT_DIR / ".cache"
+    embedding_cache_max_bytes: int = 1024 * 1024 * 1024
+    query_cache_max_entries: int = 10_000
+    query_cache_max_bytes: int = 256 * 1024 * 1024
+    result_cache_max_entries: int = 10_000
+    result_cache_max_bytes: int = 64 * 1024 * 1024
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import argparse
-import os
+import asyncio
+import contextlib
+from collections import defaultdict
 from pathlib import Path
+from typing import Any
 
 import chromadb
 from chromadb.api import ClientAPI
-from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
+from chromadb.api.types import Documents, EmbeddingFunction
+from tqdm import tqdm
 from src.config.chroma_config import (
     DEFAULT_CHROMA_CONFIG_PATH,
     ChromaConfig,
@@ -16,10 +20,36 @@ from src.config.chroma_config import (
     load_chroma_config,
 )
 from src.config.settings import settings
-from utils.chroma_utils import populate_collection_from_tsv, report
+from src.utils.aliases import (
+    DEFAULT_GC_GRACE_SECS,
+    collect_garbage,
+    is_build_of,
+    resolve_alias,
+    retire_collection,
+    swap_alias,
+    versioned_name,
+)
+from src.utils.async_chroma import (
+    bump_content_version_async,
+    connect_async,
+    get_collection_with_embedding_async,
+    ingest_source_async,
+)
+from src.utils.batching import BatchSizeStats
+from src.utils.checkpoint import Checkpoint, CheckpointStore, source_fingerprint
+from src.utils.embedding_cache import EmbeddingCache
+from src.utils.metrics import IngestMetrics, default_summary_path
+from src.utils.rate_limit import EmbeddingScheduler, RetryPolicy
+from utils.chroma_utils import (
+    IngestTarget,
+    bump_content_version,
+    count_source_records,
+    ingest_source,
+    report,
+)
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Create (or refresh) Chroma collections from JSON config."
     )
@@ -29,12 +59,83 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_CHROMA_CONFIG_PATH,
         help="Path to Chroma collections config file (JSON). Defaults to docker/chroma/chroma.config.json.",
     )
-    parser.add_argument(
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
         "--rebuild",
         action="store_true",
-        help="Delete and recreate each collection before ingesting.",
+        help="Build each collection anew in a versioned collection and switch its alias to it "
+        "once the build is complete; readers keep the old one until then.",
+    )
+    mode.add_argument(
+        "--sync",
+        action="store_true",
+        help="Upsert new/changed rows and delete vanished ones instead of appending everything.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue interrupted runs from their last committed batch (source must be unchanged).",
+    )
+    parser.add_argument(
+        "--gc-grace-secs",
+        type=float,
+        default=DEFAULT_GC_GRACE_SECS,
+        help="Collections replaced by a rebuild longer ago than this are deleted after the run.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=(
+            "Bypass the on-disk embedding cache; documents are still embedded client-side "
+            "through the provider's scheduler."
+        ),
+    )
+    parser.add_argument(
+        "--reader",
+        choices=("csv", "parallel"),
+        default="csv",
+        help="TSV parser: row-by-row csv (default) or byte-range shards parsed on a process pool "
+        "(scales with cores).",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help="Cap on in-flight embedding requests per source, shared by all of its collections.",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Show a live progress bar of rows written.",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        help="Where to write the JSON run summary. Defaults to a timestamped file under the cache dir.",
+    )
+    parser.add_argument(
+        "--prometheus-textfile",
+        type=Path,
+        default=None,
+        help="Also write run metrics to this file for node_exporter's textfile collector (*.prom).",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Write with the async client on one event loop (append/rebuild runs only).",
+    )
+    args = parser.parse_args(argv)
+    if args.max_concurrency is not None and args.max_concurrency <= 0:
+        parser.error("--max-concurrency must be positive.")
+    if args.gc_grace_secs < 0:
+        parser.error("--gc-grace-secs must not be negative.")
+    if args.resume and args.sync:
+        parser.error("--sync runs only write changed rows and need no --resume.")
+    if args.use_async and (args.sync or args.resume):
+        parser.error("--async supports append and --rebuild runs, not --sync or --resume.")
+    return args
 
 
 def _ensure_source_exists(collection_cfg: CollectionConfig) -> None:
@@ -42,30 +143,98 @@ def _ensure_source_exists(collection_cfg: CollectionConfig) -> None:
         raise FileNotFoundError(f"Source file not found: {collection_cfg.source_path}")
 
 
-def _ensure_openai_key() -> None:
-    """Ensure the OpenAI key is present in the environment for the embedding function."""
+def _get_scheduler(
+    chroma_config: ChromaConfig,
+    collection_cfg: CollectionConfig,
+    embedding_fn: EmbeddingFunction[Documents],
+    schedulers: dict[tuple[str, str], EmbeddingScheduler],
+) -> EmbeddingScheduler:
+    """Return the scheduler shared by every collection using this provider/model."""
+
+    key = (collection_cfg.provider, collection_cfg.embedding_model)
+    if key not in schedulers:
+        limit = chroma_config.rate_limit_for(*key)
+        schedulers[key] = EmbeddingScheduler(
+            embedding_fn,
+            requests_per_minute=limit.requests_per_minute if limit else None,
+            tokens_per_minute=limit.tokens_per_minute if limit else None,
+            retry=RetryPolicy(max_retries=limit.max_retries) if limit else None,
+        )
+    return schedulers[key]
+
+
+def _load_resume_checkpoint(
+    checkpoints: CheckpointStore,
+    collection_cfg: CollectionConfig,
+    name: str,
+) -> Checkpoint | None:
+    """Return collection ``name``'s checkpoint, refusing to resume against a changed source."""
 
-    key = settings.chroma_openai_api_key or settings.openai_api_key
-    if key:
-        os.environ.setdefault("CHROMA_OPENAI_API_KEY", key)
-        os.environ.setdefault("OPENAI_API_KEY", key)
+    checkpoint = checkpoints.load(name)
+    if checkpoint is None:
+        return None
 
-    if not os.getenv("CHROMA_OPENAI_API_KEY") and not os.getenv("OPENAI_API_KEY"):
+    source = collection_cfg.source_path
+    if Path(checkpoint.source) != source or checkpoint.fingerprint != source_fingerprint(source):
         raise ValueError(
-            "OpenAI API key missing. Set CHROMA_OPENAI_API_KEY or OPENAI_API_KEY in your environment."
+            f"Source {source} changed since the checkpoint for "
+            f"'{checkpoint.collection}' was written; rerun with --rebuild or --sync instead of --resume."
         )
+    return checkpoint
 
 
-def _create_or_refresh_collection(
+def _write_target(
     client: ClientAPI,
+    checkpoints: CheckpointStore,
     collection_cfg: CollectionConfig,
     rebuild: bool,
-) -> int:
-    name = collection_cfg.collection_name
+    resume: bool,
+) -> tuple[str, Checkpoint | None]:
+    """
+    Return the collection to write and the checkpoint to resume it from, if any.
+
+    Appends and syncs write to the collection the configured name is an alias of
+    (or the collection of that name). A rebuild writes a new versioned build; with
+    ``resume`` it continues the newest unpublished build that has a checkpoint.
+    """
+
+    alias = collection_cfg.collection_name
+    live = resolve_alias(client, alias)
+    if not rebuild:
+        checkpoint = _load_resume_checkpoint(checkpoints, collection_cfg, live) if resume else None
+        return live, checkpoint
+    if resume:
+        builds = sorted(
+            (
+                col.name
+                for col in client.list_collections()
+                if is_build_of(col.name, alias) and col.name != live
+            ),
+            reverse=True,
+        )
+        for name in builds:
+            checkpoint = _load_resume_checkpoint(checkpoints, collection_cfg, name)
+            if checkpoint is not None:
+                return name, checkpoint
+    return versioned_name(alias), None
+
+
+def _prepare_collection(
+    client: ClientAPI,
+    chroma_config: ChromaConfig,
+    collection_cfg: CollectionConfig,
+    name: str,
+    rebuild: bool,
+    sync: bool,
+    schedulers: dict[tuple[str, str], EmbeddingScheduler],
+    checkpoint: Checkpoint | None = None,
+) -> IngestTarget:
     metadata = collection_cfg.collection_metadata
 
     _ensure_source_exists(collection_cfg)
-    print(f"\n==> Preparing collection '{name}'")
+    print(f"\n==> Preparing collection '{collection_cfg.collection_name}'")
+    if name != collection_cfg.collection_name:
+        print(f"    Writing to: {name}")
     print(f"    Source: {collection_cfg.source_path}")
     print(
         f"    Provider/model: {collection_cfg.provider} / {collection_cfg.embedding_model}"
@@ -73,18 +242,17 @@ def _create_or_refresh_collection(
     if collection_cfg.variant:
         print(f"    Variant: {collection_cfg.variant}")
     print(f"    Batch size: {collection_cfg.batch_size}")
+    print(f"    Max concurrency: {collection_cfg.max_concurrency}")
 
-    if rebuild:
-        try:
-            client.delete_collection(name=name)
-            print(f"Deleted existing collection '{name}'.")
-        except Exception:
-            # Collection may not exist yet; continue.
-            pass
-
-    _ensure_openai_key()
+    if checkpoint is not None:
+        print(
+            f"    Resuming after row {checkpoint.rows_committed} "
+            f"(checkpoint from {checkpoint.updated_at})."
+        )
+    elif rebuild:
+        print("    New build; the alias switches to it once it holds every source record.")
 
-    embedding_fn = OpenAIEmbeddingFunction(model_name=collection_cfg.embedding_model)
+    embedding_fn = collection_cfg.embedding_function
     print("    Using embedding function:", collection_cfg.embedding_model, embedding_fn)
 
     collection = client.get_or_create_collection(
@@ -93,28 +261,249 @@ def _create_or_refresh_collection(
         embedding_function=embedding_fn,  # DO NOT CHANGE THIS LINE
     )
 
+    if rebuild and checkpoint is None:
+        # A new build must not share a version with the one it replaces.
+        bump_content_version(collection)
+
     print("    Testing embedding function with a sample query (empty)...")
     print(collection.query(query_texts=["worm"], n_results=1))
 
-    print("    Ingesting TSV...")
-    total = populate_collection_from_tsv(
+    scheduler = _get_scheduler(chroma_config, collection_cfg, embedding_fn, schedulers)
+    return IngestTarget(
         collection=collection,
-        batch_size=collection_cfg.batch_size,
+        embedding_function=scheduler,
+        sync=sync,
+        resume_from=checkpoint.rows_committed if checkpoint is not None else 0,
     )
-    print("    Ingestion complete.")
+
+
+def _publish_builds(
+    client: ClientAPI,
+    source_path: Path,
+    collection_cfgs: list[CollectionConfig],
+    targets: list[IngestTarget],
+) -> None:
+    """Check every new build holds each source record, then switch the aliases to them."""
+
+    expected = count_source_records(source_path)
+    for target in targets:
+        count = target.collection.count()
+        if count != expected:
+            for build in targets:
+                retire_collection(client, build.name)
+            raise ValueError(
+                f"Build '{target.name}' has {count} records but {source_path.name} has "
+                f"{expected}; no alias was switched and the builds will be garbage-collected."
+            )
+
+    for collection_cfg, target in zip(collection_cfgs, targets, strict=True):
+        previous = swap_alias(client, collection_cfg.collection_name, target.name)
+        print(
+            f"    Alias '{collection_cfg.collection_name}' now points at '{target.name}'"
+            + (f" (replacing '{previous}')." if previous else ".")
+        )
+
+
+def _group_by_source(
+    collections: list[CollectionConfig],
+) -> dict[Path, list[CollectionConfig]]:
+    groups: dict[Path, list[CollectionConfig]] = defaultdict(list)
+    for collection_cfg in collections:
+        groups[collection_cfg.source_path].append(collection_cfg)
+    return dict(groups)
+
+
+async def _populate_async(
+    source_path: Path, targets: list[IngestTarget], **options: Any
+) -> None:
+    """Parse the source once and append it to every target with the async client."""
+
+    client = await connect_async()
+    collections = await asyncio.gather(
+        *(get_collection_with_embedding_async(client, target.name) for target in targets)
+    )
+    try:
+        written = await ingest_source_async(
+            source_path,
+            collections,
+            [target.embedding_function for target in targets],
+            **options,
+        )
+        for target, count in zip(targets, written, strict=True):
+            target.written = count
+    finally:
+        # Bumped through the async collections, whose metadata now has the facets.
+        await asyncio.gather(*(bump_content_version_async(col) for col in collections))
+
+
+def _refresh_source(
+    client: ClientAPI,
+    chroma_config: ChromaConfig,
+    source_path: Path,
+    collection_cfgs: list[CollectionConfig],
+    rebuild: bool,
+    cache: EmbeddingCache | None = None,
+    sync: bool = False,
+    max_concurrency: int | None = None,
+    batch_stats: BatchSizeStats | None = None,
+    schedulers: dict[tuple[str, str], EmbeddingScheduler] | None = None,
+    checkpoints: CheckpointStore | None = None,
+    resume: bool = False,
+    reader: str = "csv",
+    metrics: IngestMetrics | None = None,
+    use_async: bool = False,
+) -> dict[str, int]:
+    """
+    Parse one source once and ingest it into every collection configured on it.
+
+    The group uses the smallest configured batch size and token budget and, unless
+    overridden, the largest configured ``max_concurrency`` as the cap on in-flight
+    embedding requests shared by all of its collections. Writes are split to the
+    server's max batch size. Non-sync runs checkpoint after every committed batch;
+    with ``resume`` each collection continues from its checkpoint, if any.
+
+    With ``use_async`` the collections are written with the async client instead
+    (see :mod:`src.utils.async_chroma`), sharing the same parse and the same
+    ``max_concurrency`` cap; those runs are not checkpointed.
+
+    A ``rebuild`` writes each collection into a new ``<name>__<timestamp>`` build
+    (see :mod:`src.utils.aliases`) while readers keep using the current one. Once
+    every build holds as many records as the source has, the configured names are
+    switched to them. Failed builds are never published; they are retired, so a
+    later ``--rebuild --resume`` can continue them until they are garbage-collected.
+    """
+
+    checkpoints = checkpoints or CheckpointStore()
+
+    targets = []
+    for collection_cfg in collection_cfgs:
+        name, checkpoint = _write_target(client, checkpoints, collection_cfg, rebuild, resume)
+        targets.append(
+            _prepare_collection(
+                client,
+                chroma_config,
+                collection_cfg,
+                name,
+                rebuild=rebuild,
+                sync=sync,
+                schedulers=schedulers if schedulers is not None else {},
+                checkpoint=checkpoint,
+            )
+        )
+    batch_size = min(cfg.batch_size for cfg in collection_cfgs)
+    concurrency = max_concurrency or max(cfg.max_concurrency for cfg in collection_cfgs)
+    max_batch_tokens = min(cfg.max_batch_tokens for cfg in collection_cfgs)
+    max_batch_items = min(cfg.max_batch_items for cfg in collection_cfgs)
+    max_write_batch_size = client.get_max_batch_size()
 
     print(
-        f"Collection '{name}' now has {total} records from {collection_cfg.source_path.name}."
+        f"\n==> {'Syncing' if sync else 'Ingesting'} {source_path.name} into "
+        f"{len(targets)} collection(s) (batch size {batch_size}, max concurrency {concurrency})..."
     )
+    try:
+        if use_async:
+            asyncio.run(
+                _populate_async(
+                    source_path,
+                    targets,
+                    max_concurrency=concurrency,
+                    max_batch_tokens=max_batch_tokens,
+                    max_batch_items=max_batch_items,
+                    max_write_batch_size=max_write_batch_size,
+                    batch_size=batch_size,
+                    cache=cache,
+                    batch_stats=batch_stats,
+                    reader=reader,
+                    metrics=metrics,
+                )
+            )
+        else:
+            ingest_source(
+                source_path,
+                targets,
+                batch_size=batch_size,
+                cache=cache,
+                max_concurrency=concurrency,
+                max_batch_tokens=max_batch_tokens,
+                max_batch_items=max_batch_items,
+                max_write_batch_size=max_write_batch_size,
+                batch_stats=batch_stats,
+                checkpoints=checkpoints,
+                reader=reader,
+                metrics=metrics,
+            )
+    except BaseException:
+        if rebuild:
+            # Best effort: the original error matters more than the cleanup.
+            with contextlib.suppress(Exception):
+                for target in targets:
+                    retire_collection(client, target.name)
+        raise
+    finally:
+        # Invalidate cached query results for every collection that changed, even
+        # if the run failed part way through (async runs bump their own).
+        for target in targets:
+            if not use_async and (target.written or target.sync_result.deleted):
+                bump_content_version(target.collection)
+    print("    Ingestion complete.")
+    if rebuild:
+        _publish_builds(client, source_path, collection_cfgs, targets)
 
-    print("    Testing embedding function with a sample query (empty)...")
-    print(collection.query(query_texts=["worm"], n_results=1))
+    totals: dict[str, int] = {}
+    for target in targets:
+        if sync:
+            result = target.sync_result
+            print(
+                f"    Sync of '{target.name}': {result.added} added, {result.updated} updated, "
+                f"{result.deleted} deleted, {result.unchanged} unchanged."
+            )
+            totals[target.name] = result.total
+        else:
+            totals[target.name] = target.resume_from + target.written
+        print(
+            f"Collection '{target.name}' now has {totals[target.name]} records from {source_path.name}."
+        )
+
+        print("    Testing embedding function with a sample query (empty)...")
+        print(target.collection.query(query_texts=["worm"], n_results=1))
+
+    return totals
 
-    return total
 
+def _write_metrics(
+    args: argparse.Namespace,
+    metrics: IngestMetrics,
+    batch_stats: BatchSizeStats,
+    schedulers: dict[tuple[str, str], EmbeddingScheduler],
+    cache: EmbeddingCache | None,
+) -> None:
+    """Fold request, retry and cache counters into the run metrics and write them out."""
 
-def main() -> None:
-    args = parse_args()
+    for kind, stats in batch_stats.summary().items():
+        metrics.add(f"{kind}_requests", stats["requests"])
+    for scheduler in schedulers.values():
+        sched = scheduler.stats
+        metrics.add("embedding_api_requests", sched.requests)
+        metrics.add("embedding_retries", sched.retries)
+        metrics.add("throttled_seconds", round(sched.throttled_seconds, 3))
+        metrics.add("backoff_seconds", round(sched.backoff_seconds, 3))
+    if cache is not None:
+        metrics.add("cache_hits", cache.stats.hits)
+        metrics.add("cache_misses", cache.stats.misses)
+
+    extra = {
+        "config": str(args.config),
+        "mode": "rebuild" if args.rebuild else "sync" if args.sync else "append",
+        "reader": args.reader,
+    }
+    path = metrics.write_json(args.metrics_json or default_summary_path(), extra=extra)
+    print(f"Run summary written to {path}.")
+    if args.prometheus_textfile is not None:
+        metrics.write_prometheus(args.prometheus_textfile)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
 
     client: ClientAPI = chromadb.HttpClient(
         host=settings.chroma_host, port=settings.chroma_port
@@ -125,16 +514,62 @@ def main() -> None:
         print(f"No collections configured in {args.config}. Nothing to do.")
         return
 
-    for collection_cfg in chroma_config.collections:
-        _create_or_refresh_collection(
-            client=client,
-            collection_cfg=collection_cfg,
-            rebuild=args.rebuild,
-        )
+    cache = None if args.no_cache else EmbeddingCache()
+    batch_stats = BatchSizeStats()
+    schedulers: dict[tuple[str, str], EmbeddingScheduler] = {}
+    progress = tqdm(unit="rows", desc="Written", dynamic_ncols=True) if args.progress else None
+    metrics = IngestMetrics(progress=progress.update if progress is not None else None)
+    try:
+        for source_path, collection_cfgs in _group_by_source(chroma_config.collections).items():
+            _refresh_source(
+                client=client,
+                chroma_config=chroma_config,
+                source_path=source_path,
+                collection_cfgs=collection_cfgs,
+                rebuild=args.rebuild,
+                cache=cache,
+                sync=args.sync,
+                max_concurrency=args.max_concurrency,
+                batch_stats=batch_stats,
+                schedulers=schedulers,
+                resume=args.resume,
+                reader=args.reader,
+                metrics=metrics,
+                use_async=args.use_async,
+            )
+    finally:
+        if progress is not None:
+            progress.close()
+        if cache is not None:
+            cache.close()
+        _write_metrics(args, metrics, batch_stats, schedulers, cache)
+
+    deleted = collect_garbage(client, args.gc_grace_secs)
+    if deleted:
+        print(f"\nDeleted {len(deleted)} replaced collection(s): {', '.join(deleted)}.")
 
     print("\n=== Collections summary ===")
     print(report(client))
 
+    print(f"\nBatch sizes chosen:\n{batch_stats.describe()}")
+
+    for (provider, model), scheduler in schedulers.items():
+        sched = scheduler.stats
+        print(
+            f"Embedding scheduler {provider}/{model}: {sched.requests} requests, "
+            f"{sched.retries} retries, {sched.throttled_seconds:.1f}s throttled, "
+            f"{sched.backoff_seconds:.1f}s backing off."
+        )
+
+    if cache is not None:
+        stats = cache.stats
+        print(
+            f"\nEmbedding cache: {stats.hits} hits, {stats.misses} misses "
+            f"({stats.hit_rate:.1%} hit rate), {stats.evictions} evictions."
+        )
+
+    print(f"\nIngest stages:\n{metrics.describe()}")
+
 
 if __name__ == "__main__":
     main()
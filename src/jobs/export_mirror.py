@@ -0,0 +1,89 @@
+"""Export a Chroma collection to a memory-mapped local vector mirror."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import chromadb
+from src.config.chroma_config import (
+    DEFAULT_CHROMA_CONFIG_PATH,
+    get_default_collection_and_source,
+)
+from src.config.settings import settings
+from src.utils.chroma_utils import get_collection_with_embedding, iter_collection_pages
+from src.utils.quantization import QUANTIZATIONS, bytes_per_vector
+from src.utils.vector_mirror import export_mirror, mirror_path
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Export a collection's ids, embeddings and metadata to memory-mapped NumPy files."
+    )
+    parser.add_argument(
+        "--collection",
+        help="Collection to export. Defaults to the first collection in the Chroma config.",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=DEFAULT_CHROMA_CONFIG_PATH,
+        help="Chroma config used to pick the default collection.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Mirror directory. Defaults to .cache/mirrors/<collection>.",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=1000,
+        help="Records fetched from Chroma per request.",
+    )
+    parser.add_argument(
+        "--quantization",
+        choices=QUANTIZATIONS,
+        help="How embeddings are stored. Defaults to the collection's quantization metadata (float32).",
+    )
+    args = parser.parse_args(argv)
+    if args.page_size <= 0:
+        parser.error("--page-size must be positive.")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    collection_name = args.collection or get_default_collection_and_source(args.config)[0]
+    if not collection_name:
+        raise ValueError(f"No collections configured in {args.config}; pass --collection.")
+    output = args.output or mirror_path(collection_name)
+
+    client = chromadb.HttpClient(host=settings.chroma_host, port=settings.chroma_port)
+    collection = get_collection_with_embedding(client, name=collection_name)
+
+    print(f"Exporting '{collection_name}' ({collection.count()} records) to {output}...")
+    started = time.perf_counter()
+    manifest = export_mirror(
+        collection,
+        output,
+        iter_collection_pages(
+            collection, include=["embeddings", "metadatas"], page_size=args.page_size
+        ),
+        quantization=args.quantization,
+    )
+    vector_mb = (
+        manifest["count"]
+        * bytes_per_vector(manifest["dimension"], manifest["quantization"])
+        / (1024 * 1024)
+    )
+    print(
+        f"Exported {manifest['count']} x {manifest['dimension']} {manifest['quantization']} "
+        f"vectors ({manifest['space']}, {vector_mb:.1f} MiB) and "
+        f"{len(manifest['fields'])} metadata fields in {time.perf_counter() - started:.1f}s."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Restore Chroma collections from snapshots without calling the embedding provider."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import chromadb
+from src.config.chroma_config import DEFAULT_CHROMA_CONFIG_PATH, load_chroma_config
+from src.config.settings import settings
+from src.utils.aliases import load_aliases, swap_alias, versioned_name
+from src.utils.chroma_utils import build_embedding_function
+from src.utils.snapshot import (
+    DEFAULT_SNAPSHOT_DIR,
+    import_snapshot,
+    load_manifest,
+    snapshot_path,
+)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Create collections from snapshots, adding their stored embeddings in bulk."
+    )
+    parser.add_argument(
+        "--collection",
+        action="append",
+        help="Collection to restore (repeatable). Defaults to every collection in the Chroma config.",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=DEFAULT_CHROMA_CONFIG_PATH,
+        help="Chroma config listing the default collections.",
+    )
+    parser.add_argument(
+        "--input-dir",
+        type=Path,
+        default=DEFAULT_SNAPSHOT_DIR,
+        help="Snapshots are read from <input-dir>/<collection>. Defaults to .cache/snapshots.",
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Replace a collection that already exists instead of skipping it. The snapshot "
+        "is imported into a new versioned collection and the name is switched to it.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Records per add request. Defaults to the server's max batch size.",
+    )
+    args = parser.parse_args(argv)
+    if args.batch_size is not None and args.batch_size <= 0:
+        parser.error("--batch-size must be positive.")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    names = args.collection or [
+        cfg.collection_name for cfg in load_chroma_config(args.config).collections
+    ]
+    if not names:
+        raise ValueError(f"No collections configured in {args.config}; pass --collection.")
+
+    client = chromadb.HttpClient(host=settings.chroma_host, port=settings.chroma_port)
+    existing = {col.name for col in client.list_collections()} | set(load_aliases(client).aliases)
+    for name in names:
+        directory = snapshot_path(name, args.input_dir)
+        manifest = load_manifest(directory)
+        target = name
+        if name in existing:
+            if not args.replace:
+                print(
+                    f"Collection '{name}' already exists; skipping (pass --replace to overwrite)."
+                )
+                continue
+            # Readers keep the current collection until the import is complete.
+            target = versioned_name(name)
+
+        print(f"Importing {manifest['count']} records into '{target}' from {directory}...")
+        started = time.perf_counter()
+        _, added = import_snapshot(
+            client,
+            directory,
+            name=target,
+            # Attached for later queries only; import itself never embeds.
+            embedding_function=build_embedding_function(metadata=manifest["metadata"]),
+            batch_size=args.batch_size,
+        )
+        print(f"Imported {added} records in {time.perf_counter() - started:.1f}s.")
+        if target != name:
+            previous = swap_alias(client, name, target)
+            print(f"Alias '{name}' now points at '{target}' (replacing '{previous}').")
+
+
+if __name__ == "__main__":
+    main()
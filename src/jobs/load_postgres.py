@@ -0,0 +1,185 @@
+"""Load (or refresh) the Postgres cards table from a TSV without downtime."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import IO
+
+import psycopg
+from src.config.chroma_config import (
+    DEFAULT_CHROMA_CONFIG_PATH,
+    get_default_collection_and_source,
+)
+from src.utils.postgres import (
+    CARDS_TABLE,
+    connect,
+    ensure_indexes,
+    ensure_primary_key,
+)
+
+# TSV columns in file order; the TSV's ``number`` is stored as ``id``.
+TSV_COLUMNS = (
+    "url",
+    "name",
+    "album",
+    "collection",
+    "number",
+    "type",
+    "rarity",
+    "release_date",
+    "energy",
+    "power",
+    "ppe",
+    "ability_name",
+    "ability_description",
+    "tags",
+)
+CARD_COLUMNS = tuple("id" if column == "number" else column for column in TSV_COLUMNS)
+COPY_CHUNK_BYTES = 1024 * 1024
+STAGING_TABLE = "cards_staging"
+
+# Numbers are cast only when they parse, like the numeric metadata stored in Chroma.
+_INTEGER = r"CASE WHEN {0} ~ '^\s*[-+]?\d{{1,9}}\s*$' THEN {0}::integer END"
+_FLOAT = r"CASE WHEN {0} ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$' THEN {0}::double precision END"
+_CASTS = {"energy": _INTEGER, "power": _INTEGER, "ppe": _FLOAT}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Stream a card TSV into Postgres with COPY and upsert it into the cards table."
+    )
+    parser.add_argument(
+        "--source",
+        type=Path,
+        help="TSV to load. Defaults to the source of the first collection in the Chroma config.",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=DEFAULT_CHROMA_CONFIG_PATH,
+        help="Chroma config used to pick the default source.",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete cards whose url is no longer in the source.",
+    )
+    parser.add_argument(
+        "--skip-indexes",
+        action="store_true",
+        help="Only load rows; do not create missing secondary or full-text indexes.",
+    )
+    return parser.parse_args(argv)
+
+
+def _read_header(f: IO[bytes], source: Path) -> None:
+    header = f.readline().decode("utf-8-sig").rstrip("\r\n").split("\t")
+    if tuple(column.strip().strip('"') for column in header) != TSV_COLUMNS:
+        raise ValueError(f"Unexpected columns in {source}: {header}; expected {list(TSV_COLUMNS)}.")
+
+
+def _stage(cur: psycopg.Cursor, source: Path) -> int:
+    """COPY the TSV into a temporary staging table, streaming it in chunks."""
+
+    columns = ", ".join(f"{column} TEXT" for column in CARD_COLUMNS)
+    # ``line`` preserves file order so the last duplicate of a url wins.
+    cur.execute(f"CREATE TEMP TABLE {STAGING_TABLE} (line BIGSERIAL, {columns}) ON COMMIT DROP")
+    with source.open("rb") as f:
+        _read_header(f, source)
+        with cur.copy(
+            f"COPY {STAGING_TABLE} ({', '.join(CARD_COLUMNS)}) FROM STDIN "
+            "WITH (FORMAT csv, DELIMITER E'\\t', NULL '')"
+        ) as copy:
+            while chunk := f.read(COPY_CHUNK_BYTES):
+                copy.write(chunk)
+    cur.execute(f"ANALYZE {STAGING_TABLE}")
+    (staged,) = cur.execute(f"SELECT count(*) FROM {STAGING_TABLE}").fetchone() or (0,)
+    return staged
+
+
+def _merge(cur: psycopg.Cursor) -> tuple[int, int, int, int]:
+    """Upsert staged rows into cards; returns (inserted, updated, unchanged, skipped)."""
+
+    selected = ", ".join(
+        _CASTS[column].format(column) if column in _CASTS else column for column in CARD_COLUMNS
+    )
+    columns = ", ".join(CARD_COLUMNS)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in CARD_COLUMNS[1:])
+    current = ", ".join(f"c.{column}" for column in CARD_COLUMNS)
+    incoming = ", ".join(f"EXCLUDED.{column}" for column in CARD_COLUMNS)
+    # Unchanged rows are left alone, so a refresh only writes (and bloats) what changed.
+    cur.execute(
+        f"""
+        WITH merged AS (
+            INSERT INTO {CARDS_TABLE} AS c ({columns})
+            SELECT DISTINCT ON (url) {selected}
+            FROM {STAGING_TABLE}
+            WHERE url IS NOT NULL AND name IS NOT NULL
+            ORDER BY url, line DESC
+            ON CONFLICT (url) DO UPDATE SET {updates}
+            WHERE ({current}) IS DISTINCT FROM ({incoming})
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT
+            count(*) FILTER (WHERE inserted),
+            count(*) FILTER (WHERE NOT inserted),
+            (
+                SELECT count(DISTINCT url) FROM {STAGING_TABLE}
+                WHERE url IS NOT NULL AND name IS NOT NULL
+            ),
+            (SELECT count(*) FROM {STAGING_TABLE} WHERE url IS NULL OR name IS NULL)
+        FROM merged
+        """
+    )
+    inserted, updated, distinct, skipped = cur.fetchone() or (0, 0, 0, 0)
+    return inserted, updated, distinct - inserted - updated, skipped
+
+
+def _prune(cur: psycopg.Cursor) -> int:
+    cur.execute(
+        f"""
+        DELETE FROM {CARDS_TABLE} AS c
+        WHERE NOT EXISTS (SELECT 1 FROM {STAGING_TABLE} AS s WHERE s.url = c.url)
+        """
+    )
+    return cur.rowcount
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    default_source = get_default_collection_and_source(args.config)[1]
+    source = args.source or (Path(default_source) if default_source else None)
+    if source is None:
+        raise ValueError(f"No collections configured in {args.config}; pass --source.")
+    if not source.exists():
+        raise FileNotFoundError(f"Source file not found: {source}")
+
+    with connect() as conn:
+        removed = ensure_primary_key(conn)
+        if removed is not None:
+            print(f"Added primary key on url ({removed} duplicate rows removed).")
+
+        started = time.perf_counter()
+        # Readers keep seeing the previous rows until this transaction commits.
+        with conn.transaction(), conn.cursor() as cur:
+            staged = _stage(cur, source)
+            print(f"Staged {staged} rows from {source} in {time.perf_counter() - started:.1f}s.")
+            inserted, updated, unchanged, skipped = _merge(cur)
+            pruned = _prune(cur) if args.prune else 0
+        print(
+            f"Inserted {inserted}, updated {updated}, unchanged {unchanged}, pruned {pruned}, "
+            f"skipped {skipped} without url/name in {time.perf_counter() - started:.1f}s."
+        )
+
+        if not args.skip_indexes:
+            started = time.perf_counter()
+            created = ensure_indexes(conn)
+            if created:
+                print(f"Created {', '.join(created)} in {time.perf_counter() - started:.1f}s.")
+        conn.execute(f"ANALYZE {CARDS_TABLE}")
+
+
+if __name__ == "__main__":
+    main()
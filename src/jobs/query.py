@@ -0,0 +1,433 @@
+"""Run one query or a stream of queries against a Chroma collection, emitting JSONL."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+import chromadb
+from src.config.chroma_config import (
+    DEFAULT_CHROMA_CONFIG_PATH,
+    get_default_collection_and_source,
+)
+from src.config.settings import settings
+from src.utils.async_chroma import (
+    DEFAULT_ASYNC_CONCURRENCY,
+    connect_async,
+    get_collection_with_embedding_async,
+    search_batches_async,
+)
+from src.utils.batching import DEFAULT_MAX_BATCH_ITEMS
+from src.utils.chroma_utils import (
+    build_embedding_function,
+    build_query_embedder,
+    get_collection_with_embedding,
+)
+from src.utils.embedding_cache import (
+    DEFAULT_QUERY_CACHE_PATH,
+    EmbeddingCache,
+    QueryEmbeddingCache,
+)
+from src.utils.facets import FacetIndex
+from src.utils.filters import QUERY, FilterPlan, parse_filter, plan_filter
+from src.utils.result_cache import QueryResultCache
+from src.utils.search import (
+    DEFAULT_QUERY_BATCH_SIZE,
+    DEFAULT_RESULT_FIELDS,
+    QueryRequest,
+    parse_queries,
+    search_batches,
+)
+from src.utils.vector_mirror import VectorMirror, mirror_path
+
+if TYPE_CHECKING:
+    # psycopg and the hybrid searcher are only imported for --hybrid.
+    from src.utils.hybrid import HybridSearcher
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Query a Chroma collection; results are written as JSON lines."
+    )
+    parser.add_argument(
+        "query",
+        nargs="?",
+        help="Query text. Omit to read queries from --file or stdin (one per line).",
+    )
+    parser.add_argument(
+        "--file",
+        type=Path,
+        help="File of queries: plain text or JSON objects with 'query' and optional 'id'. '-' for stdin.",
+    )
+    parser.add_argument(
+        "--collection",
+        help="Collection to query. Defaults to the first collection in the Chroma config.",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=DEFAULT_CHROMA_CONFIG_PATH,
+        help="Chroma config used to pick the default collection.",
+    )
+    parser.add_argument("--n-results", type=int, default=5, help="Hits returned per query.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_QUERY_BATCH_SIZE,
+        help="Queries embedded and searched per request.",
+    )
+    parser.add_argument(
+        "--where", help='Chroma metadata filter as JSON, e.g. \'{"rarity": "Rare"}\'.'
+    )
+    parser.add_argument(
+        "--filter",
+        help="Structured constraints, e.g. \"rarity=Legendary, energy<=3, album in [A, B]\". "
+        "Checked against the collection's facet index; combined with --where.",
+    )
+    parser.add_argument(
+        "--fields",
+        default=",".join(DEFAULT_RESULT_FIELDS),
+        help="Comma-separated metadata fields to include in each hit ('*' for all).",
+    )
+    parser.add_argument(
+        "--documents", action="store_true", help="Include document text in each hit."
+    )
+    parser.add_argument("--output", type=Path, help="Write JSONL here instead of stdout.")
+    parser.add_argument(
+        "--mirror",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="Search a local vector mirror (see export_mirror) instead of the Chroma server. "
+        "Defaults to .cache/mirrors/<collection>.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Skip the query-embedding cache and let Chroma embed every query.",
+    )
+    parser.add_argument(
+        "--no-result-cache",
+        action="store_true",
+        help="Send every query to Chroma, even repeats. The result cache is in memory and "
+        "lasts for this run only, keyed on the collection's content version read when the "
+        "search starts.",
+    )
+    parser.add_argument(
+        "--hybrid",
+        action="store_true",
+        help="Fuse the vector search with a Postgres full-text search over name, ability and tags.",
+    )
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        help="Hits fetched from each leg before fusion (--hybrid; default 20, or --n-results "
+        "if larger).",
+    )
+    parser.add_argument(
+        "--leg-timeout",
+        type=float,
+        help="Seconds to wait for each leg before dropping it from a batch (--hybrid; default 2).",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Search with the async client, keeping up to --concurrency batches in flight.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_ASYNC_CONCURRENCY,
+        help="Batches searched at once with --async.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.query and args.file:
+        parser.error("Pass either a query or --file, not both.")
+    if not args.query and not args.file and sys.stdin.isatty():
+        parser.error("Provide a query, --file, or pipe queries on stdin.")
+    if args.mirror is not None and args.documents:
+        parser.error("Vector mirrors do not store documents; drop --documents or --mirror.")
+    if args.hybrid and (args.mirror is not None or args.where or args.filter or args.documents):
+        parser.error("--hybrid cannot be combined with --mirror, --where, --filter or --documents.")
+    if args.use_async and (args.mirror is not None or args.hybrid):
+        parser.error("--async cannot be combined with --mirror or --hybrid.")
+    if args.concurrency <= 0:
+        parser.error("--concurrency must be positive.")
+    if args.n_results <= 0:
+        parser.error("--n-results must be positive.")
+    if (args.candidates is not None and args.candidates < args.n_results) or (
+        args.leg_timeout is not None and args.leg_timeout <= 0
+    ):
+        parser.error("--candidates must be at least --n-results and --leg-timeout positive.")
+    if not 0 < args.batch_size <= DEFAULT_MAX_BATCH_ITEMS:
+        parser.error(f"--batch-size must be between 1 and {DEFAULT_MAX_BATCH_ITEMS}.")
+    args.fields = (
+        None
+        if args.fields.strip() == "*"
+        else [field.strip() for field in args.fields.split(",") if field.strip()]
+    )
+    if args.where:
+        try:
+            args.where = json.loads(args.where)
+        except json.JSONDecodeError as exc:
+            parser.error(f"--where is not valid JSON: {exc}")
+    return args
+
+
+def _default_collection_name(config_path: Path) -> str:
+    name, _ = get_default_collection_and_source(config_path)
+    if not name:
+        raise ValueError(f"No collections configured in {config_path}; pass --collection.")
+    return name
+
+
+def _plan_filter(args: argparse.Namespace, collection: Any) -> FilterPlan:
+    if not args.filter:
+        return FilterPlan(where=args.where, strategy=QUERY)
+    # Mirrors search every matching row in-process already, so they only need the where.
+    facets = None if args.mirror is not None else FacetIndex.from_metadata(collection.metadata)
+    constraints = parse_filter(args.filter, facets)
+    return plan_filter(constraints, facets, args.n_results, extra=args.where)
+
+
+def _iter_queries(args: argparse.Namespace) -> Iterator[QueryRequest]:
+    if args.query:
+        yield QueryRequest(id="1", text=args.query)
+    elif args.file and str(args.file) != "-":
+        with args.file.open(encoding="utf-8") as f:
+            yield from parse_queries(f)
+    else:
+        yield from parse_queries(sys.stdin)
+
+
+def _write_results(
+    args: argparse.Namespace,
+    collection: object,
+    out: IO[str],
+    embed_queries: Callable[[list[str]], list[Any]] | None,
+    result_cache: QueryResultCache | None,
+    searcher: HybridSearcher | None = None,
+    plan: FilterPlan | None = None,
+    client: Any | None = None,
+) -> tuple[int, int]:
+    queries = batches = 0
+    batch_results: Iterator[list[dict[str, Any]]]
+    if searcher is not None:
+        from src.utils.hybrid import hybrid_search_batches
+
+        batch_results = hybrid_search_batches(
+            searcher,
+            _iter_queries(args),
+            n_results=args.n_results,
+            batch_size=args.batch_size,
+            fields=args.fields,
+        )
+    else:
+        batch_results = search_batches(
+            collection,
+            _iter_queries(args),
+            n_results=args.n_results,
+            batch_size=args.batch_size,
+            where=plan.where if plan is not None else args.where,
+            fields=args.fields,
+            include_documents=args.documents,
+            embed_queries=embed_queries,
+            result_cache=result_cache,
+            strategy=plan.strategy if plan is not None else QUERY,
+            client=client,
+        )
+    for results in batch_results:
+        for result in results:
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+        queries += len(results)
+        batches += 1
+    return queries, batches
+
+
+async def _write_results_async(
+    args: argparse.Namespace,
+    collection: Any,
+    out: IO[str],
+    embed_queries: Callable[[list[str]], list[Any]] | None,
+    result_cache: QueryResultCache | None,
+    plan: FilterPlan,
+    client: Any,
+) -> tuple[int, int]:
+    queries = batches = 0
+    async for results in search_batches_async(
+        collection,
+        _iter_queries(args),
+        n_results=args.n_results,
+        batch_size=args.batch_size,
+        where=plan.where,
+        fields=args.fields,
+        include_documents=args.documents,
+        embed_queries=embed_queries,
+        result_cache=result_cache,
+        strategy=plan.strategy,
+        max_concurrency=args.concurrency,
+        client=client,
+    ):
+        for result in results:
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+        queries += len(results)
+        batches += 1
+    return queries, batches
+
+
+def _query_caches(
+    args: argparse.Namespace, collection: Any
+) -> tuple[
+    QueryEmbeddingCache | None,
+    Callable[[list[str]], list[Any]] | None,
+    QueryResultCache | None,
+]:
+    """Return the query-embedding cache, the query embedder and the result cache to use."""
+
+    cache = None
+    embed_queries = None
+    if not args.no_cache:
+        cache = QueryEmbeddingCache(
+            disk=EmbeddingCache(DEFAULT_QUERY_CACHE_PATH, settings.query_cache_max_bytes)
+        )
+        embed_queries = build_query_embedder(collection, cache)
+    elif args.mirror is not None:
+        # A mirror cannot embed text, so queries are embedded here without caching.
+        embed_queries = build_embedding_function(metadata=collection.metadata)
+    result_cache = None if args.no_result_cache else QueryResultCache()
+    return cache, embed_queries, result_cache
+
+
+def _print_summary(
+    collection_name: str,
+    queries: int,
+    batches: int,
+    elapsed: float,
+    cache: QueryEmbeddingCache | None,
+    result_cache: QueryResultCache | None,
+) -> None:
+    rate = queries / elapsed if elapsed > 0 else 0.0
+    print(
+        f"{queries} queries in {batches} requests against '{collection_name}' "
+        f"({elapsed:.2f}s, {rate:.1f} queries/s)",
+        file=sys.stderr,
+    )
+    if cache is not None:
+        print(f"Query embedding cache: {cache.stats.describe()}", file=sys.stderr)
+    if result_cache is not None:
+        print(f"Query result cache: {result_cache.stats.describe()}", file=sys.stderr)
+
+
+async def _main_async(args: argparse.Namespace, collection_name: str) -> None:
+    client = await connect_async()
+    collection = await get_collection_with_embedding_async(client, name=collection_name)
+    cache, embed_queries, result_cache = _query_caches(args, collection)
+
+    plan = _plan_filter(args, collection)
+    if args.filter:
+        print(f"Filter plan: {plan.describe()}", file=sys.stderr)
+
+    started = time.perf_counter()
+    try:
+        if args.output:
+            with args.output.open("w", encoding="utf-8") as out:
+                queries, batches = await _write_results_async(
+                    args, collection, out, embed_queries, result_cache, plan, client
+                )
+        else:
+            queries, batches = await _write_results_async(
+                args, collection, sys.stdout, embed_queries, result_cache, plan, client
+            )
+    finally:
+        if cache is not None:
+            cache.close()
+    _print_summary(
+        collection_name, queries, batches, time.perf_counter() - started, cache, result_cache
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    collection_name = args.collection or _default_collection_name(args.config)
+    if args.use_async:
+        asyncio.run(_main_async(args, collection_name))
+        return
+
+    collection: Any
+    client = None
+    if args.mirror is not None:
+        collection = VectorMirror(args.mirror or mirror_path(collection_name))
+    else:
+        client = chromadb.HttpClient(host=settings.chroma_host, port=settings.chroma_port)
+        collection = get_collection_with_embedding(client, name=collection_name)
+
+    cache, embed_queries, result_cache = _query_caches(args, collection)
+
+    plan = _plan_filter(args, collection)
+    if args.filter:
+        print(f"Filter plan: {plan.describe()}", file=sys.stderr)
+
+    searcher = None
+    if args.hybrid:
+        from src.utils.hybrid import DEFAULT_CANDIDATES, DEFAULT_LEG_TIMEOUT, HybridSearcher
+        from src.utils.postgres import connect as connect_postgres
+        from src.utils.postgres import missing_search_schema
+
+        conn = connect_postgres()
+        missing = missing_search_schema(conn)
+        if missing:
+            conn.close()
+            raise SystemExit(
+                f"The cards table has no full-text search {' or '.join(missing)}; "
+                "run `make load_postgres` to create them."
+            )
+        searcher = HybridSearcher(
+            collection,
+            conn,
+            embed_queries=embed_queries,
+            result_cache=result_cache,
+            candidates=(
+                args.candidates
+                if args.candidates is not None
+                else max(DEFAULT_CANDIDATES, args.n_results)
+            ),
+            timeout=args.leg_timeout if args.leg_timeout is not None else DEFAULT_LEG_TIMEOUT,
+        )
+
+    started = time.perf_counter()
+    try:
+        if args.output:
+            with args.output.open("w", encoding="utf-8") as out:
+                queries, batches = _write_results(
+                    args, collection, out, embed_queries, result_cache, searcher, plan, client
+                )
+        else:
+            queries, batches = _write_results(
+                args, collection, sys.stdout, embed_queries, result_cache, searcher, plan, client
+            )
+    finally:
+        if cache is not None:
+            cache.close()
+        if searcher is not None:
+            searcher.close()
+            searcher.conn.close()
+    elapsed = time.perf_counter() - started
+
+    _print_summary(collection_name, queries, batches, elapsed, cache, result_cache)
+    if searcher is not None:
+        for leg, leg_stats in searcher.stats.items():
+            print(f"Hybrid {leg} leg: {leg_stats.describe()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
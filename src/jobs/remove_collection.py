@@ -1,35 +1,88 @@
-"""Delete a Chroma collection by name (or remove all)."""
+"""Delete a Chroma collection by name (or remove all), or garbage-collect replaced builds."""
 
 from __future__ import annotations
 
 import argparse
+import contextlib
 
 import chromadb
 from src.config.settings import settings
+from src.utils.aliases import DEFAULT_GC_GRACE_SECS, collect_garbage, load_aliases, remove_alias
+from src.utils.chroma_utils import bump_content_version
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Delete a Chroma collection.")
     parser.add_argument(
         "collection",
         nargs="?",
-        help="Name or 1-based index of the collection to delete.",
+        help="Name, alias or 1-based index of the collection to delete. "
+        "An alias is deleted with every build it owns.",
     )
     parser.add_argument(
         "--all",
         action="store_true",
         help="Delete all collections.",
     )
-    args = parser.parse_args()
-    if not args.all and not args.collection:
-        parser.error("Please provide a collection name or use --all.")
+    parser.add_argument(
+        "--gc",
+        action="store_true",
+        help="Only delete collections replaced by a rebuild more than --gc-grace-secs ago.",
+    )
+    parser.add_argument(
+        "--gc-grace-secs",
+        type=float,
+        default=DEFAULT_GC_GRACE_SECS,
+        help="Grace period for --gc.",
+    )
+    args = parser.parse_args(argv)
+    if not args.all and not args.collection and not args.gc:
+        parser.error("Please provide a collection name or use --all or --gc.")
+    if args.gc_grace_secs < 0:
+        parser.error("--gc-grace-secs must not be negative.")
     return args
 
 
-def main() -> None:
-    args = parse_args()
+def _delete_collection(client: chromadb.ClientAPI, name: str) -> None:
+    # Bump the content version first so cached query results keyed on the old version
+    # are never served, even to readers that still hold a handle to the collection.
+    # Best effort: a collection we cannot open can still be deleted.
+    with contextlib.suppress(Exception):
+        bump_content_version(client.get_collection(name=name))
+    client.delete_collection(name=name)
+
+
+def _delete_by_name(client: chromadb.ClientAPI, name: str) -> None:
+    """Delete a collection, or an alias together with its live and retired builds."""
+
+    aliased = load_aliases(client).aliases_of(name)
+    if aliased:
+        raise ValueError(
+            f"'{name}' is the live build of alias {', '.join(aliased)}; delete the alias instead."
+        )
+    owned = remove_alias(client, name)
+    if not owned:
+        _delete_collection(client, name)
+        return
+    existing = {col.name for col in client.list_collections()}
+    for physical in owned:
+        if physical in existing:
+            _delete_collection(client, physical)
+            print(f"Deleted build '{physical}' of alias '{name}'.")
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     client = chromadb.HttpClient(host=settings.chroma_host, port=settings.chroma_port)
 
+    if args.gc:
+        deleted = collect_garbage(client, args.gc_grace_secs)
+        if not deleted:
+            print("No replaced collections past the grace period.")
+        for name in deleted:
+            print(f"Deleted replaced collection '{name}'.")
+        return
+
     if args.all:
         collections = client.list_collections()
         if not collections:
@@ -37,7 +90,7 @@ def main() -> None:
             return
         for col in collections:
             try:
-                client.delete_collection(name=col.name)
+                _delete_collection(client, col.name)
                 print(f"Deleted collection '{col.name}'.")
             except Exception as exc:  # noqa: BLE001
                 print(f"Failed to delete collection '{col.name}': {exc}")
@@ -58,7 +111,7 @@ def main() -> None:
         print(f"Deleting collection #{idx}: '{target_name}'")
 
     try:
-        client.delete_collection(name=target_name)
+        _delete_by_name(client, target_name)
         print(f"Deleted collection '{target_name}'.")
     except Exception as exc:  # noqa: BLE001
         print(f"Failed to delete collection '{target_name}': {exc}")
@@ -2,15 +2,64 @@
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import json
+
 import chromadb
 
 from src.config.settings import settings
-from utils.chroma_utils import report
+from src.utils.async_chroma import collection_report_async, connect_async, report_async
+from utils.chroma_utils import DEFAULT_REPORT_WORKERS, collection_report, report
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="List Chroma collections with counts and metadata."
+    )
+    parser.add_argument(
+        "--format",
+        choices=("text", "json"),
+        default="text",
+        help="Table for people (default) or one JSON document for monitoring.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_REPORT_WORKERS,
+        help="Collections counted concurrently.",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Count on one event loop with the async client instead of a thread per worker.",
+    )
+    args = parser.parse_args(argv)
+    if args.workers <= 0:
+        parser.error("--workers must be positive.")
+    return args
+
+
+async def _report_async(args: argparse.Namespace) -> None:
+    client = await connect_async()
+    if args.format == "json":
+        rows = await collection_report_async(client, max_concurrency=args.workers)
+        print(json.dumps({"collections": rows}))
+        return
+    print(await report_async(client, max_concurrency=args.workers))
 
 
-def main() -> None:
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.use_async:
+        asyncio.run(_report_async(args))
+        return
     client = chromadb.HttpClient(host=settings.chroma_host, port=settings.chroma_port)
-    report_text = report(client)
+    if args.format == "json":
+        print(json.dumps({"collections": collection_report(client, max_workers=args.workers)}))
+        return
+    report_text = report(client, max_workers=args.workers)
     print(report_text)
 
 
@@ -0,0 +1,199 @@
+"""
+Collection aliases: stable names pointing at versioned physical collections.
+
+A blue/green rebuild writes into a fresh ``<alias>__<timestamp>`` collection while
+readers keep using the current one. Once the new build is complete the alias is
+repointed with a single metadata write on the registry collection, so a reader
+resolving the alias sees either the old build or the new one, never a partial
+index. Replaced builds are kept for a grace period (readers may still hold a
+handle to them) and then deleted by :func:`collect_garbage`.
+
+Rebuilds of one alias are expected not to run concurrently: the registry is
+read, changed and written back as a whole.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from src.config.settings import settings
+
+# Collection whose metadata holds the alias table (it stores no records).
+ALIAS_REGISTRY = "collection-aliases"
+# Registry metadata key holding the JSON-encoded alias table.
+ALIASES_KEY = "aliases"
+DEFAULT_GC_GRACE_SECS = settings.collection_gc_grace_secs
+
+# Builds are named to the microsecond; older ones to the second.
+_BUILD_SUFFIX = re.compile(r"__\d{8}T\d{6}(?:\d{6})?Z$")
+
+
+def versioned_name(alias: str, now: datetime | None = None) -> str:
+    """
+    Return the physical collection name for a new build of ``alias``.
+
+    The UTC timestamp suffix has microseconds so that builds started within the
+    same second get distinct names; names still sort in build order.
+    """
+
+    return f"{alias}__{(now or datetime.now(UTC)):%Y%m%dT%H%M%S%fZ}"
+
+
+def is_build_of(name: str, alias: str) -> bool:
+    """Whether ``name`` is a versioned build of ``alias`` (see :func:`versioned_name`)."""
+
+    return name.startswith(f"{alias}__") and bool(_BUILD_SUFFIX.fullmatch(name[len(alias) :]))
+
+
+@dataclass(slots=True)
+class AliasTable:
+    """Alias -> physical collection pointers, and replaced builds awaiting deletion."""
+
+    aliases: dict[str, str] = field(default_factory=dict)
+    retired: dict[str, float] = field(default_factory=dict)  # name -> retired at (epoch secs)
+
+    def resolve(self, name: str) -> str:
+        """Return the collection ``name`` points at (``name`` itself if it is no alias)."""
+
+        return self.aliases.get(name, name)
+
+    def aliases_of(self, name: str) -> list[str]:
+        return sorted(alias for alias, target in self.aliases.items() if target == name)
+
+    def point(self, alias: str, target: str, previous: str | None, now: float) -> None:
+        """Point ``alias`` at ``target`` and retire ``previous``, the collection it replaces."""
+
+        self.aliases[alias] = target
+        self.retired.pop(target, None)
+        if previous is not None and previous != target:
+            self.retired[previous] = now
+
+    def to_json(self) -> str:
+        return json.dumps({"aliases": self.aliases, "retired": self.retired}, sort_keys=True)
+
+    @classmethod
+    def from_metadata(cls, metadata: Mapping[str, Any] | None) -> AliasTable:
+        raw = (metadata or {}).get(ALIASES_KEY)
+        if not raw:
+            return cls()
+        data = json.loads(raw)
+        return cls(
+            aliases={str(alias): str(target) for alias, target in data["aliases"].items()},
+            retired={str(name): float(at) for name, at in data["retired"].items()},
+        )
+
+
+def _create_registry(client: Any) -> Any:
+    # No embedding function: the registry is only ever read for its metadata.
+    return client.get_or_create_collection(name=ALIAS_REGISTRY, embedding_function=None)
+
+
+def _registry(client: Any) -> Any | None:
+    try:
+        return client.get_collection(name=ALIAS_REGISTRY)
+    except Exception:
+        # No alias was ever created.
+        return None
+
+
+def _save(registry: Any, table: AliasTable) -> None:
+    # One ``modify`` replaces the whole table, which makes every change atomic for readers.
+    registry.modify(metadata={ALIASES_KEY: table.to_json()})
+
+
+def load_aliases(client: Any) -> AliasTable:
+    """Return the alias table (empty if no alias exists yet)."""
+
+    registry = _registry(client)
+    return AliasTable.from_metadata(registry.metadata if registry is not None else None)
+
+
+def resolve_alias(client: Any, name: str) -> str:
+    """Return the physical collection ``name`` refers to."""
+
+    return load_aliases(client).resolve(name)
+
+
+def swap_alias(client: Any, alias: str, target: str) -> str | None:
+    """
+    Atomically point ``alias`` at ``target``; return the collection it replaced, if any.
+
+    The replaced collection is retired. Before its first swap an alias shadows any
+    plain collection of the same name, which is retired the same way.
+    """
+
+    registry = _create_registry(client)
+    table = AliasTable.from_metadata(registry.metadata)
+    previous = table.aliases.get(alias)
+    if previous is None and alias in {col.name for col in client.list_collections()}:
+        previous = alias
+    table.point(alias, target, previous, time.time())
+    _save(registry, table)
+    return previous if previous != target else None
+
+
+def retire_collection(client: Any, name: str) -> None:
+    """Schedule a collection no alias points at (e.g. a failed build) for deletion."""
+
+    registry = _create_registry(client)
+    table = AliasTable.from_metadata(registry.metadata)
+    if name not in table.aliases.values():
+        table.retired.setdefault(name, time.time())
+        _save(registry, table)
+
+
+def remove_alias(client: Any, alias: str) -> list[str]:
+    """
+    Drop ``alias`` and return the collections it owned: its live build and retired builds.
+
+    The caller deletes them; the registry no longer tracks them afterwards.
+    """
+
+    registry = _registry(client)
+    table = AliasTable.from_metadata(registry.metadata if registry is not None else None)
+    if registry is None or alias not in table.aliases:
+        return []
+    owned = [table.aliases.pop(alias)]
+    live = set(table.aliases.values())
+    for name in list(table.retired):
+        if (name == alias or is_build_of(name, alias)) and name not in live:
+            owned.append(name)
+            del table.retired[name]
+    _save(registry, table)
+    return owned
+
+
+def collect_garbage(
+    client: Any, grace_secs: float = DEFAULT_GC_GRACE_SECS, now: float | None = None
+) -> list[str]:
+    """Delete retired collections older than ``grace_secs``; return the deleted names."""
+
+    registry = _registry(client)
+    if registry is None:
+        return []
+    table = AliasTable.from_metadata(registry.metadata)
+    now = time.time() if now is None else now
+    live = set(table.aliases.values())
+    expired = [
+        name
+        for name, retired_at in table.retired.items()
+        if name not in live and now - retired_at >= grace_secs
+    ]
+    if not expired:
+        return []
+
+    existing = {col.name for col in client.list_collections()}
+    deleted = []
+    for name in expired:
+        if name in existing:
+            client.delete_collection(name=name)
+            deleted.append(name)
+        del table.retired[name]
+    _save(registry, table)
+    return deleted
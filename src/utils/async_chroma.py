@@ -0,0 +1,448 @@
+"""
+Asyncio variants of ingestion, reporting and search on ``chromadb.AsyncHttpClient``.
+
+One async client keeps a single keep-alive HTTP connection pool (sized by the
+``CHROMA_HTTP_*`` settings) for all of its requests, so hundreds of adds, counts
+and queries can share one event loop instead of a thread each. Each entry point
+caps its own requests in flight at ``max_concurrency``.
+
+Embedding functions are blocking, so embedding still runs on worker threads
+(``asyncio.to_thread``); only the Chroma requests are native coroutines.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+import chromadb
+from chromadb.config import Settings as ChromaSettings
+
+from src.config.settings import settings
+from src.utils.aliases import ALIAS_REGISTRY, AliasTable
+from src.utils.batching import (
+    DEFAULT_MAX_BATCH_ITEMS,
+    DEFAULT_MAX_BATCH_TOKENS,
+    BatchSizeStats,
+    RecordBatch,
+    TokenBatcher,
+    estimate_tokens,
+)
+from src.utils.chroma_utils import (
+    DEFAULT_REPORT_WORKERS,
+    _collection_cache_namespace,
+    _embed_batch,
+    _source_path,
+    build_embedding_function,
+    collection_quantization,
+    describe_collection,
+    format_report,
+    get_record_batch_reader,
+    merged_metadata,
+)
+from src.utils.embedding_cache import EmbeddingCache
+from src.utils.facets import FACETS_KEY, FacetIndex
+from src.utils.filters import EMPTY, QUERY
+from src.utils.metrics import IngestMetrics
+from src.utils.result_cache import CONTENT_VERSION_KEY, QueryResultCache, content_version
+from src.utils.search import (
+    DEFAULT_QUERY_BATCH_SIZE,
+    DEFAULT_RESULT_FIELDS,
+    QueryRequest,
+    _batched,
+    _cached_answers,
+    _empty_response,
+    _format_results,
+    _include,
+    _record_lookups,
+    _store_answers,
+)
+
+DEFAULT_ASYNC_CONCURRENCY = settings.chroma_async_max_concurrency
+
+
+def http_settings() -> ChromaSettings:
+    """Chroma client settings sizing the HTTP connection pool from our settings."""
+
+    return ChromaSettings(
+        chroma_http_max_connections=settings.chroma_http_max_connections,
+        chroma_http_max_keepalive_connections=settings.chroma_http_max_keepalive_connections,
+        chroma_http_keepalive_secs=settings.chroma_http_keepalive_secs,
+    )
+
+
+async def connect_async(host: str | None = None, port: int | None = None) -> Any:
+    """
+    Return an async client for the configured Chroma server.
+
+    Create one per run and share it: every collection fetched from it reuses the
+    same connection pool, whose size should be at least the ``max_concurrency``
+    used with it so no request waits for a connection.
+    """
+
+    return await chromadb.AsyncHttpClient(
+        host=host or settings.chroma_host,
+        port=port or settings.chroma_port,
+        settings=http_settings(),
+    )
+
+
+async def get_collection_with_embedding_async(
+    client: Any,
+    name: str,
+    provider: str | None = None,
+    model: str | None = None,
+) -> Any:
+    """Async counterpart of :func:`src.utils.chroma_utils.get_collection_with_embedding`."""
+
+    name = (await load_aliases_async(client)).resolve(name)
+    existing_metadata: dict[str, Any] = {}
+    try:
+        existing_metadata = (await client.get_collection(name=name)).metadata or {}
+    except Exception:
+        # Collection may not exist yet; fall back to configured defaults.
+        existing_metadata = {}
+
+    embedding_fn = build_embedding_function(
+        metadata=existing_metadata,
+        provider=provider,
+        model=model,
+    )
+
+    try:
+        return await client.get_collection(name=name, embedding_function=embedding_fn)
+    except ValueError as exc:
+        if "embedding function already exists" in str(exc).lower():
+            return await client.get_collection(name=name)
+        raise
+
+
+async def load_aliases_async(client: Any) -> AliasTable:
+    """Async counterpart of :func:`src.utils.aliases.load_aliases`."""
+
+    try:
+        registry = await client.get_collection(name=ALIAS_REGISTRY)
+    except Exception:
+        # No alias was ever created.
+        return AliasTable()
+    return AliasTable.from_metadata(registry.metadata)
+
+
+async def update_collection_metadata_async(collection: Any, updates: Mapping[str, Any]) -> None:
+    """Merge ``updates`` into a collection's metadata (see ``update_collection_metadata``)."""
+
+    await collection.modify(metadata=merged_metadata(collection, updates))
+
+
+async def bump_content_version_async(collection: Any) -> str:
+    """Async counterpart of :func:`src.utils.chroma_utils.bump_content_version`."""
+
+    version = uuid.uuid4().hex
+    await update_collection_metadata_async(collection, {CONTENT_VERSION_KEY: version})
+    return version
+
+
+async def current_content_version_async(client: Any, collection: Any) -> str:
+    """Async counterpart of :func:`src.utils.result_cache.current_content_version`."""
+
+    return content_version(await client.get_collection(name=collection.name))
+
+
+# ---- Ingestion -------------------------------------------------------------
+
+
+def _regrouped(
+    batches: Iterable[RecordBatch],
+    facets: FacetIndex,
+    max_batch_tokens: int | None,
+    max_batch_items: int,
+) -> Iterator[RecordBatch]:
+    """Count facets as batches stream past and regroup them by token budget, if set."""
+
+    batcher = (
+        TokenBatcher(max_tokens=max_batch_tokens, max_items=max_batch_items)
+        if max_batch_tokens
+        else None
+    )
+    for batch in batches:
+        facets.add(batch.metadatas)
+        if batcher is None:
+            yield batch
+        else:
+            yield from batcher.add(batch)
+    if batcher is not None:
+        yield from batcher.flush()
+
+
+async def _write_batch_async(
+    collection: Any,
+    batch: RecordBatch,
+    max_batch_size: int | None = None,
+    stats: BatchSizeStats | None = None,
+) -> None:
+    """Add an embedded batch, split to respect the server's max batch size."""
+
+    for part in batch.slices(max_batch_size or len(batch) or 1):
+        await collection.add(
+            ids=part.ids,
+            documents=part.documents,
+            metadatas=part.metadatas,
+            embeddings=part.embeddings,
+        )
+        if stats is not None:
+            stats.record("write", len(part))
+
+
+async def ingest_source_async(
+    tsv_path: Path,
+    collections: Sequence[Any],
+    embedding_functions: Sequence[Any | None] | None = None,
+    batch_size: int = 200,
+    cache: EmbeddingCache | None = None,
+    max_concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    max_batch_tokens: int | None = DEFAULT_MAX_BATCH_TOKENS,
+    max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS,
+    max_write_batch_size: int | None = None,
+    batch_stats: BatchSizeStats | None = None,
+    reader: str = "csv",
+    metrics: IngestMetrics | None = None,
+) -> list[int]:
+    """
+    Parse a TSV once and ingest it into every ``AsyncCollection`` in ``collections``.
+
+    The TSV is parsed on a worker thread one batch ahead of the writers, and each
+    batch is fanned out to all collections. Every copy is embedded on a worker
+    thread (through ``cache`` when given) and then added with ``await
+    collection.add``; at most ``max_concurrency`` batches are being embedded or
+    written at once across all collections. Embeddings are always computed
+    client-side, with the matching entry of ``embedding_functions`` or one built
+    from the collection's metadata, since an async collection would otherwise
+    embed on the event loop.
+
+    Batching, metrics and the facet index stored afterwards work as in
+    :func:`src.utils.chroma_utils.ingest_source`. Returns the number of rows added
+    to each collection.
+    """
+
+    if max_concurrency <= 0:
+        raise ValueError("max_concurrency must be positive.")
+    if not tsv_path.exists():
+        raise FileNotFoundError(f"Source file not found: {tsv_path}")
+
+    functions = [
+        function if function is not None else build_embedding_function(metadata=col.metadata)
+        for col, function in zip(
+            collections, embedding_functions or [None] * len(collections), strict=True
+        )
+    ]
+    namespaces = [_collection_cache_namespace(col) for col in collections]
+    quantizations = [collection_quantization(col) for col in collections]
+    metrics = metrics if metrics is not None else IngestMetrics()
+    facets = FacetIndex()
+    batches = _regrouped(
+        get_record_batch_reader(reader)(tsv_path, batch_size, 0, metrics),
+        facets,
+        max_batch_tokens,
+        max_batch_items,
+    )
+    limit = asyncio.Semaphore(max_concurrency)
+    written = [0] * len(collections)
+
+    async def ingest(position: int, batch: RecordBatch) -> None:
+        try:
+            tokens = sum(estimate_tokens(document) for document in batch.documents)
+            with metrics.in_flight(), metrics.timed("embed", len(batch), tokens):
+                embedded = await asyncio.to_thread(
+                    _embed_batch,
+                    batch,
+                    functions[position],
+                    cache,
+                    namespaces[position],
+                    batch_stats,
+                    quantizations[position],
+                )
+            started = time.perf_counter()
+            await _write_batch_async(
+                collections[position], embedded, max_write_batch_size, batch_stats
+            )
+            metrics.record("write", time.perf_counter() - started, len(batch))
+            written[position] += len(batch)
+        finally:
+            limit.release()
+
+    tasks: set[asyncio.Task[None]] = set()
+    try:
+        while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+            for position in range(len(collections)):
+                await limit.acquire()
+                for task in [task for task in tasks if task.done()]:
+                    tasks.discard(task)
+                    task.result()  # Surface a failed batch before reading further.
+                tasks.add(asyncio.create_task(ingest(position, batch)))
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    facets_json = facets.finish().to_json()
+    await asyncio.gather(
+        *(update_collection_metadata_async(col, {FACETS_KEY: facets_json}) for col in collections)
+    )
+    return written
+
+
+async def populate_collection_from_tsv_async(
+    collection: Any,
+    batch_size: int = 200,
+    embedding_function: Any | None = None,
+    **options: Any,
+) -> int:
+    """
+    Async counterpart of ``populate_collection_from_tsv`` for an ``AsyncCollection``.
+
+    Ingests the collection's configured source with :func:`ingest_source_async`,
+    which takes the same ``options``. Returns the number of rows added.
+    """
+
+    (written,) = await ingest_source_async(
+        _source_path(collection),
+        [collection],
+        [embedding_function],
+        batch_size=batch_size,
+        **options,
+    )
+    return written
+
+
+# ---- Reporting -------------------------------------------------------------
+
+
+async def _collection_row_async(
+    col: Any, aliases: AliasTable, limit: asyncio.Semaphore
+) -> dict[str, Any]:
+    async with limit:
+        started = time.perf_counter()
+        count: int | None = None
+        error: str | None = None
+        try:
+            count = await col.count()
+        except Exception as exc:  # noqa: BLE001
+            error = str(exc)
+        return describe_collection(col, count, error, started, aliases)
+
+
+async def collection_report_async(
+    client: Any, max_concurrency: int = DEFAULT_REPORT_WORKERS
+) -> list[dict[str, Any]]:
+    """
+    Async counterpart of ``collection_report``: same rows, counted on one event loop.
+
+    At most ``max_concurrency`` ``count()`` requests are in flight at once.
+    """
+
+    if max_concurrency <= 0:
+        raise ValueError("max_concurrency must be positive.")
+
+    aliases = await load_aliases_async(client)
+    collections = [col for col in await client.list_collections() if col.name != ALIAS_REGISTRY]
+    limit = asyncio.Semaphore(max_concurrency)
+    return list(
+        await asyncio.gather(*(_collection_row_async(col, aliases, limit) for col in collections))
+    )
+
+
+async def report_async(client: Any, max_concurrency: int = DEFAULT_REPORT_WORKERS) -> str:
+    """Build the same text report as ``report`` with an async client."""
+
+    return format_report(await collection_report_async(client, max_concurrency=max_concurrency))
+
+
+# ---- Search ----------------------------------------------------------------
+
+
+async def search_batches_async(
+    collection: Any,
+    queries: Iterable[QueryRequest],
+    n_results: int = 5,
+    batch_size: int = DEFAULT_QUERY_BATCH_SIZE,
+    where: dict[str, Any] | None = None,
+    fields: Sequence[str] | None = DEFAULT_RESULT_FIELDS,
+    include_documents: bool = False,
+    embed_queries: Callable[[list[str]], Sequence[Any]] | None = None,
+    result_cache: QueryResultCache | None = None,
+    strategy: str = QUERY,
+    max_concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    client: Any | None = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Async counterpart of ``search_batches`` for an ``AsyncCollection``.
+
+    Up to ``max_concurrency`` groups of ``batch_size`` queries are searched at once;
+    result lists are still yielded one per group, in input order. Query texts are
+    embedded on a worker thread with ``embed_queries`` (default: the embedding
+    function from the collection's metadata). A ``GET`` strategy is searched as a
+    plain vector query; ``EMPTY`` answers without any request. With a ``client``,
+    the content version for ``result_cache`` is read from the server once per call.
+    """
+
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+    if max_concurrency <= 0:
+        raise ValueError("max_concurrency must be positive.")
+
+    include = _include(include_documents)
+    embed = embed_queries or build_embedding_function(metadata=collection.metadata)
+
+    version = ""
+    if result_cache is not None:
+        version = (
+            await current_content_version_async(client, collection)
+            if client is not None
+            else content_version(collection)
+        )
+
+    async def search(group: list[QueryRequest]) -> list[dict[str, Any]]:
+        started = time.perf_counter()
+        answers, pending = _cached_answers(
+            collection, group, n_results, where, include, result_cache, version
+        )
+        lookup_seconds = time.perf_counter() - started
+
+        miss_seconds = 0.0
+        if pending:
+            started = time.perf_counter()
+            texts = [group[positions[0]].text for positions in pending.values()]
+            if strategy == EMPTY:
+                response = _empty_response(texts)
+            else:
+                embeddings = await asyncio.to_thread(embed, texts)
+                response = await collection.query(
+                    query_embeddings=list(embeddings),
+                    n_results=n_results,
+                    where=where,
+                    include=include,
+                )
+            _store_answers(response, pending, answers, result_cache)
+            miss_seconds = time.perf_counter() - started
+
+        _record_lookups(result_cache, group, pending, lookup_seconds, miss_seconds)
+        return _format_results(group, answers, fields, include_documents)
+
+    in_flight: deque[asyncio.Task[list[dict[str, Any]]]] = deque()
+    try:
+        for group in _batched(queries, batch_size):
+            if len(in_flight) >= max_concurrency:
+                yield await in_flight.popleft()
+            in_flight.append(asyncio.create_task(search(group)))
+        while in_flight:
+            yield await in_flight.popleft()
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -0,0 +1,202 @@
+"""Record batches and adaptive batch sizing for embedding requests and Chroma writes."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+# Conservative characters-per-token ratio; real English text averages closer to 4.
+CHARS_PER_TOKEN = 3
+
+# OpenAI accepts at most 2048 inputs per embeddings request.
+DEFAULT_MAX_BATCH_ITEMS = 2048
+DEFAULT_MAX_BATCH_TOKENS = 100_000
+
+_LIMIT_ERROR_HINTS = (
+    "maximum context length",
+    "too many tokens",
+    "max_tokens_per_request",
+    "maximum request size",
+    "too many inputs",
+    "batch size",
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Return a cheap, deliberately pessimistic token estimate for a document."""
+
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass(slots=True)
+class RecordBatch:
+    """A batch of records ready for Chroma, with the source row index of each record."""
+
+    rows: list[int] = field(default_factory=list)
+    ids: list[str] = field(default_factory=list)
+    documents: list[str] = field(default_factory=list)
+    metadatas: list[dict[str, Any]] = field(default_factory=list)
+    embeddings: list[Any] | None = None
+
+    @property
+    def start(self) -> int:
+        """Index of the first source row in the batch."""
+
+        return self.rows[0] if self.rows else 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def select(self, positions: Sequence[int]) -> RecordBatch:
+        """Return a new batch holding only the records at ``positions``."""
+
+        return RecordBatch(
+            rows=[self.rows[i] for i in positions],
+            ids=[self.ids[i] for i in positions],
+            documents=[self.documents[i] for i in positions],
+            metadatas=[self.metadatas[i] for i in positions],
+            embeddings=None
+            if self.embeddings is None
+            else [self.embeddings[i] for i in positions],
+        )
+
+    def slices(self, size: int) -> Iterator[RecordBatch]:
+        """Yield consecutive sub-batches of at most ``size`` records."""
+
+        if len(self) <= size:
+            yield self
+            return
+        for offset in range(0, len(self), size):
+            yield self.select(range(offset, min(offset + size, len(self))))
+
+
+@dataclass(slots=True)
+class BatchSizeStats:
+    """Thread-safe record of the batch sizes actually chosen, per kind of request."""
+
+    sizes: dict[str, list[int]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, kind: str, size: int) -> None:
+        with self._lock:
+            self.sizes.setdefault(kind, []).append(size)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Return request count and min/mean/max batch size per kind."""
+
+        with self._lock:
+            return {
+                kind: {
+                    "requests": len(values),
+                    "min": min(values),
+                    "mean": sum(values) / len(values),
+                    "max": max(values),
+                }
+                for kind, values in self.sizes.items()
+                if values
+            }
+
+    def describe(self) -> str:
+        lines = [
+            f"{kind}: {int(stats['requests'])} requests, batch size "
+            f"min {int(stats['min'])} / mean {stats['mean']:.1f} / max {int(stats['max'])}"
+            for kind, stats in sorted(self.summary().items())
+        ]
+        return "\n".join(lines) if lines else "no batches"
+
+
+class TokenBatcher:
+    """
+    Regroup a stream of record batches into batches bounded by an estimated token budget.
+
+    Each emitted batch holds as many records as fit within ``max_tokens`` and
+    ``max_items``; a single record larger than the budget is emitted on its own so
+    it never blocks the rest of the stream.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_items: int = DEFAULT_MAX_BATCH_ITEMS,
+    ) -> None:
+        if max_tokens <= 0 or max_items <= 0:
+            raise ValueError("max_tokens and max_items must be positive.")
+
+        self.max_tokens = max_tokens
+        self.max_items = max_items
+        self._pending: RecordBatch | None = None
+        self._pending_tokens = 0
+
+    def add(self, batch: RecordBatch) -> Iterator[RecordBatch]:
+        """Buffer a batch, yielding any batches that are now full."""
+
+        for i, document in enumerate(batch.documents):
+            tokens = estimate_tokens(document)
+            pending = self._pending
+            if pending is not None and (
+                self._pending_tokens + tokens > self.max_tokens
+                or len(pending) >= self.max_items
+            ):
+                yield pending
+                pending = None
+            if pending is None:
+                pending = self._pending = RecordBatch()
+                self._pending_tokens = 0
+
+            pending.rows.append(batch.rows[i])
+            pending.ids.append(batch.ids[i])
+            pending.documents.append(document)
+            pending.metadatas.append(batch.metadatas[i])
+            self._pending_tokens += tokens
+
+    @property
+    def pending_start(self) -> int | None:
+        """Source row index of the oldest buffered record, if any."""
+
+        return self._pending.start if self._pending is not None and len(self._pending) else None
+
+    def flush(self) -> Iterator[RecordBatch]:
+        """Yield whatever is still buffered."""
+
+        if self._pending is not None and len(self._pending):
+            yield self._pending
+        self._pending = None
+        self._pending_tokens = 0
+
+
+def is_limit_error(exc: BaseException) -> bool:
+    """Return True if an embedding error looks like a request-size limit rejection."""
+
+    status = getattr(exc, "status_code", None)
+    if status == 413:
+        return True
+    message = str(exc).lower()
+    return (status in (None, 400)) and any(hint in message for hint in _LIMIT_ERROR_HINTS)
+
+
+def embed_adaptively(
+    embed_fn: Callable[[list[str]], Sequence[Any]],
+    texts: list[str],
+    stats: BatchSizeStats | None = None,
+) -> list[Any]:
+    """
+    Embed texts, halving the request whenever the provider rejects it as too large.
+
+    A single text that is still rejected re-raises the provider error.
+    """
+
+    try:
+        vectors = list(embed_fn(texts))
+    except Exception as exc:
+        if len(texts) <= 1 or not is_limit_error(exc):
+            raise
+        middle = len(texts) // 2
+        return embed_adaptively(embed_fn, texts[:middle], stats) + embed_adaptively(
+            embed_fn, texts[middle:], stats
+        )
+
+    if stats is not None:
+        stats.record("embed", len(texts))
+    return vectors
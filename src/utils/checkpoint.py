@@ -0,0 +1,109 @@
+"""Checkpoints that let an interrupted ingestion run resume from its last committed batch."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+from src.config.settings import settings
+
+DEFAULT_CHECKPOINT_DIR = settings.cache_dir / "checkpoints"
+
+
+def source_fingerprint(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Return a content fingerprint (size plus SHA-256) for a source file."""
+
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return f"{path.stat().st_size}:{digest.hexdigest()}"
+
+
+@dataclass(slots=True)
+class Checkpoint:
+    """Progress of one collection's ingestion from one source file."""
+
+    collection: str
+    source: str
+    fingerprint: str
+    rows_committed: int
+    updated_at: str = ""
+
+
+class CheckpointStore:
+    """JSON checkpoint files, one per collection, written atomically."""
+
+    def __init__(self, directory: Path | str = DEFAULT_CHECKPOINT_DIR) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, collection: str) -> Path:
+        return self.directory / f"{collection}.json"
+
+    def load(self, collection: str) -> Checkpoint | None:
+        path = self._path(collection)
+        if not path.exists():
+            return None
+        return Checkpoint(**json.loads(path.read_text()))
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        checkpoint.updated_at = datetime.now(UTC).isoformat()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(checkpoint.collection)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(asdict(checkpoint), indent=2))
+        os.replace(tmp_path, path)
+
+    def clear(self, collection: str) -> None:
+        self._path(collection).unlink(missing_ok=True)
+
+
+class CommitTracker:
+    """
+    Track the row index below which every source row has been committed.
+
+    Batches may be written out of order by concurrent workers, so the watermark only
+    advances past a batch once every earlier in-flight batch has been written too.
+    """
+
+    def __init__(self, start_row: int = 0) -> None:
+        self._outstanding: Counter[int] = Counter()
+        self._read_upto = start_row
+        self._lock = threading.Lock()
+
+    def dispatched(self, batch_start: int) -> None:
+        """Record that a batch whose lowest row is ``batch_start`` is in flight."""
+
+        with self._lock:
+            self._outstanding[batch_start] += 1
+
+    def read_upto(self, row: int) -> None:
+        """Record that every row below ``row`` has been dispatched or needs no write."""
+
+        with self._lock:
+            self._read_upto = max(self._read_upto, row)
+
+    def committed(self, batch_start: int) -> int:
+        """Record a written batch and return the new watermark."""
+
+        with self._lock:
+            self._outstanding[batch_start] -= 1
+            if self._outstanding[batch_start] <= 0:
+                del self._outstanding[batch_start]
+            return self._watermark()
+
+    def _watermark(self) -> int:
+        if self._outstanding:
+            return min(min(self._outstanding), self._read_upto)
+        return self._read_upto
+
+    @property
+    def watermark(self) -> int:
+        with self._lock:
+            return self._watermark()
@@ -1,19 +1,47 @@
 from __future__ import annotations
 
 import csv
-from collections.abc import Iterable, Iterator, Mapping
+import hashlib
+import itertools
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Any
 
-import pandas as pd
-from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction
 
 from src.config.settings import settings
+from src.utils.aliases import ALIAS_REGISTRY, AliasTable, load_aliases, resolve_alias
+from src.utils.batching import (
+    DEFAULT_MAX_BATCH_ITEMS,
+    DEFAULT_MAX_BATCH_TOKENS,
+    BatchSizeStats,
+    RecordBatch,
+    TokenBatcher,
+    embed_adaptively,
+    estimate_tokens,
+)
+from src.utils.checkpoint import Checkpoint, CheckpointStore, CommitTracker, source_fingerprint
+from src.utils.embedding_cache import EmbeddingCache, QueryEmbeddingCache, cache_namespace
+from src.utils.embeddings import create_embedding_function
+from src.utils.facets import FACETS_KEY, FacetIndex
+from src.utils.metrics import IngestMetrics
+from src.utils.pipeline import Pipeline
+from src.utils.quantization import FLOAT32, QUANTIZATION_KEY, check_quantization, round_trip
+from src.utils.result_cache import CONTENT_VERSION_KEY
 
 # ---- Ingestion helpers -----------------------------------------------------
 
 Row = Mapping[str, str | None]
 
+# Per-record metadata key holding a hash of the stored document and metadata.
+CONTENT_HASH_KEY = "content_hash"
+
 
 def _chunked(iterable: Iterable[Row], size: int) -> Iterator[list[Row]]:
     batch: list[Row] = []
@@ -61,74 +89,548 @@ def _parse_numeric_fields(row: Row) -> dict[str, Any]:
     return parsed
 
 
+def _content_hash(document: str, metadata: Mapping[str, Any]) -> str:
+    """
+    Return a stable hash of everything we store for a record.
+
+    The payload is the document followed by ``"\x1f<key>=<value>"`` for each metadata
+    key in sorted order.
+    """
+
+    payload = document + "".join(
+        f"\x1f{key}={metadata[key]}" for key in sorted(metadata) if key != CONTENT_HASH_KEY
+    )
+    return _hash_payload(payload)
+
+
+def _hash_payload(payload: str) -> str:
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _record_id(row: Row, idx: int) -> str:
+    return str(row.get("url") or row.get("number") or f"row-{idx}")
+
+
+def _build_record(row: Row, idx: int) -> tuple[str, str, dict[str, Any]]:
+    """Return the (id, document, metadata) triple stored in Chroma for a TSV row."""
+
+    # url	name	album	collection	number	type	rarity	release_date	energy	power	ppe	ability_name	ability_description	tags
+    doc_id = _record_id(row, idx)
+    document = _build_document_text(row)
+    metadata = {
+        "source": row.get("url"),
+        "name": row.get("name"),
+        "album": row.get("album"),
+        "collection": row.get("collection"),
+        "type": row.get("type"),
+        "rarity": row.get("rarity"),
+        "release_date": row.get("release_date"),
+        "tags": row.get("tags"),
+    }
+    metadata.update(_parse_numeric_fields(row))
+    metadata[CONTENT_HASH_KEY] = _content_hash(document, metadata)
+    return doc_id, document, metadata
+
+
+def count_source_records(tsv_path: Path) -> int:
+    """
+    Return how many records a full ingest of ``tsv_path`` stores.
+
+    That is the number of distinct record ids: rows sharing an id end up as one record.
+    """
+
+    return len({_record_id(row, idx) for idx, row in enumerate(_load_rows(tsv_path))})
+
+
+def _iter_record_batches(
+    tsv_path: Path,
+    batch_size: int,
+    start_row: int = 0,
+    metrics: IngestMetrics | None = None,
+) -> Iterator[RecordBatch]:
+    """
+    Yield record batches for consecutive runs of TSV rows, skipping rows before ``start_row``.
+
+    With ``metrics``, the time spent parsing each batch's rows and building its
+    records is recorded as the ``parse`` and ``build`` stages.
+    """
+
+    rows_iter = _load_rows(tsv_path)
+    # Skipped rows are still parsed (quoted fields may span lines) but not transformed.
+    total = sum(1 for _ in itertools.islice(rows_iter, start_row))
+    chunks = _chunked(rows_iter, size=batch_size)
+    while True:
+        started = time.perf_counter()
+        rows = next(chunks, None)
+        if rows is None:
+            return
+        parsed = time.perf_counter()
+        batch = RecordBatch()
+        for idx, row in enumerate(rows, total):
+            doc_id, document, metadata = _build_record(row, idx)
+            batch.rows.append(idx)
+            batch.ids.append(doc_id)
+            batch.documents.append(document)
+            batch.metadatas.append(metadata)
+        if metrics is not None:
+            metrics.record("parse", parsed - started, len(rows))
+            metrics.record("build", time.perf_counter() - parsed, len(rows))
+
+        yield batch
+        total += len(rows)
+
+
+# Called as ``reader(tsv_path, batch_size, start_row, metrics)``.
+RecordBatchReader = Callable[[Path, int, int, "IngestMetrics | None"], Iterator[RecordBatch]]
+
+
+def get_record_batch_reader(name: str = "csv") -> RecordBatchReader:
+    """
+    Return the TSV reader registered under ``name``.
+
+    ``csv`` parses rows one by one with ``csv.DictReader``; ``parallel`` parses
+    byte-range shards of the file on a process pool.
+    """
+
+    if name == "csv":
+        return _iter_record_batches
+    if name == "parallel":
+        from src.utils.parallel import iter_record_batches_parallel
+
+        return iter_record_batches_parallel
+    raise ValueError(f"Unknown record batch reader '{name}'.")
+
+
+def _source_path(collection: Any) -> Path:
+    tsv_path = Path(collection.metadata["source"])
+    if not tsv_path.exists():
+        raise FileNotFoundError(f"Source file not found: {tsv_path}")
+    return tsv_path
+
+
+def _collection_cache_namespace(collection: Any) -> str:
+    metadata = collection.metadata or {}
+    return cache_namespace(
+        provider=str(metadata.get("provider", "")),
+        model=str(metadata.get("embedding_model", "")),
+        dimensions=metadata.get("dimensions"),
+    )
+
+
+def collection_quantization(collection: Any) -> str:
+    """Return how a collection's precomputed embeddings are stored (see ``quantization``)."""
+
+    return check_quantization((collection.metadata or {}).get(QUANTIZATION_KEY))
+
+
+def _embed_batch(
+    batch: RecordBatch,
+    embedding_function: Any | None,
+    cache: EmbeddingCache | None,
+    namespace: str,
+    stats: BatchSizeStats | None = None,
+    quantization: str = FLOAT32,
+) -> RecordBatch:
+    """
+    Return a copy of a batch with precomputed embeddings, going through the cache when given.
+
+    The cache keeps full-precision vectors; with a ``quantization`` other than
+    float32 the written vectors carry only the precision that storage keeps, so the
+    collection, its snapshots and its mirrors hold the same values.
+    """
+
+    if embedding_function is None:
+        if cache is not None:
+            raise ValueError("An embedding_function is required when using an embedding cache.")
+        # Leave embeddings unset so the collection's embedding function handles them.
+        return batch
+
+    def embed(texts: list[str]) -> list[Any]:
+        return embed_adaptively(embedding_function, texts, stats)
+
+    if cache is None:
+        embeddings = embed(batch.documents)
+    else:
+        embeddings = cache.embed(batch.documents, embed, namespace)
+    if quantization != FLOAT32 and embeddings:
+        embeddings = list(round_trip(np.asarray(embeddings), quantization))
+    # Batches are shared between targets, so never mutate the input.
+    return replace(batch, embeddings=embeddings)
+
+
+def _write_batch(
+    collection: Any,
+    batch: RecordBatch,
+    upsert: bool = False,
+    max_batch_size: int | None = None,
+    stats: BatchSizeStats | None = None,
+) -> None:
+    """Add (or upsert) a batch, split to respect the server's max batch size."""
+
+    write = collection.upsert if upsert else collection.add
+    for part in batch.slices(max_batch_size or len(batch) or 1):
+        if part.embeddings is None:
+            write(ids=part.ids, documents=part.documents, metadatas=part.metadatas)
+        else:
+            write(
+                ids=part.ids,
+                documents=part.documents,
+                metadatas=part.metadatas,
+                embeddings=part.embeddings,
+            )
+        if stats is not None:
+            stats.record("write", len(part))
+
+
+def iter_collection_pages(
+    collection: Any,
+    include: list[str] | None = None,
+    page_size: int = 1000,
+) -> Iterator[dict[str, Any]]:
+    """Yield ``collection.get`` results page by page until the collection is exhausted."""
+
+    offset = 0
+    while True:
+        page = collection.get(include=include or [], limit=page_size, offset=offset)
+        if not page["ids"]:
+            return
+        yield page
+        offset += len(page["ids"])
+
+
+@dataclass(slots=True)
+class SyncResult:
+    """Row counts produced by a delta sync."""
+
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.added + self.updated + self.unchanged
+
+
+@dataclass(slots=True)
+class IngestTarget:
+    """
+    A collection receiving records parsed from a shared TSV source.
+
+    With ``sync`` enabled only new or changed rows are upserted and ids missing from
+    the source are deleted; ``sync_result`` then holds the row counts. Sync runs are
+    naturally resumable since already-written rows match their content hash.
+
+    Otherwise rows before ``resume_from`` are skipped (they were committed by an
+    earlier, interrupted run) and the rest are upserted so partially written batches
+    can be replayed safely.
+    """
+
+    collection: Any
+    embedding_function: Any | None = None
+    sync: bool = False
+    resume_from: int = 0
+    written: int = 0
+    sync_result: SyncResult = field(default_factory=SyncResult)
+    tracker: CommitTracker = field(default_factory=CommitTracker, repr=False)
+    _existing: dict[str, str | None] = field(default_factory=dict, repr=False)
+    _seen: set[str] = field(default_factory=set, repr=False)
+    _checkpointed: int = field(default=0, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def name(self) -> str:
+        return str(self.collection.name)
+
+    @property
+    def upsert(self) -> bool:
+        return self.sync or self.resume_from > 0
+
+    def commit(
+        self,
+        batch: RecordBatch,
+        store: CheckpointStore | None = None,
+        source: Path | None = None,
+        fingerprint: str = "",
+    ) -> None:
+        """Record a written batch and persist the commit watermark if it moved."""
+
+        with self._lock:
+            self.written += len(batch)
+            watermark = self.tracker.committed(batch.start)
+            if store is None or source is None or self.sync or watermark <= self._checkpointed:
+                return
+            store.save(
+                Checkpoint(
+                    collection=self.name,
+                    source=str(source),
+                    fingerprint=fingerprint,
+                    rows_committed=watermark,
+                )
+            )
+            self._checkpointed = watermark
+
+    def load_existing(self, page_size: int) -> None:
+        """Stream existing ids and content hashes from the collection."""
+
+        self._existing.clear()
+        for page in iter_collection_pages(
+            self.collection, include=["metadatas"], page_size=page_size
+        ):
+            for doc_id, metadata in zip(page["ids"], page["metadatas"], strict=True):
+                self._existing[doc_id] = (metadata or {}).get(CONTENT_HASH_KEY)
+
+    def select(self, batch: RecordBatch) -> RecordBatch | None:
+        """Return the part of a batch this target needs to write, or None."""
+
+        if not self.sync:
+            if batch.rows and batch.rows[-1] < self.resume_from:
+                return None
+            if batch.start < self.resume_from:
+                return batch.select(
+                    [i for i, row in enumerate(batch.rows) if row >= self.resume_from]
+                )
+            return batch
+
+        changed = [
+            i
+            for i, (doc_id, metadata) in enumerate(zip(batch.ids, batch.metadatas, strict=True))
+            if self._existing.get(doc_id) != metadata[CONTENT_HASH_KEY]
+        ]
+        self._seen.update(batch.ids)
+        for i in changed:
+            if batch.ids[i] in self._existing:
+                self.sync_result.updated += 1
+            else:
+                self.sync_result.added += 1
+        self.sync_result.unchanged += len(batch) - len(changed)
+        return batch.select(changed) if changed else None
+
+    def delete_vanished(self, page_size: int) -> None:
+        vanished = [doc_id for doc_id in self._existing if doc_id not in self._seen]
+        for start in range(0, len(vanished), page_size):
+            self.collection.delete(ids=vanished[start : start + page_size])
+        self.sync_result.deleted = len(vanished)
+
+
+def ingest_source(
+    tsv_path: Path,
+    targets: Sequence[IngestTarget],
+    batch_size: int = 200,
+    cache: EmbeddingCache | None = None,
+    max_concurrency: int = 4,
+    page_size: int = 1000,
+    max_batch_tokens: int | None = None,
+    max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS,
+    max_write_batch_size: int | None = None,
+    batch_stats: BatchSizeStats | None = None,
+    checkpoints: CheckpointStore | None = None,
+    reader: str = "csv",
+    metrics: IngestMetrics | None = None,
+) -> None:
+    """
+    Parse a TSV once and ingest it into every target collection concurrently.
+
+    Reading, embedding and writing run as a pipeline: one thread builds record
+    batches from the TSV and fans each batch out to all targets, up to
+    ``max_concurrency`` embedding requests are in flight at once across all targets,
+    and one writer per target (capped by ``max_concurrency``) stores finished
+    batches. A refresh of N collections sharing a source therefore costs roughly as
+    much as the slowest one rather than the sum.
+
+    Targets with an ``embedding_function`` get client-side embeddings (through
+    ``cache`` if provided, so only misses reach the provider); otherwise each
+    collection embeds documents itself on write.
+
+    ``batch_size`` rows are read at a time. With ``max_batch_tokens`` set, rows are
+    regrouped so each embedding request carries as many documents as fit in the
+    estimated token budget (up to ``max_batch_items``), and requests the provider
+    still rejects as too large are split in half and retried. Writes are split to at
+    most ``max_write_batch_size`` records (see ``client.get_max_batch_size()``).
+    Chosen sizes are recorded in ``batch_stats``.
+
+    With ``checkpoints``, non-sync targets persist the source fingerprint and the
+    number of leading rows committed after every write, so an interrupted run can
+    resume by setting ``IngestTarget.resume_from``. Checkpoints are cleared once
+    the whole source has been ingested.
+
+    ``reader`` selects how the TSV is parsed (see :func:`get_record_batch_reader`).
+    ``metrics`` receives per-batch timings of every stage (parse, build, embed,
+    write), estimated tokens and the number of embedding requests in flight.
+
+    Afterwards every target's metadata gets a :class:`FacetIndex` of the source's
+    filterable fields. It is counted from the parsed rows as they stream past, or
+    rebuilt from the collection when a resumed run skipped leading rows.
+    """
+
+    if not tsv_path.exists():
+        raise FileNotFoundError(f"Source file not found: {tsv_path}")
+
+    read_batches = get_record_batch_reader(reader)
+    fingerprint = source_fingerprint(tsv_path) if checkpoints is not None else ""
+    for target in targets:
+        target.tracker = CommitTracker(target.resume_from)
+        if target.sync:
+            target.load_existing(page_size)
+    start_row = min((0 if target.sync else target.resume_from) for target in targets)
+    namespaces = {target.name: _collection_cache_namespace(target.collection) for target in targets}
+    quantizations = {target.name: collection_quantization(target.collection) for target in targets}
+    facets = FacetIndex()
+    metrics = metrics if metrics is not None else IngestMetrics()
+
+    def items() -> Iterator[tuple[IngestTarget, RecordBatch]]:
+        batchers = {
+            target.name: TokenBatcher(max_tokens=max_batch_tokens, max_items=max_batch_items)
+            for target in targets
+            if max_batch_tokens
+        }
+        for batch in read_batches(tsv_path, batch_size, start_row, metrics):
+            facets.add(batch.metadatas)
+            for target in targets:
+                selected = target.select(batch)
+                if selected is not None:
+                    batcher = batchers.get(target.name)
+                    for out in batcher.add(selected) if batcher else (selected,):
+                        target.tracker.dispatched(out.start)
+                        yield target, out
+                pending = batchers[target.name].pending_start if target.name in batchers else None
+                target.tracker.read_upto(pending if pending is not None else batch.rows[-1] + 1)
+        for target in targets:
+            if target.name in batchers:
+                for out in batchers[target.name].flush():
+                    target.tracker.dispatched(out.start)
+                    yield target, out
+
+    def embed(item: tuple[IngestTarget, RecordBatch]) -> tuple[IngestTarget, RecordBatch]:
+        target, batch = item
+        tokens = sum(estimate_tokens(document) for document in batch.documents)
+        with metrics.in_flight(), metrics.timed("embed", len(batch), tokens):
+            return target, _embed_batch(
+                batch,
+                target.embedding_function,
+                cache,
+                namespaces[target.name],
+                batch_stats,
+                quantizations[target.name],
+            )
+
+    def write(item: tuple[IngestTarget, RecordBatch]) -> None:
+        target, batch = item
+        started = time.perf_counter()
+        _write_batch(
+            target.collection,
+            batch,
+            upsert=target.upsert,
+            max_batch_size=max_write_batch_size,
+            stats=batch_stats,
+        )
+        metrics.record("write", time.perf_counter() - started, len(batch))
+        target.commit(batch, checkpoints, tsv_path, fingerprint)
+
+    pipeline: Pipeline[tuple[IngestTarget, RecordBatch], tuple[IngestTarget, RecordBatch]] = (
+        Pipeline(
+            embed=embed,
+            write=write,
+            max_concurrency=max_concurrency,
+            writers=max(1, min(len(targets), max_concurrency)),
+        )
+    )
+    pipeline.run(items())
+
+    facets.finish()
+    for target in targets:
+        if target.sync:
+            target.delete_vanished(page_size)
+        elif checkpoints is not None:
+            checkpoints.clear(target.name)
+        store_facets(
+            target.collection,
+            facets if start_row == 0 else build_facets(target.collection, page_size),
+        )
+
+
 def populate_collection_from_tsv(
     collection: Any,
     batch_size: int = 200,
+    embedding_function: Any | None = None,
+    cache: EmbeddingCache | None = None,
+    max_concurrency: int = 4,
+    max_batch_tokens: int | None = DEFAULT_MAX_BATCH_TOKENS,
+    metrics: IngestMetrics | None = None,
 ) -> int:
     """
     Populate an existing Chroma collection from a TSV file using its metadata for embedding config.
 
+    See :func:`ingest_source` for how batches are embedded and written.
+
     Returns the total number of rows added.
     """
 
-    tsv_path = Path(collection.metadata["source"])
-    if not tsv_path.exists():
-        raise FileNotFoundError(f"Source file not found: {tsv_path}")
+    target = IngestTarget(collection=collection, embedding_function=embedding_function)
+    ingest_source(
+        _source_path(collection),
+        [target],
+        batch_size=batch_size,
+        cache=cache,
+        max_concurrency=max_concurrency,
+        max_batch_tokens=max_batch_tokens,
+        metrics=metrics,
+    )
+    return target.written
 
-    metadata = collection.metadata or {}
 
-    total = 0
-    for batch in _chunked(_load_rows(tsv_path), size=batch_size):
-        ids: list[str] = []
-        documents: list[str] = []
-        metadatas: list[dict[str, Any]] = []
-
-        for idx, row in enumerate(batch, total):
-            # url	name	album	collection	number	type	rarity	release_date	energy	power	ppe	ability_name	ability_description	tags
-            doc_id = row.get("url") or row.get("number") or f"row-{idx}"
-            ids.append(str(doc_id))
-            documents.append(_build_document_text(row))
-            metadata = {
-                "source": row.get("url"),
-                "name": row.get("name"),
-                "album": row.get("album"),
-                "collection": row.get("collection"),
-                "type": row.get("type"),
-                "rarity": row.get("rarity"),
-                "release_date": row.get("release_date"),
-                "tags": row.get("tags"),
-            }
-            metadata.update(_parse_numeric_fields(row))
-            metadatas.append(metadata)
-
-        # Rely on collection's embedding_function; do not pass precomputed embeddings.
-        collection.add(ids=ids, documents=documents, metadatas=metadatas)
-        total += len(batch)
-
-    return total
+def sync_collection_from_tsv(
+    collection: Any,
+    batch_size: int = 200,
+    embedding_function: Any | None = None,
+    cache: EmbeddingCache | None = None,
+    page_size: int = 1000,
+    max_concurrency: int = 4,
+    max_batch_tokens: int | None = DEFAULT_MAX_BATCH_TOKENS,
+    metrics: IngestMetrics | None = None,
+) -> SyncResult:
+    """
+    Bring a collection in line with its TSV source, touching only rows that changed.
+
+    Existing ids and content hashes are streamed from the collection page by page and
+    diffed against the TSV: new or changed rows are upserted, and ids no longer present
+    in the TSV are deleted. Records written before content hashes existed are treated as
+    changed and rewritten once.
+    """
+
+    target = IngestTarget(collection=collection, embedding_function=embedding_function, sync=True)
+    ingest_source(
+        _source_path(collection),
+        [target],
+        batch_size=batch_size,
+        cache=cache,
+        max_concurrency=max_concurrency,
+        page_size=page_size,
+        max_batch_tokens=max_batch_tokens,
+        metrics=metrics,
+    )
+    return target.sync_result
 
 
 def build_embedding_function(
     metadata: Mapping[str, Any] | None = None,
     provider: str | None = None,
     model: str | None = None,
-) -> OpenAIEmbeddingFunction:
+    dimensions: int | None = None,
+) -> EmbeddingFunction[Documents]:
     """
     Build an embedding function based on collection metadata or explicit overrides.
-    Currently supports OpenAI embeddings only.
+
+    The provider is looked up in the registry in :mod:`src.utils.embeddings`
+    (``openai``, ``local`` or ``hashing``). ``dimensions`` (or the collection's
+    ``dimensions`` metadata) requests reduced-size vectors.
     """
 
     metadata = metadata or {}
     provider_name = provider or metadata.get("provider") or settings.embeddings_provider
     model_name = model or metadata.get("embedding_model") or settings.embeddings_model
-
-    if provider_name != "openai":
-        raise ValueError(f"Unsupported embedding provider '{provider_name}'.")
-
-    return OpenAIEmbeddingFunction(
-        api_key=settings.openai_api_key,
-        model_name=str(model_name),
-    )
+    dimensions = dimensions or _parse_dimension(metadata.get("dimensions"))
+    return create_embedding_function(str(provider_name), str(model_name), dimensions)
 
 
 def get_collection_with_embedding(
@@ -140,10 +642,14 @@ def get_collection_with_embedding(
     """
     Return a Chroma collection with the appropriate embedding function attached.
 
+    ``name`` may be an alias (see :mod:`src.utils.aliases`); the collection it
+    currently points at is returned.
+
     Chroma's type hints for embedding functions are currently too strict for pyright/mypy,
     so the client is typed as Any and the embedding builder handles metadata defaults.
     """
 
+    name = resolve_alias(client, name)
     existing_metadata: dict[str, Any] = {}
     try:
         existing_metadata = (client.get_collection(name=name).metadata) or {}
@@ -165,10 +671,77 @@ def get_collection_with_embedding(
         raise
 
 
+def update_collection_metadata(collection: Any, updates: Mapping[str, Any]) -> None:
+    """
+    Merge ``updates`` into a collection's metadata.
+
+    ``modify`` replaces the whole metadata mapping, so existing keys are carried over,
+    except ``hnsw:*`` index settings: Chroma rejects them on modify, and the index
+    keeps its configuration regardless.
+    """
+
+    collection.modify(metadata=merged_metadata(collection, updates))
+
+
+def merged_metadata(collection: Any, updates: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the collection's metadata with ``updates`` applied, ready for ``modify``."""
+
+    metadata = {
+        key: value
+        for key, value in (collection.metadata or {}).items()
+        if not key.startswith("hnsw:")
+    }
+    metadata.update(updates)
+    return metadata
+
+
+def build_facets(collection: Any, page_size: int = 1000) -> FacetIndex:
+    """Build a facet index by scanning every record's metadata in the collection."""
+
+    facets = FacetIndex()
+    for page in iter_collection_pages(collection, include=["metadatas"], page_size=page_size):
+        facets.add(page["metadatas"])
+    return facets.finish()
+
+
+def store_facets(collection: Any, facets: FacetIndex) -> None:
+    """Save a facet index in the collection's metadata (see :mod:`src.utils.facets`)."""
+
+    update_collection_metadata(collection, {FACETS_KEY: facets.to_json()})
+
+
+def bump_content_version(collection: Any) -> str:
+    """
+    Give a collection a new content version and return it.
+
+    Cached query results are keyed on this version, so bumping it after (and before)
+    any write or delete guarantees results from older contents are never served.
+    """
+
+    version = uuid.uuid4().hex
+    update_collection_metadata(collection, {CONTENT_VERSION_KEY: version})
+    return version
+
+
+def build_query_embedder(
+    collection: Any, cache: QueryEmbeddingCache
+) -> Callable[[list[str]], list[Any]]:
+    """Return a function embedding query texts for ``collection`` through ``cache``."""
+
+    embedding_fn = build_embedding_function(metadata=collection.metadata)
+    namespace = _collection_cache_namespace(collection)
+
+    def embed(texts: list[str]) -> list[Any]:
+        return cache.embed(texts, embedding_fn, namespace)
+
+    return embed
+
+
 # ---- Reporting helpers -----------------------------------------------------
 
 ROOT = Path(__file__).resolve().parents[2]
 MAX_FIELD_LEN = 80
+DEFAULT_REPORT_WORKERS = 8
 
 
 def _truncate(value: str, max_len: int = MAX_FIELD_LEN) -> str:
@@ -179,78 +752,137 @@ def _truncate(value: str, max_len: int = MAX_FIELD_LEN) -> str:
     return value[: max_len - 1] + "."
 
 
-def report(client: Any) -> str:
+def _parse_dimension(value: object) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _collection_dimension(col: Any) -> int | None:
+    """Return the embedding dimension from the collection model or its metadata."""
+
+    metadata = col.metadata or {}
+    dimension = _parse_dimension(getattr(col, "dimension", None))
+    if dimension is None:
+        dimension = _parse_dimension(
+            metadata.get("dimension")
+            or metadata.get("dimensions")
+            or metadata.get("embedding_dimensions")
+        )
+    if dimension is None:
+        try:
+            # ``get_model`` returns the model fetched by ``list_collections``; no round trip.
+            dimension = _parse_dimension(getattr(col.get_model(), "dimension", None))
+        except Exception:
+            dimension = None
+    return dimension
+
+
+def _relative_source(source_raw: Any) -> str:
+    if isinstance(source_raw, str) and source_raw:
+        try:
+            return str(Path(source_raw).resolve().relative_to(ROOT))
+        except Exception:
+            return source_raw
+    return str(source_raw or "")
+
+
+def _collection_row(col: Any, aliases: AliasTable) -> dict[str, Any]:
+    """Describe one collection; the only request made is ``count()``."""
+
+    started = time.perf_counter()
+    count: int | None = None
+    error: str | None = None
+    try:
+        count = col.count()
+    except Exception as exc:  # noqa: BLE001
+        error = str(exc)
+    return describe_collection(col, count, error, started, aliases)
+
+
+def describe_collection(
+    col: Any, count: int | None, error: str | None, started: float, aliases: AliasTable
+) -> dict[str, Any]:
+    """Build a report row from a collection's listing, its count (or error) and start time."""
+
+    metadata = col.metadata or {}
+    return {
+        "name": col.name,
+        "aliases": aliases.aliases_of(col.name),
+        "retired": col.name in aliases.retired,
+        "count": count,
+        "error": error,
+        "dimension": _collection_dimension(col),
+        "quantization": metadata.get(QUANTIZATION_KEY) or FLOAT32,
+        "provider": metadata.get("provider") or "",
+        "model": metadata.get("embedding_model") or "",
+        "variant": metadata.get("variant") or "",
+        "source": _relative_source(metadata.get("source")),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def collection_report(
+    client: Any, max_workers: int = DEFAULT_REPORT_WORKERS
+) -> list[dict[str, Any]]:
+    """
+    Return one summary row per collection, fetched concurrently.
+
+    ``list_collections`` already returns each collection's name, metadata and model,
+    so every collection costs a single ``count()`` request and no embedding function
+    is built. Counts run on up to ``max_workers`` threads; each row records how long
+    its collection took, and failures are reported in ``error`` rather than raised.
+
+    The alias registry is left out; each row lists the aliases pointing at its
+    collection and whether it is a replaced build awaiting deletion.
+    """
+
+    if max_workers <= 0:
+        raise ValueError("max_workers must be positive.")
+
+    aliases = load_aliases(client)
+    collections = [col for col in client.list_collections() if col.name != ALIAS_REGISTRY]
+    if not collections:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(collections))) as pool:
+        return list(pool.map(lambda col: _collection_row(col, aliases), collections))
+
+
+def report(client: Any, max_workers: int = DEFAULT_REPORT_WORKERS) -> str:
     """
     Build a text report summarizing collections for a given Chroma client.
 
     Returns the formatted report string (also suitable for printing).
     """
 
-    collections = client.list_collections()
-    if not collections:
-        return "No collections found."
+    return format_report(collection_report(client, max_workers=max_workers))
 
-    def _parse_dimension(value: object) -> int | None:
-        try:
-            return int(value)
-        except (TypeError, ValueError):
-            return None
 
-    rows = []
-    for col in collections:
-        try:
-            coll = get_collection_with_embedding(client, name=col.name)
-        except Exception as exc:  # noqa: BLE001
-            rows.append(
-                {
-                    "name": _truncate(col.name),
-                    "count": f"error: {exc}",
-                    "dimension": None,
-                    "provider": "",
-                    "model": "",
-                    "variant": "",
-                    "source": "",
-                }
-            )
-            continue
+def format_report(rows: list[dict[str, Any]]) -> str:
+    """Render :func:`collection_report` rows as the text table printed by the jobs."""
 
-        metadata = col.metadata or {}
-        provider = metadata.get("provider") or ""
-        embedding_model = metadata.get("embedding_model") or ""
-        variant = metadata.get("variant") or ""
-        source_raw = metadata.get("source") or ""
-        dimension = _parse_dimension(getattr(col, "dimension", None))
-        if dimension is None and isinstance(metadata, dict):
-            dimension = _parse_dimension(
-                metadata.get("dimension") or metadata.get("embedding_dimensions")
-            )
-        if dimension is None:
-            try:
-                dimension = _parse_dimension(
-                    getattr(coll.get_model(), "dimension", None)
-                )
-            except Exception:
-                dimension = None
-
-        source_rel = source_raw
-        if isinstance(source_raw, str) and source_raw:
-            source_path = Path(source_raw)
-            try:
-                source_rel = str(source_path.resolve().relative_to(ROOT))
-            except Exception:
-                source_rel = source_raw
-
-        rows.append(
-            {
-                "name": _truncate(col.name),
-                "count": coll.count(),
-                "dimension": dimension,
-                "provider": _truncate(provider),
-                "model": _truncate(embedding_model),
-                "variant": _truncate(variant),
-                "source": _truncate(source_rel),
-            }
-        )
+    if not rows:
+        return "No collections found."
 
-    df = pd.DataFrame(rows)
+    table = [
+        {
+            "name": _truncate(row["name"]),
+            "alias": ", ".join(row["aliases"]) or ("(retired)" if row["retired"] else ""),
+            "count": row["count"] if row["error"] is None else f"error: {row['error']}",
+            "dimension": row["dimension"],
+            "quantization": row["quantization"],
+            "provider": _truncate(row["provider"]),
+            "model": _truncate(row["model"]),
+            "variant": _truncate(row["variant"]),
+            "source": _truncate(row["source"]),
+            "ms": row["elapsed_ms"],
+        }
+        for row in rows
+    ]
+    # pandas is only needed to render the table; importing it lazily keeps JSON
+    # reports and the other jobs from paying its import cost.
+    import pandas as pd
+
+    df = pd.DataFrame(table)
     return "Collections overview:\n" + df.to_string(index=False)
@@ -0,0 +1,365 @@
+"""Persistent, content-addressed caches for document and query embeddings."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.config.settings import settings
+
+DEFAULT_CACHE_PATH = settings.cache_dir / "embeddings.sqlite3"
+DEFAULT_QUERY_CACHE_PATH = settings.cache_dir / "query_embeddings.sqlite3"
+
+# Evict down to this fraction of max_bytes so we do not evict on every insert.
+_EVICTION_TARGET = 0.9
+
+
+def cache_namespace(provider: str, model: str, dimensions: int | None = None) -> str:
+    """Return the cache namespace for a provider/model/dimensions combination."""
+
+    return f"{provider}:{model}:{dimensions or 'native'}"
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _chunks(keys: list[str], size: int = 500) -> list[list[str]]:
+    # Stay well under SQLite's bound-parameter limit.
+    return [keys[start : start + size] for start in range(0, len(keys), size)]
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Hit/miss counters for a cache instance."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class EmbeddingCache:
+    """
+    Size-bounded on-disk embedding cache backed by SQLite.
+
+    Entries are keyed by namespace (provider, model, dimensions) plus a hash of the
+    document text, so unchanged documents are never re-embedded. When the stored
+    vectors exceed ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = DEFAULT_CACHE_PATH,
+        max_bytes: int = settings.embedding_cache_max_bytes,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive.")
+
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings (accessed)"
+        )
+        self._conn.commit()
+        (self._total_bytes,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM embeddings"
+        ).fetchone()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> EmbeddingCache:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @staticmethod
+    def key(namespace: str, text: str) -> str:
+        """Return the cache key for a document under a namespace."""
+
+        return f"{namespace}:{_text_hash(text)}"
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, np.ndarray]:
+        """Return cached vectors for the given keys; missing keys are omitted."""
+
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for chunk in _chunks(list(dict.fromkeys(keys))):
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: dict[str, Any]) -> None:
+        """Store vectors, evicting least recently used entries if over budget."""
+
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((key, blob, len(blob), now))
+
+        with self._lock:
+            replaced = 0
+            for chunk in _chunks([row[0] for row in rows]):
+                placeholders = ",".join("?" * len(chunk))
+                (size,) = self._conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchone()
+                replaced += size
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, accessed) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._total_bytes += sum(row[2] for row in rows) - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under the eviction target."""
+
+        target = int(self.max_bytes * _EVICTION_TARGET)
+        cursor = self._conn.execute("SELECT key, size FROM embeddings ORDER BY accessed ASC")
+        doomed: list[tuple[str]] = []
+        for key, size in cursor:
+            if self._total_bytes <= target:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+        self.stats.evictions += len(doomed)
+
+    def embed(
+        self,
+        texts: Sequence[str],
+        embed_fn: Callable[[list[str]], Sequence[Any]],
+        namespace: str,
+    ) -> list[np.ndarray]:
+        """
+        Return embeddings for texts, calling ``embed_fn`` only for cache misses.
+
+        Results are returned in the same order as ``texts``.
+        """
+
+        keys = [self.key(namespace, text) for text in texts]
+        cached = self.get_many(keys)
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts, strict=True):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        misses = sum(1 for key in keys if key not in cached)
+        with self._lock:
+            self.stats.hits += len(keys) - misses
+            self.stats.misses += misses
+
+        if missing:
+            vectors = embed_fn(list(missing.values()))
+            fresh = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(missing, vectors, strict=True)
+            }
+            self.put_many(fresh)
+            cached.update(fresh)
+
+        return [cached[key] for key in keys]
+
+
+def normalize_query(text: str) -> str:
+    """Return the canonical form of a query: NFKC, trimmed, with whitespace collapsed."""
+
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+@dataclass(slots=True)
+class QueryCacheStats:
+    """Per-tier hit counters plus the provider latency the cache avoided."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    provider_calls: int = 0
+    provider_seconds: float = 0.0
+    # Lookups answered entirely from cache; each one skipped a provider round trip.
+    avoided_calls: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+    @property
+    def mean_provider_seconds(self) -> float:
+        return self.provider_seconds / self.provider_calls if self.provider_calls else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """Estimated latency saved: avoided round trips times the mean observed round trip."""
+
+        return self.avoided_calls * self.mean_provider_seconds
+
+    def describe(self) -> str:
+        summary = (
+            f"{self.lookups} queries, hit rate {self.hit_rate:.1%} "
+            f"(memory {self.memory_hits}, disk {self.disk_hits}, miss {self.misses}); "
+            f"{self.avoided_calls} provider calls skipped"
+        )
+        if not self.provider_calls:
+            return f"{summary} (no provider calls made, latency saved unknown)"
+        return (
+            f"{summary}, {self.provider_calls} made at {self.mean_provider_seconds * 1000:.1f} ms "
+            f"mean; ~{self.saved_seconds:.2f}s saved"
+        )
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache for query embeddings: an in-process LRU in front of an on-disk store.
+
+    Keys are the namespace (provider, model, dimensions) plus the normalized query
+    text, and the normalized text is what gets embedded, so spacing variants of the
+    same query share one vector. Misses from both tiers are embedded in a single
+    provider call and written back to both.
+    """
+
+    def __init__(
+        self,
+        disk: EmbeddingCache | None = None,
+        max_entries: int = settings.query_cache_max_entries,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive.")
+
+        self.disk = disk
+        self.max_entries = max_entries
+        self.stats = QueryCacheStats()
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def __enter__(self) -> QueryEmbeddingCache:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _remember(self, items: dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def embed(
+        self,
+        texts: Sequence[str],
+        embed_fn: Callable[[list[str]], Sequence[Any]],
+        namespace: str,
+    ) -> list[np.ndarray]:
+        """Return embeddings for query texts in order, calling ``embed_fn`` only for misses."""
+
+        normalized = [normalize_query(text) for text in texts]
+        keys = [EmbeddingCache.key(namespace, text) for text in normalized]
+
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+        memory_hits = sum(1 for key in keys if key in found)
+
+        if self.disk is not None and len(found) < len(set(keys)):
+            from_disk = self.disk.get_many([key for key in keys if key not in found])
+            self._remember(from_disk)
+            found.update(from_disk)
+        disk_hits = sum(1 for key in keys if key in found) - memory_hits
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, normalized, strict=True):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            started = time.perf_counter()
+            vectors = embed_fn(list(missing.values()))
+            elapsed = time.perf_counter() - started
+            fresh = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(missing, vectors, strict=True)
+            }
+            if self.disk is not None:
+                self.disk.put_many(fresh)
+            self._remember(fresh)
+            found.update(fresh)
+
+        with self._lock:
+            self.stats.memory_hits += memory_hits
+            self.stats.disk_hits += disk_hits
+            self.stats.misses += len(keys) - memory_hits - disk_hits
+            if missing:
+                self.stats.provider_calls += 1
+                self.stats.provider_seconds += elapsed
+            elif keys:
+                self.stats.avoided_calls += 1
+
+        return [found[key] for key in keys]
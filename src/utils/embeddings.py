@@ -0,0 +1,235 @@
+"""Embedding providers by name: OpenAI, a local sentence-embedding model, and hashing."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction, register_embedding_function
+
+from src.config.settings import settings
+from src.utils.quantization import truncate_dimensions
+
+# Builds a provider's embedding function for a model name and optional output dimensions.
+ProviderFactory = Callable[[str, int | None], EmbeddingFunction[Documents]]
+
+DEFAULT_HASHING_DIMENSION = 384
+_TOKEN = re.compile(r"\w+")
+_PROVIDERS: dict[str, ProviderFactory] = {}
+
+
+def register_provider(name: str) -> Callable[[ProviderFactory], ProviderFactory]:
+    """Register a factory under the ``provider`` name used in collection configs."""
+
+    def register(factory: ProviderFactory) -> ProviderFactory:
+        _PROVIDERS[name] = factory
+        return factory
+
+    return register
+
+
+def available_providers() -> list[str]:
+    return sorted(_PROVIDERS)
+
+
+def create_embedding_function(
+    provider: str, model: str, dimensions: int | None = None
+) -> EmbeddingFunction[Documents]:
+    """
+    Return the embedding function of a registered provider for ``model``.
+
+    ``dimensions`` asks for shorter vectors than the model's native size (OpenAI's
+    ``dimensions`` parameter; local models keep the leading components).
+    """
+
+    factory = _PROVIDERS.get(provider)
+    if factory is None:
+        raise ValueError(
+            f"Unsupported embedding provider '{provider}'. "
+            f"Available: {', '.join(available_providers())}."
+        )
+    return factory(model, dimensions)
+
+
+@register_embedding_function
+class LocalEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    A sentence-transformers model loaded from disk and run on the local CPU.
+
+    The model is loaded on first use and shared by every thread calling it. Inputs
+    are encoded ``batch_size`` at a time; ``threads`` caps the torch threads each
+    batch runs on (torch's default is one per core). Vectors are L2-normalized;
+    with ``dimensions`` only their leading components are kept (re-normalized),
+    which suits Matryoshka-trained models.
+    Needs ``sentence-transformers``, which is not a default dependency.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        device: str = "cpu",
+        batch_size: int = 64,
+        threads: int | None = None,
+        dimensions: int | None = None,
+    ) -> None:
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"Local embedding model not found: {model_path}")
+        self.model_path = model_path
+        self.device = device
+        self.batch_size = batch_size
+        self.threads = threads
+        self.dimensions = dimensions
+        self._model: Any = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        with self._lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as exc:
+                    raise ImportError(
+                        "The 'local' embedding provider needs sentence-transformers; "
+                        "install it with `uv add sentence-transformers`."
+                    ) from exc
+                if self.threads:
+                    import torch
+
+                    torch.set_num_threads(self.threads)
+                self._model = SentenceTransformer(
+                    self.model_path, device=self.device, local_files_only=True
+                )
+        return self._model
+
+    def __call__(self, input: Documents) -> Embeddings:  # noqa: A002 - matches Chroma's API
+        model = self._model if self._model is not None else self._load()
+        vectors = model.encode(
+            list(input),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        vectors = vectors.astype(np.float32, copy=False)
+        if self.dimensions:
+            vectors = truncate_dimensions(vectors, self.dimensions)
+        return list(vectors)
+
+    @staticmethod
+    def name() -> str:
+        return "cuecards_local"
+
+    def get_config(self) -> dict[str, Any]:
+        return {
+            "model_path": self.model_path,
+            "device": self.device,
+            "batch_size": self.batch_size,
+            "threads": self.threads,
+            "dimensions": self.dimensions,
+        }
+
+    @staticmethod
+    def build_from_config(config: dict[str, Any]) -> LocalEmbeddingFunction:
+        return LocalEmbeddingFunction(**config)
+
+
+@register_embedding_function
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Deterministic bag-of-words vectors from feature hashing, for tests and offline runs.
+
+    Each lowercased word adds +1 or -1 (by hash) to one of ``dimension`` buckets and
+    the result is L2-normalized, so texts sharing words are close under cosine.
+    """
+
+    def __init__(self, dimension: int = DEFAULT_HASHING_DIMENSION) -> None:
+        if dimension <= 0:
+            raise ValueError("Hashing embedding dimension must be positive.")
+        self.dimension = dimension
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in _TOKEN.findall(text.lower()):
+            digest = int.from_bytes(
+                hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little"
+            )
+            vector[digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            # Texts without words still need a valid (non-zero) vector for cosine.
+            vector[0] = 1.0
+            return vector
+        return vector / norm
+
+    def __call__(self, input: Documents) -> Embeddings:  # noqa: A002 - matches Chroma's API
+        return [self._embed(text) for text in input]
+
+    @staticmethod
+    def name() -> str:
+        return "cuecards_hashing"
+
+    def get_config(self) -> dict[str, Any]:
+        return {"dimension": self.dimension}
+
+    @staticmethod
+    def build_from_config(config: dict[str, Any]) -> HashingEmbeddingFunction:
+        return HashingEmbeddingFunction(int(config["dimension"]))
+
+
+def resolve_local_model(model: str) -> Path:
+    """Resolve a local model name to its directory (relative names under LOCAL_MODELS_DIR)."""
+
+    path = Path(model).expanduser()
+    return path if path.is_absolute() else settings.local_models_dir / path
+
+
+def ensure_openai_key() -> None:
+    """Ensure the OpenAI key is present in the environment for the embedding function."""
+
+    key = settings.chroma_openai_api_key or settings.openai_api_key
+    if key:
+        os.environ.setdefault("CHROMA_OPENAI_API_KEY", key)
+        os.environ.setdefault("OPENAI_API_KEY", key)
+
+    if not os.getenv("CHROMA_OPENAI_API_KEY") and not os.getenv("OPENAI_API_KEY"):
+        raise ValueError(
+            "OpenAI API key missing. Set CHROMA_OPENAI_API_KEY or OPENAI_API_KEY in your environment."
+        )
+
+
+@register_provider("openai")
+def _openai(model: str, dimensions: int | None) -> EmbeddingFunction[Documents]:
+    # The function reads the key from the environment (OPENAI_API_KEY first), so a key
+    # set only as CHROMA_OPENAI_API_KEY is not shadowed by the settings placeholder.
+    ensure_openai_key()
+    return OpenAIEmbeddingFunction(
+        model_name=model,
+        api_base=settings.openai_api_base,
+        dimensions=dimensions,
+    )
+
+
+@register_provider("local")
+def _local(model: str, dimensions: int | None) -> EmbeddingFunction[Documents]:
+    return LocalEmbeddingFunction(
+        str(resolve_local_model(model)),
+        device=settings.local_embedding_device,
+        batch_size=settings.local_embedding_batch_size,
+        threads=settings.local_embedding_threads,
+        dimensions=dimensions,
+    )
+
+
+@register_provider("hashing")
+def _hashing(model: str, dimensions: int | None) -> EmbeddingFunction[Documents]:
+    # The model name may end in the dimension, e.g. "hashing-256"; ``dimensions`` wins.
+    match = re.search(r"(\d+)$", model)
+    default = int(match.group(1)) if match else DEFAULT_HASHING_DIMENSION
+    return HashingEmbeddingFunction(dimensions or default)
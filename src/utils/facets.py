@@ -0,0 +1,133 @@
+"""Per-field value counts and numeric ranges for a collection, built at ingest."""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+# Collection metadata key holding the JSON-encoded facet index.
+FACETS_KEY = "facets"
+FACET_FIELDS = ("rarity", "album", "collection", "type", "energy", "power", "ppe")
+# Fields with more distinct values keep only their count, distinct count and range.
+MAX_FACET_VALUES = 256
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, int | float) and not isinstance(value, bool)
+
+
+@dataclass(slots=True)
+class FieldFacet:
+    """Records carrying one field, its distinct values with counts, and its numeric range."""
+
+    count: int = 0
+    distinct: int = 0
+    values: dict[Any, int] | None = None  # None when there were too many to keep
+    minimum: float | None = None
+    maximum: float | None = None
+
+    @property
+    def numeric(self) -> bool:
+        return self.minimum is not None
+
+    def as_dict(self) -> dict[str, Any]:
+        facet: dict[str, Any] = {"count": self.count, "distinct": self.distinct}
+        # Pairs rather than an object so numeric values keep their type through JSON.
+        facet["values"] = (
+            sorted(([value, n] for value, n in self.values.items()), key=lambda pair: -pair[1])
+            if self.values is not None
+            else None
+        )
+        if self.numeric:
+            facet["min"] = self.minimum
+            facet["max"] = self.maximum
+        return facet
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> FieldFacet:
+        values = raw.get("values")
+        return cls(
+            count=int(raw.get("count", 0)),
+            distinct=int(raw.get("distinct", 0)),
+            values=None if values is None else {value: int(n) for value, n in values},
+            minimum=raw.get("min"),
+            maximum=raw.get("max"),
+        )
+
+
+@dataclass(slots=True)
+class FacetIndex:
+    """
+    Value counts and ranges for the filterable metadata fields of a collection.
+
+    Built from every record's metadata during ingest and stored as JSON in the
+    collection's metadata, so filters can be checked and their selectivity
+    estimated without touching the records.
+    """
+
+    total: int = 0
+    fields: dict[str, FieldFacet] = field(default_factory=dict)
+    _counters: dict[str, Counter] = field(default_factory=dict, repr=False)
+
+    def add(self, metadatas: Iterable[Mapping[str, Any] | None]) -> None:
+        """Count a batch of record metadata."""
+
+        for metadata in metadatas:
+            self.total += 1
+            for name in FACET_FIELDS:
+                value = (metadata or {}).get(name)
+                if value is None or value == "":
+                    continue
+                self._counters.setdefault(name, Counter())[value] += 1
+
+    def finish(self) -> FacetIndex:
+        """Fold the raw counters into per-field facets and return the index."""
+
+        for name, counter in self._counters.items():
+            numbers = [value for value in counter if _is_number(value)]
+            self.fields[name] = FieldFacet(
+                count=sum(counter.values()),
+                distinct=len(counter),
+                values=dict(counter) if len(counter) <= MAX_FACET_VALUES else None,
+                minimum=min(numbers) if numbers else None,
+                maximum=max(numbers) if numbers else None,
+            )
+        self._counters.clear()
+        return self
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"total": self.total, "fields": {k: v.as_dict() for k, v in self.fields.items()}},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_metadata(cls, metadata: Mapping[str, Any] | None) -> FacetIndex | None:
+        """Load the index stored in collection metadata, or None if there is none."""
+
+        raw = (metadata or {}).get(FACETS_KEY)
+        if not raw:
+            return None
+        try:
+            decoded = json.loads(raw)
+        except (TypeError, json.JSONDecodeError):
+            return None
+        return cls(
+            total=int(decoded.get("total", 0)),
+            fields={
+                name: FieldFacet.from_dict(facet)
+                for name, facet in (decoded.get("fields") or {}).items()
+            },
+        )
+
+    def describe(self) -> str:
+        parts = []
+        for name, facet in self.fields.items():
+            if facet.numeric:
+                parts.append(f"{name} {facet.minimum}..{facet.maximum}")
+            else:
+                parts.append(f"{name} ({facet.distinct} values)")
+        return f"{self.total} records; " + ", ".join(parts)
@@ -0,0 +1,266 @@
+"""Structured metadata filters: parsing, compilation to Chroma ``where`` and planning."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from src.utils.facets import FACET_FIELDS, FacetIndex, FieldFacet
+
+_OPERATORS = {
+    "=": "$eq",
+    "==": "$eq",
+    "!=": "$ne",
+    "<": "$lt",
+    "<=": "$lte",
+    ">": "$gt",
+    ">=": "$gte",
+    "in": "$in",
+    "not in": "$nin",
+}
+_RANGE_OPERATORS = {"$lt", "$lte", "$gt", "$gte"}
+_CONSTRAINT = re.compile(
+    r"""^\s*(?P<field>[A-Za-z_][\w.:-]*)\s*
+    (?P<op>==|!=|<=|>=|=|<|>|(?i:\s+not\s+in\b)|(?i:\s+in\b))
+    \s*(?P<value>.*?)\s*$""",
+    re.VERBOSE | re.DOTALL,
+)
+
+# Strategy names returned by ``plan_filter``.
+EMPTY = "empty"  # No record can match; answer without a request.
+GET = "get"  # Few enough matches to fetch them all and rank locally.
+QUERY = "query"  # Pre-filtered vector search on the server.
+
+
+@dataclass(slots=True)
+class Constraint:
+    """One ``field <op> value`` condition; ``value`` is a list for ``$in``/``$nin``."""
+
+    field: str
+    op: str
+    value: Any
+
+    def where(self) -> dict[str, Any]:
+        return {self.field: {self.op: self.value}}
+
+
+def _split_top_level(text: str, separator: str = ",") -> list[str]:
+    """Split on ``separator`` outside brackets and quotes."""
+
+    parts: list[str] = []
+    current: list[str] = []
+    depth = 0
+    quote: str | None = None
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if quote or depth:
+        raise ValueError(f"Unbalanced quotes or brackets in filter: {text!r}")
+    parts.append("".join(current))
+    return parts
+
+
+def _scalar(raw: str, facet: FieldFacet | None) -> Any:
+    raw = raw.strip()
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in "\"'":
+        # Quoted values are always strings, even when they look like numbers.
+        return raw[1:-1]
+    if not raw:
+        raise ValueError("Empty value in filter.")
+    if facet is not None and not facet.numeric:
+        return raw
+    try:
+        return int(raw)
+    except ValueError:
+        pass
+    try:
+        number = float(raw)
+    except ValueError:
+        if facet is not None:
+            raise ValueError(f"Expected a number, got {raw!r}.") from None
+        return raw
+    return number if math.isfinite(number) else raw
+
+
+def parse_filter(text: str, facets: FacetIndex | None = None) -> list[Constraint]:
+    """
+    Parse ``"rarity=Legendary, energy<=3, album in [Alpha, 'Beta 2']"`` into constraints.
+
+    Constraints are comma-separated and all must hold. Operators are ``=``, ``!=``,
+    ``<``, ``<=``, ``>``, ``>=``, ``in`` and ``not in`` (lists in brackets). Unquoted
+    values are typed by the field's facet when known (numbers for numeric fields,
+    text otherwise) and guessed from their spelling when not; quote a value to force
+    text.
+    """
+
+    constraints = []
+    for part in _split_top_level(text):
+        if not part.strip():
+            continue
+        match = _CONSTRAINT.match(part)
+        if match is None:
+            raise ValueError(f"Cannot parse filter constraint {part.strip()!r}.")
+        name = match["field"]
+        op = _OPERATORS[" ".join(match["op"].lower().split())]
+        facet = facets.fields.get(name) if facets is not None else None
+        raw_value = match["value"]
+        try:
+            if op in ("$in", "$nin"):
+                if not (raw_value.startswith("[") and raw_value.endswith("]")):
+                    raise ValueError("Expected a bracketed list.")
+                items = [item for item in _split_top_level(raw_value[1:-1]) if item.strip()]
+                if not items:
+                    raise ValueError("The list is empty.")
+                value: Any = [_scalar(item, facet) for item in items]
+            else:
+                value = _scalar(raw_value, facet)
+        except ValueError as exc:
+            raise ValueError(f"Bad value in filter constraint {part.strip()!r}: {exc}") from exc
+        if op in _RANGE_OPERATORS and facet is not None and not facet.numeric:
+            raise ValueError(f"'{name}' is not numeric; use = or in instead of {match['op']}.")
+        if op in _RANGE_OPERATORS and not isinstance(value, int | float):
+            raise ValueError(f"'{name}' can only be compared with a number, got {value!r}.")
+        constraints.append(Constraint(field=name, op=op, value=value))
+    return constraints
+
+
+def compile_where(
+    constraints: Sequence[Constraint], extra: dict[str, Any] | None = None
+) -> dict[str, Any] | None:
+    """Return the Chroma ``where`` for all constraints (and ``extra``), or None for none."""
+
+    clauses = [constraint.where() for constraint in constraints]
+    if extra:
+        clauses.append(extra)
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _matches(value: Any, op: str, target: Any) -> bool:
+    if op == "$eq":
+        return bool(value == target)
+    if op == "$ne":
+        return bool(value != target)
+    if op == "$in":
+        return value in target
+    if op == "$nin":
+        return value not in target
+    if not isinstance(value, int | float):
+        return False
+    return {
+        "$lt": value < target,
+        "$lte": value <= target,
+        "$gt": value > target,
+        "$gte": value >= target,
+    }[op]
+
+
+def _estimate(constraint: Constraint, facet: FieldFacet | None, total: int) -> tuple[float, bool]:
+    """Return (estimated matching records, whether the estimate is exact)."""
+
+    op, target = constraint.op, constraint.value
+    negated = op in ("$ne", "$nin")
+    if facet is None:
+        if constraint.field in FACET_FIELDS:
+            # A faceted field absent from the index is set on no record.
+            return (float(total), True) if negated else (0.0, True)
+        return float(total), False
+
+    missing = total - facet.count
+    if facet.values is not None:
+        matched = sum(n for value, n in facet.values.items() if _matches(value, op, target))
+        # Chroma's $ne/$nin also match records without the field.
+        return float(matched + (missing if negated else 0)), True
+
+    targets = target if isinstance(target, list) else [target]
+    per_value = facet.count / facet.distinct if facet.distinct else 0.0
+    if negated:
+        return max(total - per_value * len(targets), 0.0), False
+    if op in ("$eq", "$in") and not facet.numeric:
+        return per_value * len(targets), not targets
+    if facet.minimum is None or facet.maximum is None:
+        # No value range recorded: nothing to narrow a range down with.
+        return float(total), False
+
+    low, high = float(facet.minimum), float(facet.maximum)
+    if op in ("$eq", "$in"):
+        possible = [
+            value for value in targets if isinstance(value, int | float) and low <= value <= high
+        ]
+        return per_value * len(possible), not possible
+
+    if not any(_matches(bound, op, target) for bound in (low, high)):
+        return 0.0, True
+    if high <= low:
+        return float(facet.count), False
+    share = (target - low) / (high - low)
+    if op in ("$gt", "$gte"):
+        share = 1.0 - share
+    return max(facet.count * min(max(share, 0.0), 1.0), 1.0), False
+
+
+@dataclass(slots=True)
+class FilterPlan:
+    """The compiled ``where``, its estimated match count and how to run it."""
+
+    where: dict[str, Any] | None
+    strategy: str
+    estimated: float | None = None
+    exact: bool = False
+
+    def describe(self) -> str:
+        if self.estimated is None:
+            return f"{self.strategy} (no facet index)"
+        estimate = f"{self.estimated:.0f}" if self.exact else f"~{self.estimated:.0f}"
+        return f"{self.strategy} ({estimate} matching records)"
+
+
+def plan_filter(
+    constraints: Sequence[Constraint],
+    facets: FacetIndex | None,
+    n_results: int,
+    extra: dict[str, Any] | None = None,
+) -> FilterPlan:
+    """
+    Decide how to run a filtered search from the facet index.
+
+    A filter no record can satisfy is answered empty. One matching at most
+    ``n_results`` records is served by a metadata ``get`` (every match is a hit, so
+    the vector index has nothing to choose); anything broader is a pre-filtered
+    vector query. Conjunctions assume independent fields. ``extra`` (a raw
+    ``where``) only narrows the result, so the estimate stays an upper bound.
+    """
+
+    where = compile_where(constraints, extra)
+    if facets is None or not constraints:
+        return FilterPlan(where=where, strategy=QUERY)
+
+    total = facets.total
+    estimated = float(total)
+    exact = len(constraints) == 1 and not extra
+    for constraint in constraints:
+        matched, constraint_exact = _estimate(
+            constraint, facets.fields.get(constraint.field), total
+        )
+        if matched <= 0 and constraint_exact:
+            return FilterPlan(where=where, strategy=EMPTY, estimated=0.0, exact=True)
+        estimated *= matched / total if total else 0.0
+        exact = exact and constraint_exact
+    strategy = GET if estimated <= n_results else QUERY
+    return FilterPlan(where=where, strategy=strategy, estimated=estimated, exact=exact)
@@ -0,0 +1,297 @@
+"""Hybrid keyword + vector search fused with reciprocal-rank fusion."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+import psycopg
+from psycopg.rows import dict_row
+
+from src.utils.postgres import (
+    CARDS_TABLE,
+    DOC_ID_SQL,
+    SEARCH_VECTOR_COLUMN,
+    TEXT_SEARCH_CONFIG,
+)
+from src.utils.result_cache import QueryResultCache
+from src.utils.search import (
+    DEFAULT_QUERY_BATCH_SIZE,
+    DEFAULT_RESULT_FIELDS,
+    QueryRequest,
+    _batched,
+    _select_fields,
+    search_batches,
+)
+
+# Standard RRF damping constant (Cormack et al.); larger values flatten rank differences.
+RRF_K = 60
+DEFAULT_CANDIDATES = 20
+DEFAULT_LEG_TIMEOUT = 2.0
+
+VECTOR_LEG = "vector"
+KEYWORD_LEG = "keyword"
+
+_KEYWORD_FIELDS = (
+    "name",
+    "album",
+    "collection",
+    "type",
+    "rarity",
+    "release_date",
+    "tags",
+    "energy",
+    "power",
+    "ppe",
+)
+_KEYWORD_SQL = f"""
+    SELECT q.ordinal, hit.*
+    FROM unnest(%s::text[]) WITH ORDINALITY AS q(query_text, ordinal)
+    CROSS JOIN LATERAL (
+        SELECT
+            {DOC_ID_SQL} AS doc_id,
+            ts_rank_cd({SEARCH_VECTOR_COLUMN}, tsq) AS score,
+            url AS source,
+            {", ".join(_KEYWORD_FIELDS)}
+        FROM {CARDS_TABLE}, websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', q.query_text) AS tsq
+        WHERE {SEARCH_VECTOR_COLUMN} @@ tsq
+        ORDER BY score DESC
+        LIMIT %s
+    ) AS hit
+    ORDER BY q.ordinal, hit.score DESC
+"""
+
+
+@dataclass(slots=True)
+class LegTiming:
+    """Wall time and outcome of one search leg for one batch of queries."""
+
+    seconds: float = 0.0
+    status: str = "ok"  # "ok", "timeout" or "error"
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        timing: dict[str, Any] = {"ms": round(self.seconds * 1000, 3), "status": self.status}
+        if self.error:
+            timing["error"] = self.error
+        return timing
+
+
+@dataclass(slots=True)
+class LegStats:
+    """Batches answered, dropped and failed by one leg, with the time it spent."""
+
+    batches: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    def add(self, timing: LegTiming) -> None:
+        self.batches += 1
+        self.seconds += timing.seconds
+        self.timeouts += timing.status == "timeout"
+        self.errors += timing.status == "error"
+
+    def describe(self) -> str:
+        mean_ms = self.seconds / self.batches * 1000 if self.batches else 0.0
+        return (
+            f"{self.batches} batches, mean {mean_ms:.1f} ms, "
+            f"{self.timeouts} timed out, {self.errors} failed"
+        )
+
+
+def keyword_search(
+    conn: psycopg.Connection, texts: Sequence[str], n_results: int
+) -> list[list[dict[str, Any]]]:
+    """
+    Full-text search ``texts`` in one round trip, returning ranked hits per query.
+
+    Queries use ``websearch_to_tsquery`` syntax (quoted phrases, ``or``, ``-term``)
+    against the weighted ``search_vector`` column and are ranked by ``ts_rank_cd``.
+    """
+
+    hits: list[list[dict[str, Any]]] = [[] for _ in texts]
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(_KEYWORD_SQL, (list(texts), n_results))
+        for row in cur:
+            position = row.pop("ordinal") - 1
+            hits[position].append(
+                {"id": row.pop("doc_id"), "score": row.pop("score"), "metadata": row}
+            )
+    return hits
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[str]], k: int = RRF_K
+) -> list[tuple[str, float]]:
+    """Fuse ranked id lists: each id scores ``sum(1 / (k + rank))``, best first."""
+
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridSearcher:
+    """
+    Run the vector and keyword legs concurrently and fuse their rankings.
+
+    Each leg fetches ``candidates`` hits per query for a whole batch of queries.
+    Legs still running after ``timeout`` seconds are dropped from that batch's
+    fusion, and an abandoned keyword query is cancelled on the server so it does not
+    hold the connection; a batch only fails when no leg answers. The vector leg
+    keys ``result_cache`` on the content version in the collection handle's metadata.
+    """
+
+    def __init__(
+        self,
+        collection: Any,
+        conn: psycopg.Connection,
+        embed_queries: Callable[[list[str]], Sequence[Any]] | None = None,
+        result_cache: QueryResultCache | None = None,
+        candidates: int = DEFAULT_CANDIDATES,
+        timeout: float = DEFAULT_LEG_TIMEOUT,
+        rrf_k: int = RRF_K,
+    ) -> None:
+        if candidates <= 0 or timeout <= 0:
+            raise ValueError("candidates and timeout must be positive.")
+
+        self.collection = collection
+        self.conn = conn
+        self.embed_queries = embed_queries
+        self.result_cache = result_cache
+        self.candidates = candidates
+        self.timeout = timeout
+        self.rrf_k = rrf_k
+        self.stats = {VECTOR_LEG: LegStats(), KEYWORD_LEG: LegStats()}
+        self.conn.execute(f"SET statement_timeout = {int(timeout * 1000)}")
+        # Spare workers let a new batch start while a dropped leg is still finishing.
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid")
+
+    def _vector_leg(self, requests: list[QueryRequest]) -> list[list[dict[str, Any]]]:
+        results = next(
+            search_batches(
+                self.collection,
+                requests,
+                n_results=self.candidates,
+                batch_size=len(requests),
+                fields=None,
+                embed_queries=self.embed_queries,
+                result_cache=self.result_cache,
+            )
+        )
+        return [result["results"] for result in results]
+
+    def _keyword_leg(self, requests: list[QueryRequest]) -> list[list[dict[str, Any]]]:
+        return keyword_search(self.conn, [request.text for request in requests], self.candidates)
+
+    def _run_legs(
+        self, requests: list[QueryRequest]
+    ) -> tuple[dict[str, list[list[dict[str, Any]]]], dict[str, LegTiming]]:
+        started = time.perf_counter()
+        timings = {VECTOR_LEG: LegTiming(), KEYWORD_LEG: LegTiming()}
+        futures: dict[Future, str] = {}
+
+        def timed(timing: LegTiming, fn: Callable[..., Any]) -> Any:
+            try:
+                return fn(requests)
+            finally:
+                timing.seconds = time.perf_counter() - started
+
+        for leg, fn in ((VECTOR_LEG, self._vector_leg), (KEYWORD_LEG, self._keyword_leg)):
+            futures[self._executor.submit(timed, timings[leg], fn)] = leg
+        _, not_done = wait(futures, timeout=self.timeout)
+        keyword = next(future for future, leg in futures.items() if leg == KEYWORD_LEG)
+        if keyword in not_done:
+            # Free the shared connection for the next batch, and let the cancel land
+            # before that batch's query starts so it cannot cancel the wrong statement.
+            self.conn.cancel()
+            wait([keyword], timeout=self.timeout)
+
+        answers: dict[str, list[list[dict[str, Any]]]] = {}
+        for future, leg in futures.items():
+            if future in not_done:
+                timings[leg] = LegTiming(seconds=self.timeout, status="timeout")
+            elif future.exception() is not None:
+                timings[leg].status = "error"
+                timings[leg].error = str(future.exception())
+            else:
+                answers[leg] = future.result()
+            self.stats[leg].add(timings[leg])
+        if not answers:
+            raise RuntimeError(
+                "Every search leg failed: "
+                + ", ".join(f"{leg} {timing.status}" for leg, timing in timings.items())
+            )
+        return answers, timings
+
+    def search(
+        self, requests: list[QueryRequest], n_results: int = 5
+    ) -> tuple[list[list[dict[str, Any]]], dict[str, LegTiming]]:
+        """Return fused hits per query plus the timing of each leg for the batch."""
+
+        answers, timings = self._run_legs(requests)
+        fused: list[list[dict[str, Any]]] = []
+        for position in range(len(requests)):
+            by_leg = {leg: hits[position] for leg, hits in answers.items()}
+            ranking = reciprocal_rank_fusion(
+                ([hit["id"] for hit in hits] for hits in by_leg.values()), k=self.rrf_k
+            )
+            hits = []
+            for rank, (doc_id, score) in enumerate(ranking[:n_results], start=1):
+                hit: dict[str, Any] = {"rank": rank, "id": doc_id, "score": score, "ranks": {}}
+                for leg, leg_hits in by_leg.items():
+                    for leg_rank, leg_hit in enumerate(leg_hits, start=1):
+                        if leg_hit["id"] != doc_id:
+                            continue
+                        hit["ranks"][leg] = leg_rank
+                        if leg == VECTOR_LEG:
+                            hit["distance"] = leg_hit["distance"]
+                        # Chroma metadata wins; keyword rows fill in vector misses.
+                        hit.setdefault("metadata", leg_hit["metadata"])
+                        break
+                hits.append(hit)
+            fused.append(hits)
+        return fused, timings
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def hybrid_search_batches(
+    searcher: HybridSearcher,
+    queries: Iterable[QueryRequest],
+    n_results: int = 5,
+    batch_size: int = DEFAULT_QUERY_BATCH_SIZE,
+    fields: Sequence[str] | None = DEFAULT_RESULT_FIELDS,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Hybrid-search ``queries`` in groups of ``batch_size``, yielding one result list per group.
+
+    Results match ``search_batches`` except that hits carry an RRF ``score`` and their
+    ``ranks`` in each leg, and every result has the ``timings`` of its batch's legs.
+    """
+
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+
+    for group in _batched(queries, batch_size):
+        fused, timings = searcher.search(group, n_results=n_results)
+        batch_timings = {leg: timing.as_dict() for leg, timing in timings.items()}
+        results = []
+        for query, hits in zip(group, fused, strict=True):
+            for hit in hits:
+                hit["metadata"] = _select_fields(hit["metadata"], fields)
+            results.append(
+                {
+                    "query_id": query.id,
+                    "query": query.text,
+                    "results": hits,
+                    "timings": batch_timings,
+                }
+            )
+        yield results
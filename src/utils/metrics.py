@@ -0,0 +1,230 @@
+"""Per-stage timings and throughput counters for ingest runs."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from src.config.settings import settings
+
+# Parsing the TSV, building documents/metadata, embedding, and writing to Chroma.
+STAGES = ("parse", "build", "embed", "write")
+DEFAULT_RUNS_DIR = settings.cache_dir / "runs"
+PROMETHEUS_PREFIX = "cuecards_ingest"
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+@dataclass(slots=True)
+class StageTimings:
+    """Busy time, batch durations and volume handled by one stage."""
+
+    batches: int = 0
+    rows: int = 0
+    tokens: int = 0
+    seconds: float = 0.0
+    durations: list[float] = field(default_factory=list, repr=False)
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.durations)
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "tokens": self.tokens,
+            "seconds": round(self.seconds, 4),
+            "rows_per_second": round(self.rows / self.seconds, 1) if self.seconds else 0.0,
+            "tokens_per_second": round(self.tokens / self.seconds, 1) if self.seconds else 0.0,
+            "p50_ms": round(_percentile(ordered, 0.5) * 1000, 2),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        }
+
+
+class IngestMetrics:
+    """
+    Thread-safe record of where an ingest run spends its time.
+
+    Every batch's duration is recorded per stage, along with rows and estimated
+    tokens, so stage throughput (rows or tokens per busy second) can be set against
+    wall-clock throughput. Embedding concurrency is tracked too: the peak number of
+    requests in flight, and the mean (embed busy time over wall time). ``progress``
+    is called with the row count of every written batch, e.g. ``tqdm.update``.
+    """
+
+    def __init__(self, progress: Callable[[int], Any] | None = None) -> None:
+        self.progress = progress
+        self.stages = {stage: StageTimings() for stage in STAGES}
+        self.counters: dict[str, float] = {}
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._started = time.perf_counter()
+        self._started_at = datetime.now(UTC)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, rows: int, tokens: int = 0) -> None:
+        with self._lock:
+            timings = self.stages.setdefault(stage, StageTimings())
+            timings.batches += 1
+            timings.rows += rows
+            timings.tokens += tokens
+            timings.seconds += seconds
+            timings.durations.append(seconds)
+        if stage == "write" and self.progress is not None:
+            self.progress(rows)
+
+    @contextmanager
+    def timed(self, stage: str, rows: int, tokens: int = 0) -> Iterator[None]:
+        """Record the duration of the enclosed block as one batch of ``stage``."""
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, rows, tokens)
+
+    @contextmanager
+    def in_flight(self) -> Iterator[None]:
+        """Count the enclosed block as one in-flight embedding request."""
+
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def add(self, name: str, value: float) -> None:
+        """Add to a named run counter (e.g. embedding requests or retries)."""
+
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def summary(self) -> dict[str, Any]:
+        elapsed = self.elapsed
+        with self._lock:
+            stages = {name: timings.summary() for name, timings in self.stages.items()}
+            counters = dict(self.counters)
+        rows = stages["write"]["rows"]
+        tokens = stages["embed"]["tokens"]
+        return {
+            "started_at": self._started_at.isoformat(),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_written": rows,
+            "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0,
+            "tokens_embedded": tokens,
+            "tokens_per_second": round(tokens / elapsed, 1) if elapsed else 0.0,
+            "max_in_flight": self.max_in_flight,
+            "mean_in_flight": round(stages["embed"]["seconds"] / elapsed, 2) if elapsed else 0.0,
+            "counters": counters,
+            "stages": stages,
+        }
+
+    def describe(self) -> str:
+        summary = self.summary()
+        lines = [
+            f"{summary['rows_written']} rows in {summary['elapsed_seconds']:.1f}s "
+            f"({summary['rows_per_second']:.1f} rows/s, {summary['tokens_per_second']:.0f} "
+            f"tokens/s); embedding requests in flight: max {summary['max_in_flight']}, "
+            f"mean {summary['mean_in_flight']:.2f}"
+        ]
+        for name, stage in summary["stages"].items():
+            if not stage["batches"]:
+                continue
+            lines.append(
+                f"{name}: {stage['batches']} batches, {stage['seconds']:.2f}s busy, "
+                f"p50 {stage['p50_ms']:.1f} ms / p95 {stage['p95_ms']:.1f} ms / "
+                f"max {stage['max_ms']:.1f} ms, {stage['rows_per_second']:.0f} rows/s"
+            )
+        return "\n".join(lines)
+
+    def write_json(self, path: Path | str, extra: Mapping[str, Any] | None = None) -> Path:
+        """Write the run summary (plus ``extra`` fields) as JSON and return the path."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({**(extra or {}), **self.summary()}, indent=2), encoding="utf-8")
+        return path
+
+    def write_prometheus(self, path: Path | str) -> Path:
+        """
+        Write the summary in Prometheus text format for node_exporter's textfile collector.
+
+        The file is replaced atomically so the collector never reads a partial write.
+        """
+
+        summary = self.summary()
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list[tuple[str, float]]) -> None:
+            full = f"{PROMETHEUS_PREFIX}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            lines.extend(f"{full}{labels} {value}" for labels, value in samples)
+
+        stages = summary["stages"]
+        # Values describe the last run, so everything is a gauge rather than a counter.
+        for key, suffix, help_text in (
+            ("seconds", "seconds", "Busy time per ingest stage."),
+            ("batches", "batches", "Batches handled per ingest stage."),
+            ("rows", "rows", "Rows handled per ingest stage."),
+            ("p95_ms", "p95_milliseconds", "95th percentile batch duration per ingest stage."),
+        ):
+            metric(
+                f"stage_{suffix}",
+                "gauge",
+                help_text,
+                [(f'{{stage="{name}"}}', stage[key]) for name, stage in stages.items()],
+            )
+        for key, help_text in (
+            ("elapsed_seconds", "Wall time of the last ingest run."),
+            ("rows_written", "Rows written by the last ingest run."),
+            ("rows_per_second", "Rows written per wall-clock second."),
+            ("tokens_per_second", "Estimated tokens embedded per wall-clock second."),
+            ("max_in_flight", "Peak embedding requests in flight."),
+            ("mean_in_flight", "Mean embedding requests in flight."),
+        ):
+            metric(key, "gauge", help_text, [("", summary[key])])
+        for name, value in sorted(summary["counters"].items()):
+            metric(
+                name,
+                "gauge",
+                f"{name.replace('_', ' ').capitalize()} in the last run.",
+                [("", value)],
+            )
+        metric(
+            "last_run_timestamp_seconds",
+            "gauge",
+            "Unix time the last ingest run finished.",
+            [("", round(time.time(), 3))],
+        )
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+
+def default_summary_path(root: Path | str = DEFAULT_RUNS_DIR) -> Path:
+    """Return a timestamped path for a run summary under ``root``."""
+
+    return Path(root) / f"ingest-{datetime.now(UTC):%Y%m%dT%H%M%SZ}.json"
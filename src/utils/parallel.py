@@ -0,0 +1,203 @@
+"""Parallel TSV reader: byte-range shards of a memory-mapped source parsed in a process pool."""
+
+from __future__ import annotations
+
+import csv
+import io
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from src.config.settings import settings
+from src.utils.batching import RecordBatch
+from src.utils.chroma_utils import _build_record
+from src.utils.metrics import IngestMetrics
+
+# Target bytes per shard; boundaries then move forward to the next record start.
+DEFAULT_SHARD_BYTES = 8 * 1024 * 1024
+# Shards parsed ahead of the consumer, per worker, bounding memory on large files.
+SHARDS_AHEAD_PER_WORKER = 2
+# Bytes scanned at a time when counting quotes.
+_SCAN_BYTES = 16 * 1024 * 1024
+
+
+@dataclass(slots=True)
+class _Shard:
+    """Records built from one shard, in file order, and what that took."""
+
+    ids: list[str] = field(default_factory=list)
+    documents: list[str] = field(default_factory=list)
+    metadatas: list[dict[str, Any]] = field(default_factory=list)
+    # Positions whose id falls back to the row index, only known once earlier shards are in.
+    fallback_ids: list[int] = field(default_factory=list)
+    parse_seconds: float = 0.0
+    build_seconds: float = 0.0
+
+
+def _count_quotes(path: Path, start: int, end: int) -> int:
+    """Return the number of ``"`` bytes in ``[start, end)`` of the file."""
+
+    if start >= end:
+        return 0
+    quotes = 0
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for offset in range(start, end, _SCAN_BYTES):
+            quotes += mm[offset : min(offset + _SCAN_BYTES, end)].count(b'"')
+    return quotes
+
+
+def _parse_shard(path: Path, start: int, end: int, fieldnames: list[str]) -> _Shard:
+    """Parse the records in ``[start, end)`` and build their ids, documents and metadata."""
+
+    started = time.perf_counter()
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode("utf-8")
+    rows = list(csv.DictReader(io.StringIO(text, newline=""), fieldnames, delimiter="\t"))
+    parsed = time.perf_counter()
+
+    shard = _Shard()
+    for pos, row in enumerate(rows):
+        doc_id, document, metadata = _build_record(row, pos)
+        if not (row.get("url") or row.get("number")):
+            shard.fallback_ids.append(pos)
+        shard.ids.append(doc_id)
+        shard.documents.append(document)
+        shard.metadatas.append(metadata)
+    shard.parse_seconds = parsed - started
+    shard.build_seconds = time.perf_counter() - parsed
+    return shard
+
+
+def _record_start(mm: mmap.mmap, offset: int, in_quotes: bool) -> int:
+    """
+    Return the offset of the first record starting at or after ``offset``.
+
+    A newline ends a record unless it is inside a quoted field, i.e. unless an odd
+    number of quotes precede it; ``in_quotes`` is that parity at ``offset``.
+    """
+
+    pos = offset
+    while True:
+        newline = mm.find(b"\n", pos)
+        if newline < 0:
+            return len(mm)
+        in_quotes ^= mm[pos:newline].count(b'"') % 2 == 1
+        if not in_quotes:
+            return newline + 1
+        pos = newline + 1
+
+
+def _pool_context() -> Any:
+    # Workers are forked from a clean server rather than from this process, whose
+    # embedding and HTTP threads may hold locks at fork time. The server imports this
+    # module once, so workers start without paying for the imports again.
+    if sys.platform == "win32":
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def iter_record_batches_parallel(
+    tsv_path: Path,
+    batch_size: int,
+    start_row: int = 0,
+    metrics: IngestMetrics | None = None,
+    workers: int | None = None,
+    shard_bytes: int = DEFAULT_SHARD_BYTES,
+) -> Iterator[RecordBatch]:
+    """
+    Yield the same record batches as the row-by-row reader, parsed on ``workers`` processes.
+
+    The memory-mapped source is cut into byte ranges of about ``shard_bytes``. Each
+    cut moves forward to the next record start: the first newline outside a quoted
+    field, found from the parity of the quotes before it (counted per range by the
+    workers, so quoted fields may span lines and shards). Workers parse their range
+    with ``csv.DictReader`` and build ids, documents and metadata. Shards come back
+    in file order, with at most ``SHARDS_AHEAD_PER_WORKER`` per worker in flight,
+    and are regrouped into ``batch_size``-row batches from ``start_row`` on. Rows
+    are numbered across shards, so ``row-<idx>`` fallback ids match the other
+    readers. Rows before ``start_row`` are still parsed and built, then dropped.
+
+    Quotes are assumed to appear only inside quoted fields (as ``csv`` writers
+    produce); a stray quote in an unquoted field would misalign the shards. With
+    ``metrics``, each shard's worker time is recorded as ``parse`` and ``build``.
+    """
+
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+    if shard_bytes <= 0:
+        raise ValueError("shard_bytes must be positive.")
+    workers = workers or settings.tsv_reader_workers or os.cpu_count() or 1
+    if tsv_path.stat().st_size == 0:
+        return
+
+    with tsv_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header_end = _record_start(mm, 0, False)
+        header = mm[:header_end].decode("utf-8")
+        fieldnames = next(csv.reader(io.StringIO(header, newline=""), delimiter="\t"), [])
+        size = len(mm)
+        cuts = list(range(header_end, size, shard_bytes))[1:]
+
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+        try:
+            # Quotes between consecutive cuts; their running parity says whether a cut
+            # falls inside a quoted field.
+            quotes = pool.map(_count_quotes, [tsv_path] * len(cuts), [header_end, *cuts], cuts)
+            boundaries = [header_end]
+            in_quotes = False
+            for cut, segment_quotes in zip(cuts, quotes, strict=False):
+                in_quotes ^= segment_quotes % 2 == 1
+                boundary = _record_start(mm, cut, in_quotes)
+                if boundary > boundaries[-1]:
+                    boundaries.append(boundary)
+            if size > boundaries[-1]:
+                boundaries.append(size)
+
+            shards = iter(zip(boundaries, boundaries[1:], strict=False))
+            pending: deque[Future[_Shard]] = deque()
+
+            def submit_next() -> None:
+                shard_range = next(shards, None)
+                if shard_range is not None:
+                    pending.append(pool.submit(_parse_shard, tsv_path, *shard_range, fieldnames))
+
+            for _ in range(workers * SHARDS_AHEAD_PER_WORKER):
+                submit_next()
+
+            first_row = 0
+            batch = RecordBatch()
+            while pending:
+                shard = pending.popleft().result()
+                submit_next()
+                count = len(shard.ids)
+                if metrics is not None:
+                    metrics.record("parse", shard.parse_seconds, count)
+                    metrics.record("build", shard.build_seconds, count)
+                for pos in shard.fallback_ids:
+                    shard.ids[pos] = f"row-{first_row + pos}"
+
+                pos = max(0, start_row - first_row)
+                while pos < count:
+                    take = min(batch_size - len(batch), count - pos)
+                    batch.rows.extend(range(first_row + pos, first_row + pos + take))
+                    batch.ids.extend(shard.ids[pos : pos + take])
+                    batch.documents.extend(shard.documents[pos : pos + take])
+                    batch.metadatas.extend(shard.metadatas[pos : pos + take])
+                    pos += take
+                    if len(batch) == batch_size:
+                        yield batch
+                        batch = RecordBatch()
+                first_row += count
+            if len(batch):
+                yield batch
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
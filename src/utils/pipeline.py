@@ -0,0 +1,144 @@
+"""Bounded, multi-stage pipeline used to overlap reading, embedding and writing."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+# How long blocked queue operations wait before re-checking for a failed stage.
+_POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class _Stop(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class Pipeline(Generic[T, U]):
+    """
+    Run ``read -> embed -> write`` as concurrent stages joined by bounded queues.
+
+    One thread drains ``items`` (the reader/document builder), ``max_concurrency``
+    worker threads run ``embed`` and ``writers`` threads run ``write``. The queues
+    between stages hold at most ``max_concurrency`` items each, so a slow stage
+    applies backpressure upstream instead of letting batches pile up in memory.
+    Total runtime is bounded by the slowest stage rather than the sum of all three.
+
+    The first exception raised by any stage stops the pipeline and is re-raised
+    from :meth:`run`.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[T], U],
+        write: Callable[[U], None],
+        max_concurrency: int = 4,
+        writers: int = 1,
+    ) -> None:
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive.")
+        if writers <= 0:
+            raise ValueError("writers must be positive.")
+
+        self.embed = embed
+        self.write = write
+        self.max_concurrency = max_concurrency
+        self.writers = writers
+
+        self._embed_q: queue.Queue[Any] = queue.Queue(maxsize=max_concurrency)
+        self._write_q: queue.Queue[Any] = queue.Queue(maxsize=max_concurrency)
+        self._failed = threading.Event()
+        self._error: BaseException | None = None
+        self._error_lock = threading.Lock()
+
+    def _fail(self, exc: BaseException) -> None:
+        with self._error_lock:
+            if self._error is None:
+                self._error = exc
+        self._failed.set()
+
+    def _put(self, q: queue.Queue[Any], item: Any) -> None:
+        while True:
+            if self._failed.is_set():
+                raise _Stop
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue[Any]) -> Any:
+        while True:
+            if self._failed.is_set():
+                raise _Stop
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def _read(self, items: Iterable[T]) -> None:
+        try:
+            for item in items:
+                self._put(self._embed_q, item)
+            for _ in range(self.max_concurrency):
+                self._put(self._embed_q, _DONE)
+        except _Stop:
+            pass
+        except BaseException as exc:  # noqa: BLE001
+            self._fail(exc)
+
+    def _embed(self) -> None:
+        try:
+            while (item := self._get(self._embed_q)) is not _DONE:
+                self._put(self._write_q, self.embed(item))
+        except _Stop:
+            pass
+        except BaseException as exc:  # noqa: BLE001
+            self._fail(exc)
+
+    def _write(self) -> None:
+        try:
+            while (item := self._get(self._write_q)) is not _DONE:
+                self.write(item)
+        except _Stop:
+            pass
+        except BaseException as exc:  # noqa: BLE001
+            self._fail(exc)
+
+    def run(self, items: Iterable[T]) -> None:
+        """Push every item through the pipeline, blocking until all are written."""
+
+        reader = threading.Thread(target=self._read, args=(items,), name="pipeline-read")
+        embedders = [
+            threading.Thread(target=self._embed, name=f"pipeline-embed-{i}")
+            for i in range(self.max_concurrency)
+        ]
+        writers = [
+            threading.Thread(target=self._write, name=f"pipeline-write-{i}")
+            for i in range(self.writers)
+        ]
+
+        for thread in (reader, *embedders, *writers):
+            thread.daemon = True
+            thread.start()
+
+        reader.join()
+        for thread in embedders:
+            thread.join()
+        if not self._failed.is_set():
+            try:
+                for _ in writers:
+                    self._put(self._write_q, _DONE)
+            except _Stop:
+                pass
+        for thread in writers:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,177 @@
+"""Postgres connection and full-text search schema for the ``cards`` table."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import psycopg
+
+from src.config.settings import settings
+
+CARDS_TABLE = "cards"
+PRIMARY_KEY_NAME = "cards_pkey"
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_INDEX_NAME = "cards_search_vector_idx"
+TEXT_SEARCH_CONFIG = "english"
+
+# Secondary indexes by name: btree for filtered lookups, trigram for fuzzy name matches.
+CARD_INDEXES = {
+    "cards_name_idx": "(name)",
+    "cards_album_idx": "(album)",
+    "cards_rarity_idx": "(rarity)",
+    "cards_name_trgm_idx": "USING GIN (name gin_trgm_ops)",
+}
+
+# Name terms outrank ability names, which outrank description and tag terms.
+SEARCH_VECTOR_SQL = f"""
+    setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(name, '')), 'A')
+    || setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(ability_name, '')), 'B')
+    || setweight(
+        to_tsvector(
+            '{TEXT_SEARCH_CONFIG}',
+            coalesce(ability_description, '') || ' ' || coalesce(tags, '')
+        ),
+        'C'
+    )
+"""
+
+# Chroma ids are the card url, falling back to its number; keyword hits use the same key.
+DOC_ID_SQL = "coalesce(nullif(url, ''), id)"
+
+
+def connect(**overrides: Any) -> psycopg.Connection:
+    """Open an autocommit connection using the Postgres settings."""
+
+    params: dict[str, Any] = {
+        "host": settings.postgres_host,
+        "port": settings.postgres_port,
+        "dbname": settings.postgres_db,
+        "user": settings.postgres_user,
+        "password": settings.postgres_password,
+        "autocommit": True,
+    }
+    params.update(overrides)
+    return psycopg.connect(**params)
+
+
+def _index_valid(conn: psycopg.Connection, name: str) -> bool | None:
+    """Whether the index ``name`` is valid; None when there is no such index."""
+
+    row = conn.execute(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (name,)
+    ).fetchone()
+    return None if row is None else bool(row[0])
+
+
+def _has_column(conn: psycopg.Connection, table: str, column: str) -> bool:
+    row = conn.execute(
+        """
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s AND column_name = %s
+        """,
+        (table, column),
+    ).fetchone()
+    return row is not None
+
+
+def create_index(
+    conn: psycopg.Connection,
+    name: str,
+    definition: str,
+    table: str = CARDS_TABLE,
+    unique: bool = False,
+) -> bool:
+    """
+    Build an index ``CONCURRENTLY`` unless a valid one with that name exists.
+
+    Readers and writers are not blocked while it builds. An invalid leftover from
+    an interrupted build is dropped and rebuilt. Needs an autocommit connection.
+    Returns True when the index was built.
+    """
+
+    valid = _index_valid(conn, name)
+    if valid:
+        return False
+    if valid is not None:
+        conn.execute(f"DROP INDEX CONCURRENTLY {name}")
+    conn.execute(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY {name} ON {table} {definition}"
+    )
+    return True
+
+
+def ensure_primary_key(conn: psycopg.Connection, table: str = CARDS_TABLE) -> int | None:
+    """
+    Make ``url`` the table's primary key, which upserts need for ``ON CONFLICT``.
+
+    Returns None when the key already exists. Otherwise duplicate urls are first
+    collapsed to one row each, and the number of rows removed is returned. The
+    unique index is built concurrently; only the final attach takes a brief lock.
+    """
+
+    exists = conn.execute(
+        "SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+        (table,),
+    ).fetchone()
+    if exists is not None:
+        return None
+
+    removed = conn.execute(
+        f"DELETE FROM {table} AS a USING {table} AS b WHERE a.url = b.url AND a.ctid < b.ctid"
+    ).rowcount
+    create_index(conn, PRIMARY_KEY_NAME, "(url)", table=table, unique=True)
+    conn.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {PRIMARY_KEY_NAME} PRIMARY KEY USING INDEX {PRIMARY_KEY_NAME}"
+    )
+    return removed
+
+
+def ensure_indexes(conn: psycopg.Connection, table: str = CARDS_TABLE) -> list[str]:
+    """Create the secondary and full-text indexes that are missing; returns their names."""
+
+    conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    created = [
+        name
+        for name, definition in CARD_INDEXES.items()
+        if create_index(conn, name, definition, table=table)
+    ]
+    if ensure_search_schema(conn, table=table):
+        created.append(SEARCH_INDEX_NAME)
+    return created
+
+
+def ensure_search_schema(conn: psycopg.Connection, table: str = CARDS_TABLE) -> bool:
+    """
+    Add the generated ``search_vector`` column and its GIN index if missing.
+
+    Returns True when anything was created. The catalog is checked first so a
+    table that already has both is never locked.
+    """
+
+    created = False
+    if not _has_column(conn, table, SEARCH_VECTOR_COLUMN):
+        conn.execute(
+            f"ALTER TABLE {table} ADD COLUMN {SEARCH_VECTOR_COLUMN} tsvector "
+            f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+        )
+        created = True
+
+    if create_index(conn, SEARCH_INDEX_NAME, f"USING GIN ({SEARCH_VECTOR_COLUMN})", table=table):
+        created = True
+    return created
+
+
+def missing_search_schema(conn: psycopg.Connection, table: str = CARDS_TABLE) -> list[str]:
+    """
+    Return the full-text search column and index ``table`` lacks (empty when ready).
+
+    Only reads the catalog, so read-only callers can check before searching and
+    leave :func:`ensure_search_schema` to the loader.
+    """
+
+    missing = []
+    if not _has_column(conn, table, SEARCH_VECTOR_COLUMN):
+        missing.append(f"column {SEARCH_VECTOR_COLUMN}")
+    if not _index_valid(conn, SEARCH_INDEX_NAME):
+        missing.append(f"index {SEARCH_INDEX_NAME}")
+    return missing
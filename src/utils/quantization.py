@@ -0,0 +1,90 @@
+"""Reduced-precision storage of embedding vectors (float16 / int8) and dimension truncation."""
+
+from __future__ import annotations
+
+import numpy as np
+
+FLOAT32 = "float32"
+FLOAT16 = "float16"
+INT8 = "int8"
+QUANTIZATIONS = (FLOAT32, FLOAT16, INT8)
+# Collection metadata key recording how precomputed embeddings are stored.
+QUANTIZATION_KEY = "quantization"
+
+_DTYPES = {FLOAT32: np.float32, FLOAT16: np.float16, INT8: np.int8}
+
+
+def check_quantization(quantization: str | None) -> str:
+    """Return a valid quantization name (``None`` means float32)."""
+
+    name = quantization or FLOAT32
+    if name not in QUANTIZATIONS:
+        raise ValueError(
+            f"Unknown quantization '{name}'; expected one of {', '.join(QUANTIZATIONS)}."
+        )
+    return name
+
+
+def storage_dtype(quantization: str) -> np.dtype:
+    return np.dtype(_DTYPES[check_quantization(quantization)])
+
+
+def bytes_per_vector(dimension: int, quantization: str) -> int:
+    """Bytes one stored vector takes, including the int8 per-vector scale."""
+
+    size = dimension * storage_dtype(quantization).itemsize
+    return size + 4 if quantization == INT8 else size
+
+
+def quantize(vectors: np.ndarray, quantization: str) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Convert ``N x D`` vectors to their stored form, returning ``(values, scales)``.
+
+    ``float16`` is a plain cast. ``int8`` is symmetric per vector: each row is
+    divided by ``max(|row|) / 127`` and rounded, and that scale is returned (one
+    float32 per row) to undo it. ``scales`` is None for the float types.
+    """
+
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    quantization = check_quantization(quantization)
+    if quantization != INT8:
+        return vectors.astype(_DTYPES[quantization]), None
+    scales = np.abs(vectors).max(axis=1) / 127.0 if vectors.size else np.zeros(len(vectors))
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    values = np.rint(vectors / scales[:, None]).clip(-127, 127).astype(np.int8)
+    return values, scales
+
+
+def dequantize(values: np.ndarray, scales: np.ndarray | None = None) -> np.ndarray:
+    """Return float32 vectors from stored ``values`` (and int8 ``scales``)."""
+
+    vectors = np.asarray(values, dtype=np.float32)
+    if scales is not None:
+        vectors = vectors * np.asarray(scales, dtype=np.float32)[:, None]
+    return vectors
+
+
+def round_trip(vectors: np.ndarray, quantization: str) -> np.ndarray:
+    """Return float32 vectors carrying exactly the precision ``quantization`` stores."""
+
+    if check_quantization(quantization) == FLOAT32:
+        return np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    return dequantize(*quantize(vectors, quantization))
+
+
+def truncate_dimensions(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """
+    Keep the first ``dimensions`` components of each vector and re-normalize it.
+
+    For models trained with nested (Matryoshka) representations, such as OpenAI's
+    ``text-embedding-3-*``, this matches requesting ``dimensions`` from the API.
+    """
+
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if dimensions <= 0:
+        raise ValueError("dimensions must be positive.")
+    if dimensions >= vectors.shape[1]:
+        return vectors
+    truncated = vectors[:, :dimensions]
+    norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+    return np.divide(truncated, norms, out=np.zeros_like(truncated), where=norms > 0)
@@ -0,0 +1,198 @@
+"""Rate-limit-aware scheduling and retries for embedding provider calls."""
+
+from __future__ import annotations
+
+import email.utils
+import random
+import threading
+import time
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.utils.batching import estimate_tokens
+
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+_RETRYABLE_ERROR_NAMES = frozenset(
+    {"APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout", "RemoteProtocolError"}
+)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at ``per_minute`` units per minute.
+
+    The bucket holds at most one minute's worth of units, so bursts up to the
+    provider's per-minute quota go through immediately and sustained load settles
+    at the configured rate.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive.")
+
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Block until ``amount`` units are available; returns the seconds spent waiting."""
+
+        # A single request larger than the bucket waits for a full bucket, then proceeds.
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._available >= amount:
+                    self._available -= amount
+                    return waited
+                delay = (amount - self._available) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the provider reports we are over quota."""
+
+        with self._lock:
+            self._refill(time.monotonic())
+            self._available = 0.0
+
+
+@dataclass(slots=True)
+class RetryPolicy:
+    """Jittered exponential backoff settings."""
+
+    max_retries: int = 6
+    base_delay: float = 0.5
+    max_delay: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        """Return a full-jitter delay for the given (zero-based) retry attempt."""
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+@dataclass(slots=True)
+class SchedulerStats:
+    """Counters describing how an embedding scheduler spent its time."""
+
+    requests: int = 0
+    tokens: int = 0
+    retries: int = 0
+    throttled_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **increments: float) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+def _status_code(exc: BaseException) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return True for rate limiting, transient server errors and connection failures."""
+
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(exc).__name__ in _RETRYABLE_ERROR_NAMES
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Return the delay requested by a ``Retry-After`` header on the error, if any."""
+
+    headers: Mapping[str, str] | None = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    raw = headers.get("retry-after-ms")
+    if raw:
+        try:
+            return max(0.0, float(raw) / 1000.0)
+        except ValueError:
+            pass
+
+    raw = headers.get("retry-after")
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(raw)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class EmbeddingScheduler:
+    """
+    Wrap an embedding function with request/token rate limits and retries.
+
+    Calls block on token buckets for requests per minute and (estimated) tokens per
+    minute before reaching the provider. Rate-limit responses, transient 5xx errors and
+    connection failures are retried with jittered exponential backoff, honoring
+    ``Retry-After`` when the provider sends one. One scheduler is meant to be shared by
+    every caller of the same provider/model so they draw from a single quota.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[list[str]], Sequence[Any]],
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        retry: RetryPolicy | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.embed_fn = embed_fn
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.retry = retry or RetryPolicy()
+        self.stats = SchedulerStats()
+        self._sleep = sleep
+
+    def __call__(self, input: list[str]) -> list[Any]:  # noqa: A002 - matches Chroma's API
+        texts = list(input)
+        tokens = sum(estimate_tokens(text) for text in texts)
+
+        attempt = 0
+        while True:
+            throttled = 0.0
+            if self.requests is not None:
+                throttled += self.requests.acquire(1)
+            if self.tokens is not None:
+                throttled += self.tokens.acquire(tokens)
+            self.stats.add(requests=1, tokens=tokens, throttled_seconds=throttled)
+
+            try:
+                return list(self.embed_fn(texts))
+            except Exception as exc:
+                if attempt >= self.retry.max_retries or not is_retryable(exc):
+                    raise
+                delay = retry_after_seconds(exc)
+                if delay is None:
+                    delay = self.retry.backoff(attempt)
+                if _status_code(exc) == 429:
+                    # Everyone sharing this quota should back off, not just this caller.
+                    for bucket in (self.requests, self.tokens):
+                        if bucket is not None:
+                            bucket.drain()
+                self.stats.add(retries=1, backoff_seconds=delay)
+                self._sleep(delay)
+                attempt += 1
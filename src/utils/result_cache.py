@@ -0,0 +1,147 @@
+"""In-process cache of query results, invalidated by a per-collection content version."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from src.config.settings import settings
+from src.utils.embedding_cache import normalize_query
+
+# Collection metadata key holding an opaque token that changes on every write.
+CONTENT_VERSION_KEY = "content_version"
+
+
+def content_version(collection: Any) -> str:
+    """Return the collection's content version ("" for collections never versioned)."""
+
+    return str((collection.metadata or {}).get(CONTENT_VERSION_KEY, ""))
+
+
+def current_content_version(client: Any, collection: Any) -> str:
+    """
+    Return the content version stored on the server for ``collection``.
+
+    A collection handle keeps the metadata it was fetched with, so a long-lived
+    handle would go on reporting the version from before later writes.
+    """
+
+    return content_version(client.get_collection(name=collection.name))
+
+
+@dataclass(slots=True)
+class ResultCacheStats:
+    """Hit/miss/eviction counters and the time spent answering each kind of lookup."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    hit_seconds: float = 0.0
+    miss_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def mean_hit_ms(self) -> float:
+        return self.hit_seconds / self.hits * 1000 if self.hits else 0.0
+
+    @property
+    def mean_miss_ms(self) -> float:
+        return self.miss_seconds / self.misses * 1000 if self.misses else 0.0
+
+    def describe(self) -> str:
+        return (
+            f"{self.hits + self.misses} lookups, hit rate {self.hit_rate:.1%}, "
+            f"{self.evictions} evictions; mean {self.mean_hit_ms:.3f} ms cached vs "
+            f"{self.mean_miss_ms:.1f} ms uncached per query"
+        )
+
+
+class QueryResultCache:
+    """
+    LRU cache of per-query search results bounded by entry count and bytes.
+
+    Keys include the collection's content version, so a refresh that bumps the
+    version makes every earlier entry unreachable; stale entries then age out of
+    the LRU instead of being served. Sizes are the length of each entry's JSON
+    encoding, a close proxy for the memory held.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.result_cache_max_entries,
+        max_bytes: int = settings.result_cache_max_bytes,
+    ) -> None:
+        if max_entries <= 0 or max_bytes <= 0:
+            raise ValueError("max_entries and max_bytes must be positive.")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = ResultCacheStats()
+        self._entries: OrderedDict[str, tuple[dict[str, Any], int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        collection: str,
+        version: str,
+        query: str,
+        n_results: int,
+        where: Mapping[str, Any] | None,
+        include: Sequence[str],
+    ) -> str:
+        """Return the cache key for one query against one version of a collection."""
+
+        payload = json.dumps(
+            [collection, version, normalize_query(query), n_results, where, sorted(include)],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats.evictions += 1
+
+    def record(self, hits: int, hit_seconds: float, misses: int, miss_seconds: float) -> None:
+        with self._lock:
+            self.stats.hits += hits
+            self.stats.hit_seconds += hit_seconds
+            self.stats.misses += misses
+            self.stats.miss_seconds += miss_seconds
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
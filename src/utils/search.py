@@ -0,0 +1,315 @@
+"""Batched semantic search against a Chroma collection."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from src.utils.filters import EMPTY, GET, QUERY
+from src.utils.result_cache import QueryResultCache, content_version, current_content_version
+from src.utils.vector_mirror import collection_space, pairwise_distances
+
+DEFAULT_QUERY_BATCH_SIZE = 64
+DEFAULT_RESULT_FIELDS = ("name", "album", "collection", "rarity", "source")
+# A GET-planned search fetches at most this many times ``n_results`` records before
+# concluding the estimate was off and falling back to a vector query.
+GET_FETCH_FACTOR = 4
+
+
+@dataclass(slots=True)
+class QueryRequest:
+    """One query text plus the caller's id for it (echoed back in the results)."""
+
+    id: str
+    text: str
+
+
+def parse_queries(lines: Iterable[str]) -> Iterator[QueryRequest]:
+    """
+    Parse a stream of queries, one per line.
+
+    A line is either plain query text or a JSON object with a ``query`` (or ``text``)
+    key and an optional ``id``. Blank lines are skipped; queries without an id are
+    numbered by their position in the stream.
+    """
+
+    position = 0
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            continue
+        position += 1
+        if stripped.startswith("{"):
+            try:
+                raw = json.loads(stripped)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Query {position} is not valid JSON: {exc}") from exc
+            text = raw.get("query") or raw.get("text")
+            if not text:
+                raise ValueError(f"Query {position} has no 'query' field.")
+            yield QueryRequest(id=str(raw.get("id", position)), text=str(text))
+        else:
+            yield QueryRequest(id=str(position), text=stripped)
+
+
+def _batched(items: Iterable[QueryRequest], size: int) -> Iterator[list[QueryRequest]]:
+    batch: list[QueryRequest] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _select_fields(metadata: dict[str, Any] | None, fields: Sequence[str] | None) -> dict[str, Any]:
+    metadata = metadata or {}
+    if fields is None:
+        return dict(metadata)
+    return {key: metadata[key] for key in fields if key in metadata}
+
+
+def _response_slice(response: Mapping[str, Any], position: int) -> dict[str, Any]:
+    """Return one query's ids/distances/metadatas/documents from a batched response."""
+
+    return {
+        field: (response.get(field) or [[]] * (position + 1))[position]
+        for field in ("ids", "distances", "metadatas", "documents")
+    }
+
+
+def _get_and_rank(
+    collection: Any,
+    query_embeddings: Sequence[Any],
+    n_results: int,
+    where: dict[str, Any] | None,
+    include: list[str],
+) -> dict[str, Any] | None:
+    """
+    Fetch every record matching ``where`` and rank it exactly against each query.
+
+    Returns a ``collection.query``-shaped response, or None when more than
+    ``GET_FETCH_FACTOR * n_results`` records match (a vector query is cheaper then).
+    """
+
+    limit = max(n_results, 1) * GET_FETCH_FACTOR
+    fetched = ["embeddings", *(field for field in include if field != "distances")]
+    page = collection.get(where=where, limit=limit + 1, include=fetched)
+    if len(page["ids"]) > limit:
+        return None
+
+    queries = np.asarray(query_embeddings, dtype=np.float32)
+    response: dict[str, Any] = {"ids": [], "distances": [], "metadatas": [], "documents": []}
+    if not page["ids"]:
+        for field in response:
+            response[field] = [[] for _ in range(len(queries))]
+        return response
+
+    vectors = np.asarray(page["embeddings"], dtype=np.float32)
+    distances = pairwise_distances(collection_space(collection), vectors, queries).T
+    for query_distances in distances:
+        order = np.argsort(query_distances, kind="stable")[:n_results].tolist()
+        response["ids"].append([page["ids"][row] for row in order])
+        response["distances"].append([float(query_distances[row]) for row in order])
+        response["metadatas"].append([page["metadatas"][row] for row in order])
+        if page.get("documents") is not None:
+            response["documents"].append([page["documents"][row] for row in order])
+    return response
+
+
+def search_batches(
+    collection: Any,
+    queries: Iterable[QueryRequest],
+    n_results: int = 5,
+    batch_size: int = DEFAULT_QUERY_BATCH_SIZE,
+    where: dict[str, Any] | None = None,
+    fields: Sequence[str] | None = DEFAULT_RESULT_FIELDS,
+    include_documents: bool = False,
+    embed_queries: Callable[[list[str]], Sequence[Any]] | None = None,
+    result_cache: QueryResultCache | None = None,
+    strategy: str = QUERY,
+    client: Any | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Search ``queries`` in groups of ``batch_size``, yielding one result list per group.
+
+    Each group is a single ``collection.query`` call, so the collection's embedding
+    function embeds every query text in the group in one request and Chroma searches
+    them in one round trip. Results are yielded as soon as a group completes, in input
+    order, as dicts with the query id/text and ranked hits (id, distance and the
+    metadata ``fields``; ``None`` keeps all metadata).
+
+    When ``embed_queries`` is given (e.g. a cached embedder), it computes the
+    ``query_embeddings`` instead of the collection's embedding function. With a
+    ``result_cache``, queries already answered for the collection's current
+    content version are served from it and only the rest are sent to Chroma. The
+    version is read once per call: from the server through ``client`` when given,
+    so a long-lived handle still sees later writes, else from the handle (fine for
+    a read-only vector mirror, or a handle opened for this run).
+
+    ``strategy`` comes from :func:`src.utils.filters.plan_filter`: ``EMPTY`` answers
+    without any request, and ``GET`` fetches the few records matching ``where`` once
+    per group and ranks them locally (needs ``embed_queries``), falling back to a
+    vector query if more match than expected.
+    """
+
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+
+    include = _include(include_documents)
+    version = _content_version(collection, client, result_cache)
+
+    for group in _batched(queries, batch_size):
+        started = time.perf_counter()
+        answers, pending = _cached_answers(
+            collection, group, n_results, where, include, result_cache, version
+        )
+        lookup_seconds = time.perf_counter() - started
+
+        miss_seconds = 0.0
+        if pending:
+            started = time.perf_counter()
+            texts = [group[positions[0]].text for positions in pending.values()]
+            response: dict[str, Any] | None = None
+            if strategy == EMPTY:
+                response = _empty_response(texts)
+            query_input: dict[str, Any] = (
+                {"query_embeddings": list(embed_queries(texts))}
+                if embed_queries is not None and response is None
+                else {"query_texts": texts}
+            )
+            if strategy == GET and "query_embeddings" in query_input:
+                response = _get_and_rank(
+                    collection, query_input["query_embeddings"], n_results, where, include
+                )
+            if response is None:
+                response = collection.query(
+                    **query_input,
+                    n_results=n_results,
+                    where=where,
+                    include=include,
+                )
+            _store_answers(response, pending, answers, result_cache)
+            miss_seconds = time.perf_counter() - started
+
+        _record_lookups(result_cache, group, pending, lookup_seconds, miss_seconds)
+        yield _format_results(group, answers, fields, include_documents)
+
+
+def _content_version(
+    collection: Any, client: Any | None, result_cache: QueryResultCache | None
+) -> str:
+    if result_cache is None:
+        return ""
+    if client is None:
+        return content_version(collection)
+    return current_content_version(client, collection)
+
+
+def _include(include_documents: bool) -> list[str]:
+    include = ["metadatas", "distances"]
+    if include_documents:
+        include.append("documents")
+    return include
+
+
+def _empty_response(texts: Sequence[str]) -> dict[str, Any]:
+    return {"ids": [[] for _ in texts], "distances": [[] for _ in texts]}
+
+
+def _cached_answers(
+    collection: Any,
+    group: Sequence[QueryRequest],
+    n_results: int,
+    where: dict[str, Any] | None,
+    include: list[str],
+    result_cache: QueryResultCache | None,
+    version: str,
+) -> tuple[dict[int, dict[str, Any]], dict[str, list[int]]]:
+    """
+    Return a group's answers found in ``result_cache`` and the positions still to search.
+
+    Positions still needing a search are grouped by cache key, so repeats of the same
+    query within a group are searched once (and count as cache hits).
+    """
+
+    answers: dict[int, dict[str, Any]] = {}
+    pending: dict[str, list[int]] = {}
+    for position, query in enumerate(group):
+        if result_cache is None:
+            pending[str(position)] = [position]
+            continue
+        key = result_cache.key(collection.name, version, query.text, n_results, where, include)
+        cached = result_cache.get(key)
+        if cached is not None:
+            answers[position] = cached
+        else:
+            pending.setdefault(key, []).append(position)
+    return answers, pending
+
+
+def _store_answers(
+    response: Mapping[str, Any],
+    pending: Mapping[str, list[int]],
+    answers: dict[int, dict[str, Any]],
+    result_cache: QueryResultCache | None,
+) -> None:
+    """Fan a batched response out to every pending position (and the result cache)."""
+
+    for slot, (key, positions) in enumerate(pending.items()):
+        answer = _response_slice(response, slot)
+        for position in positions:
+            answers[position] = answer
+        if result_cache is not None:
+            result_cache.put(key, answer)
+
+
+def _record_lookups(
+    result_cache: QueryResultCache | None,
+    group: Sequence[QueryRequest],
+    pending: Mapping[str, list[int]],
+    lookup_seconds: float,
+    miss_seconds: float,
+) -> None:
+    if result_cache is None:
+        return
+    # Only the first occurrence of a query is searched; its repeats are answered with it.
+    misses = len(pending)
+    result_cache.record(
+        hits=len(group) - misses,
+        hit_seconds=lookup_seconds,
+        misses=misses,
+        miss_seconds=miss_seconds,
+    )
+
+
+def _format_results(
+    group: Sequence[QueryRequest],
+    answers: Mapping[int, Mapping[str, Any]],
+    fields: Sequence[str] | None,
+    include_documents: bool,
+) -> list[dict[str, Any]]:
+    """Build each query's output dict with its ranked hits, in input order."""
+
+    results = []
+    for position, query in enumerate(group):
+        answer = answers[position]
+        hits = []
+        for rank, doc_id in enumerate(answer["ids"], start=1):
+            hit: dict[str, Any] = {
+                "rank": rank,
+                "id": doc_id,
+                "distance": answer["distances"][rank - 1],
+                "metadata": _select_fields(answer["metadatas"][rank - 1], fields),
+            }
+            if include_documents:
+                hit["document"] = answer["documents"][rank - 1]
+            hits.append(hit)
+        results.append({"query_id": query.id, "query": query.text, "results": hits})
+    return results
@@ -0,0 +1,211 @@
+"""Collection snapshots (records plus float32 embeddings) for restores without re-embedding."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import UTC, datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.vector_mirror import collection_space
+
+DEFAULT_SNAPSHOT_DIR = settings.cache_dir / "snapshots"
+SNAPSHOT_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+EMBEDDINGS_NAME = "embeddings.npy"
+RECORDS_NAME = "records.jsonl"
+SNAPSHOT_INCLUDE = ["embeddings", "documents", "metadatas"]
+
+
+def snapshot_path(collection: str, root: Path | str = DEFAULT_SNAPSHOT_DIR) -> Path:
+    """Return the default snapshot directory for a collection."""
+
+    return Path(root) / collection
+
+
+def _hnsw_configuration(collection: Any) -> dict[str, Any]:
+    configuration = getattr(collection, "configuration", None) or {}
+    hnsw = dict(configuration.get("hnsw") or {})
+    hnsw["space"] = collection_space(collection)
+    return {key: value for key, value in hnsw.items() if value is not None}
+
+
+def export_snapshot(
+    collection: Any,
+    directory: Path | str,
+    pages: Iterable[Mapping[str, Any]],
+) -> dict[str, Any]:
+    """
+    Write a collection's records and embeddings to ``directory`` and return the manifest.
+
+    ``pages`` are ``collection.get`` results including ``SNAPSHOT_INCLUDE`` (see
+    ``iter_collection_pages``). Embeddings are streamed into one float32 ``N x D``
+    ``.npy`` file; ids, documents and metadata go line by line to a JSONL sidecar in
+    the same order. The manifest keeps the collection's metadata and HNSW settings.
+    The snapshot is written to a temporary directory and swapped in when complete.
+    """
+
+    directory = Path(directory)
+    tmp_dir = directory.with_name(f"{directory.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    expected = collection.count()
+    embeddings: np.memmap | None = None
+    count = 0
+    with (tmp_dir / RECORDS_NAME).open("w", encoding="utf-8") as records:
+        for page in pages:
+            room = expected - count
+            if room <= 0:
+                break
+            # The collection may grow while exporting; keep the size we started with.
+            ids = list(page["ids"])[:room]
+            page_embeddings = np.asarray(page["embeddings"], dtype=np.float32)[: len(ids)]
+            documents = page.get("documents") or [None] * len(ids)
+            metadatas = page.get("metadatas") or [None] * len(ids)
+            if embeddings is None:
+                embeddings = np.lib.format.open_memmap(
+                    tmp_dir / EMBEDDINGS_NAME,
+                    mode="w+",
+                    dtype=np.float32,
+                    shape=(expected, page_embeddings.shape[1]),
+                )
+            embeddings[count : count + len(ids)] = page_embeddings
+            for record_id, document, metadata in zip(ids, documents, metadatas, strict=False):
+                records.write(
+                    json.dumps(
+                        {"id": record_id, "document": document, "metadata": metadata},
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+            count += len(ids)
+
+    dimension = 0
+    if embeddings is not None:
+        dimension = int(embeddings.shape[1])
+        embeddings.flush()
+        # Rows deleted while exporting: the file is rewritten at the exact size.
+        trimmed = np.array(embeddings[:count]) if count < expected else None
+        del embeddings
+        if trimmed is not None:
+            np.save(tmp_dir / EMBEDDINGS_NAME, trimmed)
+    else:
+        np.save(tmp_dir / EMBEDDINGS_NAME, np.zeros((0, 0), dtype=np.float32))
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "collection": collection.name,
+        "metadata": dict(collection.metadata or {}),
+        "hnsw": _hnsw_configuration(collection),
+        "count": count,
+        "dimension": dimension,
+        "exported_at": datetime.now(UTC).isoformat(),
+    }
+    (tmp_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir.rename(directory)
+    return manifest
+
+
+def load_manifest(directory: Path | str) -> dict[str, Any]:
+    """Read and check a snapshot's manifest."""
+
+    manifest_path = Path(directory) / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"No snapshot at {directory}.")
+    manifest: dict[str, Any] = json.loads(manifest_path.read_text())
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(
+            f"Unsupported snapshot format {manifest.get('format')!r} in {directory}; "
+            f"expected {SNAPSHOT_FORMAT}."
+        )
+    return manifest
+
+
+def iter_snapshot_batches(
+    directory: Path | str, batch_size: int
+) -> Iterator[tuple[list[str], np.ndarray, list[str | None], list[dict[str, Any] | None]]]:
+    """Yield ``(ids, embeddings, documents, metadatas)`` batches in export order."""
+
+    directory = Path(directory)
+    manifest = load_manifest(directory)
+    embeddings = np.load(directory / EMBEDDINGS_NAME, mmap_mode="r")
+    if embeddings.shape[0] != manifest["count"]:
+        raise ValueError(
+            f"Snapshot {directory} has {embeddings.shape[0]} embeddings; "
+            f"the manifest lists {manifest['count']}."
+        )
+
+    start = 0
+    with (directory / RECORDS_NAME).open(encoding="utf-8") as f:
+        while lines := list(islice(f, batch_size)):
+            records = [json.loads(line) for line in lines]
+            if start + len(records) > len(embeddings):
+                raise ValueError(f"Snapshot {directory} has more records than embeddings.")
+            yield (
+                [record["id"] for record in records],
+                np.asarray(embeddings[start : start + len(records)]),
+                [record.get("document") for record in records],
+                # Chroma rejects empty metadata dicts; records without fields carry None.
+                [record.get("metadata") or None for record in records],
+            )
+            start += len(records)
+    if start != manifest["count"]:
+        raise ValueError(
+            f"Snapshot {directory} has {start} records; the manifest lists {manifest['count']}."
+        )
+
+
+def import_snapshot(
+    client: Any,
+    directory: Path | str,
+    name: str | None = None,
+    embedding_function: Any | None = None,
+    batch_size: int | None = None,
+) -> tuple[Any, int]:
+    """
+    Create a collection from a snapshot and add its records with their stored embeddings.
+
+    The collection (``name`` or the exported name) must not exist yet. It gets the
+    snapshot's metadata and HNSW settings; ``embedding_function`` is attached for
+    later queries but never called here. Records are added in batches of
+    ``batch_size`` (default: the server's max batch size). Returns the collection
+    and the number of records added.
+    """
+
+    manifest = load_manifest(directory)
+    metadata = {
+        key: value
+        for key, value in manifest["metadata"].items()
+        # Index settings travel in the configuration instead.
+        if not key.startswith("hnsw:")
+    }
+    collection = client.create_collection(
+        name=name or manifest["collection"],
+        metadata=metadata or None,
+        configuration={"hnsw": manifest["hnsw"]},
+        embedding_function=embedding_function,
+    )
+
+    added = 0
+    for ids, embeddings, documents, metadatas in iter_snapshot_batches(
+        directory, batch_size or client.get_max_batch_size()
+    ):
+        collection.add(
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas,
+        )
+        added += len(ids)
+    return collection, added
@@ -0,0 +1,492 @@
+"""Memory-mapped local mirror of a Chroma collection with brute-force vector search."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections.abc import Iterable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.quantization import (
+    FLOAT32,
+    INT8,
+    QUANTIZATION_KEY,
+    check_quantization,
+    dequantize,
+    quantize,
+    storage_dtype,
+)
+
+DEFAULT_MIRROR_DIR = settings.cache_dir / "mirrors"
+MANIFEST_NAME = "manifest.json"
+# Rows scored per matrix multiply; bounds the temporary distance matrix per worker.
+DEFAULT_BLOCK_ROWS = 65_536
+
+_COMPARISONS = {
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+
+def mirror_path(collection: str, root: Path | str = DEFAULT_MIRROR_DIR) -> Path:
+    """Return the default mirror directory for a collection."""
+
+    return Path(root) / collection
+
+
+def _value_kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int | float):
+        return "num"
+    return "str"
+
+
+# ---- Export ----------------------------------------------------------------
+
+
+class _FieldColumns:
+    """Per-type value columns for one metadata field, filled row by row during export."""
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.codes: np.ndarray | None = None
+        self.categories: dict[str, int] = {}
+        self.numbers: np.ndarray | None = None
+        self.is_int: np.ndarray | None = None
+        self.bools: np.ndarray | None = None
+
+    def set(self, row: int, value: Any) -> None:
+        kind = _value_kind(value)
+        if kind == "bool":
+            if self.bools is None:
+                self.bools = np.full(self.count, -1, dtype=np.int8)
+            self.bools[row] = int(value)
+        elif kind == "num":
+            if self.numbers is None or self.is_int is None:
+                self.numbers = np.full(self.count, np.nan, dtype=np.float64)
+                self.is_int = np.zeros(self.count, dtype=bool)
+            self.numbers[row] = value
+            self.is_int[row] = isinstance(value, int)
+        else:
+            if self.codes is None:
+                self.codes = np.full(self.count, -1, dtype=np.int32)
+            self.codes[row] = self.categories.setdefault(str(value), len(self.categories))
+
+    def save(self, directory: Path, prefix: str, rows: int) -> list[str]:
+        kinds = []
+        if self.codes is not None:
+            np.save(directory / f"{prefix}.str.codes.npy", self.codes[:rows])
+            np.save(
+                directory / f"{prefix}.str.values.npy", np.array(list(self.categories), dtype=str)
+            )
+            kinds.append("str")
+        if self.numbers is not None and self.is_int is not None:
+            np.save(directory / f"{prefix}.num.npy", self.numbers[:rows])
+            np.save(directory / f"{prefix}.num.isint.npy", self.is_int[:rows])
+            kinds.append("num")
+        if self.bools is not None:
+            np.save(directory / f"{prefix}.bool.npy", self.bools[:rows])
+            kinds.append("bool")
+        return kinds
+
+
+def collection_space(collection: Any) -> str:
+    """Return the collection's distance function ("l2", "cosine" or "ip")."""
+
+    configuration = getattr(collection, "configuration", None) or {}
+    space = (configuration.get("hnsw") or {}).get("space") or (
+        configuration.get("spann") or {}
+    ).get("space")
+    return str(space or (collection.metadata or {}).get("hnsw:space") or "l2")
+
+
+def pairwise_distances(
+    space: str,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    squared_norms: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Return the ``(len(vectors), len(queries))`` distances under Chroma's definitions.
+
+    ``l2`` is squared Euclidean distance, ``cosine`` is ``1 - cos`` and ``ip`` is
+    ``1 - dot``. Pass precomputed ``squared_norms`` of ``vectors`` to skip them.
+    """
+
+    dots = vectors @ queries.T
+    if space == "ip":
+        return 1.0 - dots
+    if squared_norms is None:
+        squared_norms = np.einsum("ij,ij->i", vectors, vectors)
+    norms = squared_norms[:, None]
+    query_norms = np.einsum("ij,ij->i", queries, queries)[None, :]
+    if space == "cosine":
+        denominator = np.sqrt(norms * query_norms)
+        return 1.0 - np.divide(dots, denominator, out=np.zeros_like(dots), where=denominator > 0)
+    distances = norms + query_norms - 2.0 * dots
+    return np.maximum(distances, 0.0, out=distances)
+
+
+def export_mirror(
+    collection: Any,
+    directory: Path | str,
+    pages: Iterable[Mapping[str, Any]],
+    exclude_fields: Sequence[str] = ("content_hash",),
+    quantization: str | None = None,
+) -> dict[str, Any]:
+    """
+    Write a collection's ids, embeddings and metadata as memory-mappable ``.npy`` files.
+
+    ``pages`` are ``collection.get`` results including embeddings and metadatas (see
+    ``iter_collection_pages``). Embeddings go to one ``N x D`` array with their
+    squared norms alongside, stored as ``quantization`` (default: the collection's
+    ``quantization`` metadata, else float32; int8 adds per-row scales in
+    ``scales.npy``). Each metadata field is stored as typed columns
+    (string codes plus a category table, numbers, booleans) so ``where`` filters can
+    be evaluated as vectorized masks. Fields in ``exclude_fields`` are skipped. The
+    mirror is built in a temporary directory and swapped in when complete. Returns
+    the manifest.
+    """
+
+    directory = Path(directory)
+    tmp_dir = directory.with_name(f"{directory.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    (tmp_dir / "meta").mkdir(parents=True)
+
+    quantization = check_quantization(
+        quantization or (collection.metadata or {}).get(QUANTIZATION_KEY)
+    )
+    expected = collection.count()
+    embeddings: np.memmap | None = None
+    scales: np.ndarray | None = None
+    squared_norms = np.zeros(expected, dtype=np.float32)
+    ids: list[str] = []
+    fields: dict[str, _FieldColumns] = {}
+    skip = set(exclude_fields)
+
+    for page in pages:
+        page_embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+        page_ids = list(page["ids"])
+        room = expected - len(ids)
+        if room <= 0:
+            break
+        if len(page_ids) > room:
+            # The collection grew while exporting; keep the snapshot size we started with.
+            page_ids, page_embeddings = page_ids[:room], page_embeddings[:room]
+        if embeddings is None:
+            embeddings = np.lib.format.open_memmap(
+                tmp_dir / "embeddings.npy",
+                mode="w+",
+                dtype=storage_dtype(quantization),
+                shape=(expected, page_embeddings.shape[1]),
+            )
+            if quantization == INT8:
+                scales = np.ones(expected, dtype=np.float32)
+
+        start = len(ids)
+        stop = start + len(page_ids)
+        values, page_scales = quantize(page_embeddings, quantization)
+        embeddings[start:stop] = values
+        if scales is not None and page_scales is not None:
+            scales[start:stop] = page_scales
+        # Norms of the stored (not the original) vectors, so distances stay consistent.
+        stored = dequantize(values, page_scales)
+        squared_norms[start:stop] = np.einsum("ij,ij->i", stored, stored)
+        for offset, metadata in enumerate((page.get("metadatas") or [])[: len(page_ids)]):
+            for key, value in (metadata or {}).items():
+                if key in skip or value is None:
+                    continue
+                column = fields.get(key)
+                if column is None:
+                    column = fields[key] = _FieldColumns(expected)
+                column.set(start + offset, value)
+        ids.extend(page_ids)
+
+    count = len(ids)
+    dimension = 0
+    if embeddings is not None:
+        dimension = int(embeddings.shape[1])
+        embeddings.flush()
+        # Rows deleted while exporting: the file is rewritten at the exact size.
+        trimmed = np.array(embeddings[:count]) if count < expected else None
+        del embeddings
+        if trimmed is not None:
+            np.save(tmp_dir / "embeddings.npy", trimmed)
+        np.save(tmp_dir / "norms.npy", squared_norms[:count])
+        if scales is not None:
+            np.save(tmp_dir / "scales.npy", scales[:count])
+    else:
+        np.save(tmp_dir / "embeddings.npy", np.zeros((0, 0), dtype=np.float32))
+        np.save(tmp_dir / "norms.npy", np.zeros(0, dtype=np.float32))
+    np.save(tmp_dir / "ids.npy", np.array(ids, dtype=str))
+
+    manifest = {
+        "collection": collection.name,
+        "metadata": dict(collection.metadata or {}),
+        "space": collection_space(collection),
+        "count": count,
+        "dimension": dimension,
+        "quantization": quantization,
+        "fields": {
+            name: {"index": index, "kinds": column.save(tmp_dir / "meta", str(index), count)}
+            for index, (name, column) in enumerate(sorted(fields.items()))
+        },
+        "exported_at": datetime.now(UTC).isoformat(),
+    }
+    (tmp_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir.rename(directory)
+    return manifest
+
+
+# ---- Search ----------------------------------------------------------------
+
+
+class VectorMirror:
+    """
+    Read-only, memory-mapped view of an exported collection.
+
+    Only the manifest is read on construction; embeddings, ids and metadata columns
+    are memory-mapped on first use, so opening a mirror is effectively free and the
+    OS pages data in as searches touch it. ``query`` mirrors ``Collection.query`` for
+    precomputed ``query_embeddings``: exact (brute-force) top-k with Chroma's distance
+    definitions (``l2`` is squared L2) and ``where`` filters, which lets it stand in
+    for a collection in :func:`src.utils.search.search_batches`.
+    """
+
+    def __init__(self, directory: Path | str) -> None:
+        self.directory = Path(directory)
+        manifest_path = self.directory / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No vector mirror at {self.directory}.")
+        self.manifest: dict[str, Any] = json.loads(manifest_path.read_text())
+        self.name: str = self.manifest["collection"]
+        self.metadata: dict[str, Any] = self.manifest["metadata"]
+        self.space: str = self.manifest["space"]
+        self.fields: dict[str, dict[str, Any]] = self.manifest["fields"]
+        # Mirrors exported before quantization support are float32.
+        self.quantization: str = self.manifest.get("quantization", FLOAT32)
+
+    def count(self) -> int:
+        return int(self.manifest["count"])
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(self.directory / name, mmap_mode="r")
+
+    @cached_property
+    def embeddings(self) -> np.ndarray:
+        return self._load("embeddings.npy")
+
+    @cached_property
+    def squared_norms(self) -> np.ndarray:
+        return self._load("norms.npy")
+
+    @cached_property
+    def scales(self) -> np.ndarray | None:
+        return self._load("scales.npy") if self.quantization == INT8 else None
+
+    @cached_property
+    def ids(self) -> np.ndarray:
+        return self._load("ids.npy")
+
+    @cached_property
+    def _columns(self) -> dict[str, dict[str, np.ndarray]]:
+        columns: dict[str, dict[str, np.ndarray]] = {}
+        for name, spec in self.fields.items():
+            prefix = f"meta/{spec['index']}"
+            kinds = spec["kinds"]
+            column: dict[str, np.ndarray] = {}
+            if "str" in kinds:
+                column["codes"] = self._load(f"{prefix}.str.codes.npy")
+                column["values"] = self._load(f"{prefix}.str.values.npy")
+            if "num" in kinds:
+                column["num"] = self._load(f"{prefix}.num.npy")
+                column["isint"] = self._load(f"{prefix}.num.isint.npy")
+            if "bool" in kinds:
+                column["bool"] = self._load(f"{prefix}.bool.npy")
+            columns[name] = column
+        return columns
+
+    # -- filters --
+
+    def _equals(self, field: str, value: Any) -> np.ndarray:
+        column = self._columns.get(field, {})
+        kind = _value_kind(value)
+        if kind == "str" and "codes" in column:
+            matches = np.flatnonzero(column["values"] == value)
+            return (
+                column["codes"] == matches[0]
+                if len(matches)
+                else np.zeros(self.count(), dtype=bool)
+            )
+        if kind == "num" and "num" in column:
+            return column["num"] == value
+        if kind == "bool" and "bool" in column:
+            return column["bool"] == int(value)
+        return np.zeros(self.count(), dtype=bool)
+
+    def _field_mask(self, field: str, condition: Any) -> np.ndarray:
+        if not isinstance(condition, Mapping):
+            return self._equals(field, condition)
+        if len(condition) != 1:
+            raise ValueError(f"Filter on '{field}' must have exactly one operator.")
+        ((operator, value),) = condition.items()
+        if operator == "$eq":
+            return self._equals(field, value)
+        if operator == "$ne":
+            return ~self._equals(field, value)
+        if operator in ("$in", "$nin"):
+            mask = np.zeros(self.count(), dtype=bool)
+            for item in value:
+                mask |= self._equals(field, item)
+            return mask if operator == "$in" else ~mask
+        if operator in _COMPARISONS:
+            if _value_kind(value) != "num":
+                raise ValueError(f"{operator} on '{field}' needs a numeric operand.")
+            numbers = self._columns.get(field, {}).get("num")
+            if numbers is None:
+                return np.zeros(self.count(), dtype=bool)
+            return _COMPARISONS[operator](numbers, value)
+        raise ValueError(f"Unsupported filter operator '{operator}'.")
+
+    def where_mask(self, where: Mapping[str, Any]) -> np.ndarray:
+        """Evaluate a Chroma ``where`` filter to a boolean row mask."""
+
+        masks = []
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                parts = [self.where_mask(part) for part in condition]
+                if not parts:
+                    raise ValueError(f"{key} needs at least one condition.")
+                combine = np.logical_and if key == "$and" else np.logical_or
+                masks.append(combine.reduce(parts))
+            else:
+                masks.append(self._field_mask(key, condition))
+        if not masks:
+            return np.ones(self.count(), dtype=bool)
+        return np.logical_and.reduce(masks)
+
+    # -- search --
+
+    def _distances(self, rows: np.ndarray | slice, queries: np.ndarray) -> np.ndarray:
+        return pairwise_distances(
+            self.space,
+            dequantize(self.embeddings[rows], None if self.scales is None else self.scales[rows]),
+            queries,
+            np.asarray(self.squared_norms[rows], dtype=np.float32),
+        )
+
+    def search(
+        self,
+        query_embeddings: Sequence[Any],
+        n_results: int = 10,
+        where: Mapping[str, Any] | None = None,
+        block_rows: int = DEFAULT_BLOCK_ROWS,
+        workers: int | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return ``(row_indices, distances)``, each ``(n_queries, k)``, nearest first.
+
+        Rows are scored in blocks of ``block_rows`` with one matrix multiply per block,
+        blocks run on a thread pool (NumPy releases the GIL), and each block keeps only
+        its own top-k before the partial results are merged. With ``where``, only the
+        matching rows are gathered and scored, so fewer than ``n_results`` rows may
+        come back.
+        """
+
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        candidates: np.ndarray | None = None
+        if where:
+            candidates = np.flatnonzero(self.where_mask(where))
+        total = self.count() if candidates is None else len(candidates)
+        k = min(n_results, total)
+        if k <= 0 or len(queries) == 0:
+            empty = np.zeros((len(queries), 0))
+            return empty.astype(np.int64), empty
+
+        def search_block(start: int) -> tuple[np.ndarray, np.ndarray]:
+            stop = min(start + block_rows, total)
+            rows: np.ndarray | slice = (
+                slice(start, stop) if candidates is None else candidates[start:stop]
+            )
+            distances = self._distances(rows, queries)
+            kept = min(k, stop - start)
+            top = np.argpartition(distances, kept - 1, axis=0)[:kept]
+            indices = (
+                np.arange(start, stop)[top] if candidates is None else candidates[start:stop][top]
+            )
+            return indices, np.take_along_axis(distances, top, axis=0)
+
+        starts = range(0, total, block_rows)
+        if len(starts) == 1:
+            parts = [search_block(0)]
+        else:
+            with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+                parts = list(pool.map(search_block, starts))
+
+        indices = np.concatenate([part[0] for part in parts], axis=0).T
+        distances = np.concatenate([part[1] for part in parts], axis=0).T
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(indices, order, axis=1), np.take_along_axis(
+            distances, order, axis=1
+        )
+
+    def row_metadata(self, row: int) -> dict[str, Any]:
+        """Rebuild the exported metadata for one row."""
+
+        metadata: dict[str, Any] = {}
+        for name, column in self._columns.items():
+            if "codes" in column and (code := int(column["codes"][row])) >= 0:
+                metadata[name] = str(column["values"][code])
+            elif "num" in column and not np.isnan(number := float(column["num"][row])):
+                metadata[name] = int(number) if column["isint"][row] else number
+            elif "bool" in column and (flag := int(column["bool"][row])) >= 0:
+                metadata[name] = bool(flag)
+        return metadata
+
+    def query(
+        self,
+        query_embeddings: Sequence[Any] | None = None,
+        n_results: int = 10,
+        where: Mapping[str, Any] | None = None,
+        include: Sequence[str] = ("metadatas", "distances"),
+        query_texts: Sequence[str] | None = None,
+        **_: Any,
+    ) -> dict[str, Any]:
+        """``Collection.query``-shaped results (ids, distances, metadatas per query)."""
+
+        if query_embeddings is None:
+            raise ValueError(
+                "A vector mirror cannot embed text; pass query_embeddings "
+                f"(got {len(query_texts or [])} query_texts)."
+            )
+
+        indices, distances = self.search(query_embeddings, n_results=n_results, where=where)
+        ids: list[list[str]] = []
+        result_distances: list[list[float]] = []
+        metadatas: list[list[dict[str, Any]]] = []
+        for query_indices, query_distances in zip(indices, distances, strict=True):
+            rows = query_indices.tolist()
+            ids.append([str(self.ids[row]) for row in rows])
+            result_distances.append(query_distances.tolist())
+            if "metadatas" in include:
+                metadatas.append([self.row_metadata(row) for row in rows])
+        return {
+            "ids": ids,
+            "distances": result_distances if "distances" in include else None,
+            "metadatas": metadatas if "metadatas" in include else None,
+            "documents": None,
+        }
@@ -0,0 +1,23 @@
+import uuid
+from collections.abc import Iterator
+from typing import Any
+
+import chromadb
+import pytest
+
+
+@pytest.fixture
+def chroma_client() -> Iterator[Any]:
+    """An in-memory client; collections created through it are deleted afterwards."""
+
+    client = chromadb.EphemeralClient()
+    existing = {col.name for col in client.list_collections()}
+    yield client
+    for col in client.list_collections():
+        if col.name not in existing:
+            client.delete_collection(name=col.name)
+
+
+@pytest.fixture
+def collection_name() -> str:
+    return f"test-{uuid.uuid4().hex[:12]}"
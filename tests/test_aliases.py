@@ -0,0 +1,114 @@
+from datetime import UTC, datetime
+from typing import Any
+
+from src.utils.aliases import (
+    AliasTable,
+    collect_garbage,
+    is_build_of,
+    load_aliases,
+    resolve_alias,
+    retire_collection,
+    swap_alias,
+    versioned_name,
+)
+
+
+def test_point_retires_the_previous_target() -> None:
+    table = AliasTable()
+    table.point("cards", "cards__1", None, now=10.0)
+    table.point("cards", "cards__2", "cards__1", now=20.0)
+
+    assert table.resolve("cards") == "cards__2"
+    assert table.resolve("other") == "other"
+    assert table.retired == {"cards__1": 20.0}
+    assert table.aliases_of("cards__2") == ["cards"]
+
+
+def test_pointing_back_at_a_retired_build_revives_it() -> None:
+    table = AliasTable()
+    table.point("cards", "cards__2", "cards__1", now=10.0)
+    table.point("cards", "cards__1", "cards__2", now=20.0)
+
+    assert table.resolve("cards") == "cards__1"
+    assert table.retired == {"cards__2": 20.0}
+
+
+def test_repointing_at_the_same_target_retires_nothing() -> None:
+    table = AliasTable()
+    table.point("cards", "cards__1", "cards__1", now=10.0)
+    assert table.retired == {}
+
+
+def test_table_survives_metadata_round_trip() -> None:
+    table = AliasTable(aliases={"cards": "cards__2"}, retired={"cards__1": 5.0})
+    assert AliasTable.from_metadata({"aliases": table.to_json()}) == table
+    assert AliasTable.from_metadata(None) == AliasTable()
+
+
+def test_versioned_names_are_builds_of_their_alias() -> None:
+    name = versioned_name("cards", datetime(2026, 1, 2, 3, 4, 5, tzinfo=UTC))
+    assert name == "cards__20260102T030405000000Z"
+    assert is_build_of(name, "cards")
+    assert not is_build_of(name, "card")
+    assert not is_build_of("cards__backup", "cards")
+    # Builds named before names carried microseconds are still recognised.
+    assert is_build_of("cards__20260102T030405Z", "cards")
+
+
+def test_builds_in_the_same_second_get_distinct_names() -> None:
+    first = versioned_name("cards", datetime(2026, 1, 2, 3, 4, 5, 100, tzinfo=UTC))
+    second = versioned_name("cards", datetime(2026, 1, 2, 3, 4, 5, 200, tzinfo=UTC))
+    assert first != second
+    assert first < second
+    assert is_build_of(first, "cards") and is_build_of(second, "cards")
+
+
+def _create(client: Any, *names: str) -> None:
+    for name in names:
+        client.create_collection(name=name, embedding_function=None)
+
+
+def test_swap_retires_a_plain_collection_of_the_same_name(
+    chroma_client: Any, collection_name: str
+) -> None:
+    build = f"{collection_name}__20260101T000000Z"
+    _create(chroma_client, collection_name, build)
+
+    assert swap_alias(chroma_client, collection_name, build) == collection_name
+    assert resolve_alias(chroma_client, collection_name) == build
+    assert collection_name in load_aliases(chroma_client).retired
+
+
+def test_collect_garbage_waits_for_the_grace_period(
+    chroma_client: Any, collection_name: str
+) -> None:
+    old, new = f"{collection_name}__20260101T000000Z", f"{collection_name}__20260102T000000Z"
+    failed = f"{collection_name}__20260103T000000Z"
+    _create(chroma_client, old, new, failed)
+    swap_alias(chroma_client, collection_name, old)
+    swap_alias(chroma_client, collection_name, new)
+    retire_collection(chroma_client, failed)
+    # A live build is never retired, even when asked to.
+    retire_collection(chroma_client, new)
+    retired_at = load_aliases(chroma_client).retired
+
+    assert collect_garbage(chroma_client, grace_secs=60, now=retired_at[old] + 30) == []
+    deleted = collect_garbage(chroma_client, grace_secs=60, now=max(retired_at.values()) + 60)
+
+    assert sorted(deleted) == [old, failed]
+    existing = {col.name for col in chroma_client.list_collections()}
+    assert new in existing and old not in existing and failed not in existing
+    assert load_aliases(chroma_client).retired == {}
+    assert resolve_alias(chroma_client, collection_name) == new
+
+
+def test_collect_garbage_forgets_retired_collections_already_gone(
+    chroma_client: Any, collection_name: str
+) -> None:
+    build = f"{collection_name}__20260101T000000Z"
+    _create(chroma_client, build)
+    retire_collection(chroma_client, build)
+    chroma_client.delete_collection(name=build)
+
+    assert collect_garbage(chroma_client, grace_secs=0) == []
+    assert load_aliases(chroma_client).retired == {}
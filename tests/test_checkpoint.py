@@ -0,0 +1,45 @@
+from src.utils.checkpoint import CommitTracker
+
+
+def test_watermark_starts_at_start_row() -> None:
+    assert CommitTracker(start_row=5).watermark == 5
+
+
+def test_watermark_waits_for_earlier_batches() -> None:
+    tracker = CommitTracker()
+    for start in (0, 10, 20):
+        tracker.dispatched(start)
+    tracker.read_upto(30)
+
+    assert tracker.committed(10) == 0
+    assert tracker.committed(20) == 0
+    assert tracker.committed(0) == 30
+
+
+def test_watermark_is_capped_by_rows_read() -> None:
+    tracker = CommitTracker()
+    tracker.dispatched(0)
+    tracker.read_upto(10)
+    tracker.dispatched(10)
+
+    assert tracker.committed(0) == 10
+    # Row 10's batch is in flight but nothing past it has been read yet.
+    tracker.read_upto(15)
+    assert tracker.watermark == 10
+    assert tracker.committed(10) == 15
+
+
+def test_duplicate_batch_starts_are_counted() -> None:
+    tracker = CommitTracker()
+    tracker.dispatched(0)
+    tracker.dispatched(0)
+    tracker.read_upto(10)
+
+    assert tracker.committed(0) == 0
+    assert tracker.committed(0) == 10
+
+
+def test_read_upto_never_moves_back() -> None:
+    tracker = CommitTracker(start_row=20)
+    tracker.read_upto(10)
+    assert tracker.watermark == 20
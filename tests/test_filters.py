@@ -0,0 +1,62 @@
+from src.utils.facets import FacetIndex, FieldFacet
+from src.utils.filters import EMPTY, GET, QUERY, Constraint, parse_filter, plan_filter
+
+
+def _facets() -> FacetIndex:
+    facets = FacetIndex()
+    facets.add(
+        {"rarity": "Legendary" if i < 2 else "Common", "power": i, "energy": i % 3}
+        for i in range(400)
+    )
+    return facets.finish()
+
+
+def _plan(text: str, facets: FacetIndex | None, n_results: int = 5) -> str:
+    return plan_filter(parse_filter(text, facets), facets, n_results).strategy
+
+
+def test_unknown_value_is_answered_empty() -> None:
+    assert _plan("rarity=Mythic", _facets()) == EMPTY
+    assert _plan("energy in [7, 8]", _facets()) == EMPTY
+
+
+def test_absent_faceted_field_is_answered_empty() -> None:
+    assert _plan("ppe>1", _facets()) == EMPTY
+
+
+def test_range_outside_the_recorded_range_is_empty() -> None:
+    # Too many distinct powers to keep their values; only the range is known.
+    facets = _facets()
+    assert facets.fields["power"].values is None
+    assert _plan("power>1000", facets) == EMPTY
+
+
+def test_few_matches_are_fetched_with_get() -> None:
+    plan = plan_filter(parse_filter("rarity=Legendary", _facets()), _facets(), n_results=5)
+    assert (plan.strategy, plan.estimated, plan.exact) == (GET, 2.0, True)
+
+
+def test_broad_filters_run_as_vector_queries() -> None:
+    assert _plan("rarity=Common", _facets()) == QUERY
+    assert _plan("power>=10", _facets()) == QUERY
+    assert _plan("rarity!=Legendary", _facets()) == QUERY
+
+
+def test_without_facets_every_filter_is_a_query() -> None:
+    plan = plan_filter(parse_filter("rarity=Mythic"), None, n_results=5)
+    assert plan.strategy == QUERY
+    assert plan.where == {"rarity": {"$eq": "Mythic"}}
+
+
+def test_missing_range_plans_a_query() -> None:
+    # A stored facet without min/max (e.g. written by hand or truncated) gives no range.
+    for facet in (
+        FieldFacet(count=400, distinct=400),
+        FieldFacet(count=400, distinct=400, minimum=0.0),
+    ):
+        facets = FacetIndex(total=400, fields={"power": facet})
+        plan = plan_filter([Constraint("power", "$gt", 1000)], facets, n_results=5)
+        assert (plan.strategy, plan.exact) == (QUERY, False)
+
+    facets = FacetIndex(total=400, fields={"power": FieldFacet(400, 400, minimum=0.0)})
+    assert plan_filter([Constraint("power", "$eq", 3)], facets, n_results=5).strategy == QUERY
@@ -0,0 +1,72 @@
+import mmap
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from scripts.benchmark_readers import write_synthetic_tsv
+from src.utils.batching import RecordBatch
+from src.utils.chroma_utils import get_record_batch_reader
+from src.utils.parallel import _record_start, iter_record_batches_parallel
+
+
+def _record_starts(data: bytes, tmp_path: Path, offset: int, in_quotes: bool) -> int:
+    path = tmp_path / "data.tsv"
+    path.write_bytes(data)
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _record_start(mm, offset, in_quotes)
+
+
+def test_record_start_skips_newlines_inside_quotes(tmp_path: Path) -> None:
+    data = b'a\t"x\ny"\tb\nnext\n'
+    assert _record_starts(data, tmp_path, 0, False) == data.index(b"next")
+    # From inside the quoted field, the quote closing it comes first.
+    assert _record_starts(data, tmp_path, 4, True) == data.index(b"next")
+    # Wrongly told the cut is outside quotes, the embedded newline ends the record.
+    assert _record_starts(data, tmp_path, 4, False) == 5
+
+
+def test_record_start_handles_escaped_quotes(tmp_path: Path) -> None:
+    data = b'a\t"say ""hi""\nthere"\nnext\n'
+    assert _record_starts(data, tmp_path, 0, False) == data.index(b"next")
+
+
+def test_record_start_without_a_newline_is_the_end(tmp_path: Path) -> None:
+    data = b"a\tb"
+    assert _record_starts(data, tmp_path, 0, False) == len(data)
+
+
+def _read(
+    reader: Callable[..., Iterator[RecordBatch]], path: Path, batch_size: int, start_row: int = 0
+) -> list[Any]:
+    return [
+        (batch.rows, batch.ids, batch.documents, batch.metadatas)
+        for batch in reader(path, batch_size, start_row)
+    ]
+
+
+@pytest.mark.parametrize(("shard_bytes", "start_row"), [(512, 0), (4096, 0), (1500, 37)])
+def test_shards_match_the_csv_reader(tmp_path: Path, shard_bytes: int, start_row: int) -> None:
+    path = write_synthetic_tsv(tmp_path / "cards.tsv", rows=300)
+    expected = _read(get_record_batch_reader("csv"), path, 16, start_row)
+
+    def parallel(path: Path, batch_size: int, start_row: int) -> Iterator[RecordBatch]:
+        return iter_record_batches_parallel(
+            path, batch_size, start_row, workers=2, shard_bytes=shard_bytes
+        )
+
+    assert _read(parallel, path, 16, start_row) == expected
+
+
+def test_crlf_and_header_only_files(tmp_path: Path) -> None:
+    crlf = tmp_path / "crlf.tsv"
+    source = write_synthetic_tsv(tmp_path / "cards.tsv", rows=40)
+    crlf.write_bytes(source.read_bytes().replace(b"\r\n", b"\n").replace(b"\n", b"\r\n"))
+    header_only = tmp_path / "header.tsv"
+    header_only.write_text("url\tname\n", encoding="utf-8")
+    empty = tmp_path / "empty.tsv"
+    empty.write_bytes(b"")
+
+    for path in (crlf, header_only, empty):
+        expected = _read(get_record_batch_reader("csv"), path, 7)
+        assert _read(get_record_batch_reader("parallel"), path, 7) == expected
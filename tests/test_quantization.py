@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from src.utils.quantization import (
+    FLOAT16,
+    FLOAT32,
+    INT8,
+    bytes_per_vector,
+    check_quantization,
+    dequantize,
+    quantize,
+    round_trip,
+    truncate_dimensions,
+)
+
+
+def _vectors() -> np.ndarray:
+    return np.random.default_rng(0).standard_normal((16, 32)).astype(np.float32)
+
+
+def test_float32_is_lossless() -> None:
+    vectors = _vectors()
+    values, scales = quantize(vectors, FLOAT32)
+    assert scales is None
+    np.testing.assert_array_equal(dequantize(values), vectors)
+
+
+def test_float16_round_trip() -> None:
+    vectors = _vectors()
+    values, scales = quantize(vectors, FLOAT16)
+    assert values.dtype == np.float16 and scales is None
+    np.testing.assert_allclose(dequantize(values), vectors, rtol=1e-3, atol=1e-3)
+
+
+def test_int8_round_trip_is_within_half_a_step() -> None:
+    vectors = _vectors()
+    values, scales = quantize(vectors, INT8)
+    assert values.dtype == np.int8 and scales is not None
+    # Each row's largest component maps to +-127.
+    np.testing.assert_array_equal(np.abs(values).max(axis=1), 127)
+    error = np.abs(dequantize(values, scales) - vectors)
+    assert (error <= scales[:, None] / 2 + 1e-6).all()
+
+
+def test_int8_zero_row_keeps_a_unit_scale() -> None:
+    values, scales = quantize(np.zeros((2, 4)), INT8)
+    assert scales is not None
+    np.testing.assert_array_equal(scales, [1.0, 1.0])
+    np.testing.assert_array_equal(dequantize(values, scales), np.zeros((2, 4)))
+
+
+def test_round_trip_is_stable() -> None:
+    vectors = _vectors()
+    for quantization in (FLOAT32, FLOAT16, INT8):
+        once = round_trip(vectors, quantization)
+        np.testing.assert_allclose(round_trip(once, quantization), once, rtol=1e-6)
+
+
+def test_bytes_per_vector_counts_the_int8_scale() -> None:
+    assert bytes_per_vector(256, FLOAT32) == 1024
+    assert bytes_per_vector(256, FLOAT16) == 512
+    assert bytes_per_vector(256, INT8) == 260
+
+
+def test_unknown_quantization_is_rejected() -> None:
+    assert check_quantization(None) == FLOAT32
+    with pytest.raises(ValueError):
+        check_quantization("int4")
+
+
+def test_truncate_dimensions_renormalizes() -> None:
+    truncated = truncate_dimensions(_vectors(), 8)
+    assert truncated.shape == (16, 8)
+    np.testing.assert_allclose(np.linalg.norm(truncated, axis=1), 1.0, rtol=1e-5)
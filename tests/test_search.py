@@ -0,0 +1,74 @@
+from typing import Any
+
+from src.utils.chroma_utils import bump_content_version
+from src.utils.embeddings import create_embedding_function
+from src.utils.result_cache import QueryResultCache
+from src.utils.search import QueryRequest, search_batches
+
+
+def _collection(client: Any, name: str) -> Any:
+    collection = client.create_collection(
+        name=name, embedding_function=create_embedding_function("hashing", "hash-64")
+    )
+    collection.upsert(
+        ids=["a", "b"],
+        documents=["fire dragon", "ice golem"],
+        metadatas=[{"name": "Dragon"}, {"name": "Golem"}],
+    )
+    bump_content_version(collection)
+    return client.get_collection(
+        name=name, embedding_function=create_embedding_function("hashing", "hash-64")
+    )
+
+
+def _search(collection: Any, client: Any, cache: QueryResultCache, *texts: str) -> list[Any]:
+    queries = [QueryRequest(id=str(i), text=text) for i, text in enumerate(texts)]
+    return [
+        result
+        for results in search_batches(
+            collection, queries, n_results=2, result_cache=cache, client=client
+        )
+        for result in results
+    ]
+
+
+def test_repeated_query_is_served_from_the_result_cache(
+    chroma_client: Any, collection_name: str
+) -> None:
+    collection = _collection(chroma_client, collection_name)
+    cache = QueryResultCache()
+
+    first = _search(collection, chroma_client, cache, "dragon")
+    second = _search(collection, chroma_client, cache, "dragon")
+
+    assert first == second
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_write_between_searches_on_the_same_handle_misses(
+    chroma_client: Any, collection_name: str
+) -> None:
+    collection = _collection(chroma_client, collection_name)
+    cache = QueryResultCache()
+    _search(collection, chroma_client, cache, "dragon")
+
+    # Another writer refreshes the collection; ``collection`` keeps its old metadata.
+    writer = chroma_client.get_collection(name=collection_name)
+    writer.upsert(ids=["c"], embeddings=[[1.0] * 64], metadatas=[{"name": "Drake"}])
+    bump_content_version(writer)
+    results = _search(collection, chroma_client, cache, "dragon")
+
+    assert (cache.stats.hits, cache.stats.misses) == (0, 2)
+    assert len(results[0]["results"]) == 2
+
+
+def test_repeats_within_a_group_are_searched_once_and_count_as_hits(
+    chroma_client: Any, collection_name: str
+) -> None:
+    collection = _collection(chroma_client, collection_name)
+    cache = QueryResultCache()
+
+    results = _search(collection, chroma_client, cache, "dragon", "golem", "dragon")
+
+    assert results[0]["results"] == results[2]["results"]
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)